@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks the encoding and decoding of frames and the end-to-end throughput of requests, and outputs the results as
+JSON so that they can be compared across commits:
+
+    python benchmarks/run.py -o before.json
+    git checkout <other commit>
+    python benchmarks/run.py --compare before.json
+
+The end-to-end benchmarks run against simulated burners (see `pyduro.simulator`), started in their own process. The
+startup benchmarks run the command line in a new interpreter every time, as a cron job would, and measure both how long
+it takes and how long it spends importing modules (with `python -X importtime`).
+"""
+
+# --------------------------------------------------------------------------------------------------
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+# Benchmark the code of this checkout, not an installed version
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SOURCE_DIRECTORY)
+
+from pyduro import bulk, simulator
+from pyduro.actions import status as status_action
+from pyduro.protocol import FUNCTIONS
+from pyduro.protocol.frame import Frame, Response
+from pyduro.protocol.transport import Transport
+from pyduro.replay import send_load
+
+# --------------------------------------------------------------------------------------------------
+
+DEFAULT_SIMULATOR_ADDRESS = "127.0.9.1"
+
+# The relative slowdown above which a benchmark is reported as a regression
+DEFAULT_THRESHOLD = 0.1
+
+SERIAL = simulator.DEFAULT_SIMULATOR_SERIAL
+PIN_CODE = simulator.DEFAULT_SIMULATOR_PIN_CODE
+ORIGIN = (DEFAULT_SIMULATOR_ADDRESS, 8483)
+
+# --------------------------------------------------------------------------------------------------
+
+
+def build_response(function, payload="*"):
+    """
+    Builds the response a simulated burner sends to the given request.
+
+    Args:
+        function (int): The function of the request.
+        payload (str): The payload of the request.
+            Default: "*"
+
+    Returns:
+        response (bytes): The response frame.
+    """
+
+    burner = simulator.SimulatedBurner(SERIAL, PIN_CODE)
+    status, response_payload = burner.respond(function, payload)
+
+    return "{}{}\x02{:02d}{:02d}{}{:03d}{}\x04".format(
+        Frame(SERIAL, PIN_CODE, function, payload).app_id,
+        burner.serial,
+        function,
+        42,
+        status,
+        len(response_payload),
+        response_payload,
+    ).encode()
+
+
+def micro_benchmarks(quick=False):
+    """
+    Defines the micro-benchmarks, each one timing a single operation.
+
+    Args:
+        quick (bool): Whether or not to build smaller inputs for the bulk benchmarks.
+            Default: False
+
+    Returns:
+        benchmarks (list(tuple(str, callable, int))): The name of every benchmark, the operation to time and the number
+            of items it processes.
+    """
+
+    frame = Frame(SERIAL, PIN_CODE, FUNCTIONS.get_operating_data.value, "*")
+    buffer = bytearray(1024)
+
+    operating = build_response(FUNCTIONS.get_operating_data.value)
+    status = build_response(FUNCTIONS.get_status.value)
+    status_payload = Response(status, ORIGIN).payload
+    decoded_status = status_action.STATUS_SCHEMA.decode(status_payload)
+
+    frames_count = 1000 if quick else 10000
+    frames = status * frames_count
+
+    benchmarks = [
+        (
+            "frame.init",
+            lambda: Frame(SERIAL, PIN_CODE, FUNCTIONS.get_operating_data.value, "*"),
+            1,
+        ),
+        ("frame.get", frame.get, 1),
+        ("frame.encode", frame.encode, 1),
+        ("frame.encode_into", lambda: frame.encode_into(buffer), 1),
+        ("response.init", lambda: Response(operating, ORIGIN), 1),
+        ("response.payload", lambda: Response(operating, ORIGIN).payload, 1),
+        (
+            "response.parse_payload",
+            lambda: Response(operating, ORIGIN).parse_payload(),
+            1,
+        ),
+        (
+            "response.fields.lookup",
+            lambda: Response(operating, ORIGIN).fields["smoke_temp"],
+            1,
+        ),
+        (
+            "status.decode",
+            lambda: status_action.STATUS_SCHEMA.decode(status_payload),
+            1,
+        ),
+        (
+            "status.diff",
+            lambda: status_action.STATUS_SCHEMA.diff(
+                decoded_status, decoded_status._replace(boiler_temp=0.0)
+            ),
+            1,
+        ),
+        (
+            "bulk.decode_frames",
+            lambda: bulk.decode_frames(frames, use_numpy=False),
+            frames_count,
+        ),
+        (
+            "bulk.decode_status",
+            lambda: bulk.decode_status(
+                bulk.decode_frames(frames, use_numpy=False), use_numpy=False
+            ),
+            frames_count,
+        ),
+    ]
+
+    if bulk.numpy is not None:
+        benchmarks.append(
+            (
+                "bulk.decode_status.numpy",
+                lambda: bulk.decode_status(
+                    bulk.decode_frames(frames, use_numpy=True), use_numpy=True
+                ),
+                frames_count,
+            )
+        )
+
+    return benchmarks
+
+
+def time_operation(operation, items=1, repeat=5, min_duration=0.2):
+    """
+    Times an operation.
+
+    Args:
+        operation (callable): The operation to time.
+        items (int): The number of items processed by the operation.
+            Default: 1
+        repeat (int): The number of measures.
+            Default: 5
+        min_duration (float): The minimum duration of each measure, in seconds (the operation is run as many times as
+            needed).
+            Default: 0.2
+
+    Returns:
+        result (dict): The best and median durations per item, in nanoseconds ("min" and "median").
+    """
+
+    timer = timeit.Timer(operation)
+
+    number = 1
+    while timer.timeit(number) < min_duration:
+        number *= 2
+
+    durations = [
+        duration / number / items * 1e9 for duration in timer.repeat(repeat, number)
+    ]
+
+    return dict(
+        unit="ns",
+        min=round(min(durations), 1),
+        median=round(statistics.median(durations), 1),
+    )
+
+
+def end_to_end_benchmarks(address, count, pattern=""):
+    """
+    Runs the end-to-end benchmarks against a simulated burner started in its own process.
+
+    Args:
+        address (str): The address where to simulate the burner.
+        count (int): The number of requests of each benchmark.
+        pattern (str): Only run the benchmarks whose name contains this string.
+            Default: "" (every benchmark)
+
+    Returns:
+        results (dict): The throughput and the latencies of every benchmark, by name.
+    """
+
+    concurrencies = [
+        concurrency
+        for concurrency in (1, 16, 64)
+        if pattern in "e2e.concurrency_{}".format(concurrency)
+    ]
+    if not concurrencies:
+        return {}
+
+    with _simulator(address):
+        frames = [
+            Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*"),
+            Frame(SERIAL, PIN_CODE, FUNCTIONS.get_operating_data.value, "*"),
+        ]
+
+        results = {}
+        with Transport(source_port=0, coalesce=False) as transport:
+            for concurrency in concurrencies:
+                report = send_load(
+                    frames,
+                    address,
+                    count=count,
+                    concurrency=concurrency,
+                    transport=transport,
+                )
+
+                results["e2e.concurrency_{}".format(concurrency)] = dict(
+                    unit="requests/s",
+                    rate=round(report.rate, 1),
+                    lost=report.lost,
+                    p50_ms=round(report.latencies["p50"] * 1000, 3),
+                    p99_ms=round(report.latencies["p99"] * 1000, 3),
+                )
+
+        return results
+
+
+def startup_benchmarks(address=None, repeat=5, pattern=""):
+    """
+    Runs the startup benchmarks: every command is run in a new interpreter.
+
+    Args:
+        address (str): The address where to simulate the burner queried by the commands that need one.
+            Default: None (skip these commands)
+        repeat (int): The number of runs of every command.
+            Default: 5
+        pattern (str): Only run the benchmarks whose name contains this string.
+            Default: ""
+
+    Returns:
+        results (dict): The duration of every command and the time it spent importing modules, by name.
+
+    Throws:
+        RuntimeError: If a command imported a module it doesn't need (e.g. the daemon while no daemon is running).
+    """
+
+    # A socket that doesn't exist (nor its directory): the command must neither use nor even load the daemon
+    missing_socket = os.path.join(
+        tempfile.gettempdir(), "pyduro-benchmarks-{}".format(os.getpid()), "pyduro.sock"
+    )
+
+    commands = [("startup.help", ["--help"], ())]
+    if address is not None:
+        commands.append(
+            (
+                "startup.status",
+                [
+                    "--socket",
+                    missing_socket,
+                    "-b",
+                    address,
+                    "-s",
+                    SERIAL,
+                    "-p",
+                    PIN_CODE,
+                    "status",
+                ],
+                ("pyduro.daemon",),
+            )
+        )
+
+    commands = [command for command in commands if pattern in command[0]]
+    if not commands:
+        return {}
+
+    results = {}
+    with _simulator(address) if address is not None else contextlib.ExitStack():
+        for name, arguments, unexpected in commands:
+            durations = []
+            imports = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                _run_cli(arguments)
+                durations.append((time.perf_counter() - start) * 1000)
+
+                # Timing the imports slows them down, so it is done in a run of its own
+                process = _run_cli(arguments, importtime=True)
+                imports.append(_import_time(process))
+
+                imported = _imported_modules(process).intersection(unexpected)
+                if imported:
+                    raise RuntimeError(
+                        "{} imported {}".format(name, ", ".join(sorted(imported)))
+                    )
+
+            results[name] = dict(
+                unit="ms",
+                min=round(min(durations), 1),
+                median=round(statistics.median(durations), 1),
+            )
+            results[name + ".imports"] = dict(
+                unit="ms",
+                min=round(min(imports), 1),
+                median=round(statistics.median(imports), 1),
+            )
+
+    return results
+
+
+def compare(baseline, results, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares results with a baseline, and prints the relative change of every benchmark.
+
+    Args:
+        baseline (dict): The baseline results, as output by this script.
+        results (dict): The new results.
+        threshold (float): The relative slowdown above which a benchmark is reported as a regression.
+            Default: 0.1
+
+    Returns:
+        regressions (list(str)): The names of the benchmarks that regressed.
+    """
+
+    regressions = []
+    for name, result in sorted(results["benchmarks"].items()):
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            print("{:<32} {:>12} (new)".format(name, _value(result)), file=sys.stderr)
+
+            continue
+
+        if not _value(before):
+            # Nothing to compare with (e.g. no response at all in the baseline)
+            print(
+                "{:<32} {!s:>12} -> {!s:>12} (no baseline)".format(
+                    name, _value(before), _value(result)
+                ),
+                file=sys.stderr,
+            )
+
+            continue
+
+        # Durations should go down, throughputs should go up
+        change = (_value(result) or 0) / _value(before) - 1
+        slowdown = -change if result["unit"] == "requests/s" else change
+        regressed = slowdown > threshold
+        if regressed:
+            regressions.append(name)
+
+        print(
+            "{:<32} {:>12} -> {:>12} {:+7.1%}{}".format(
+                name,
+                _value(before),
+                _value(result),
+                change,
+                " REGRESSION" if regressed else "",
+            ),
+            file=sys.stderr,
+        )
+
+    for name in sorted(set(baseline["benchmarks"]) - set(results["benchmarks"])):
+        print("{:<32} {:>12} (not run)".format(name, ""), file=sys.stderr)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the encoding, decoding and round trips of NBE frames"
+    )
+    parser.add_argument(
+        "-o", "--output", help="A file where to write the results", type=str
+    )
+    parser.add_argument(
+        "--compare",
+        help="A file with previous results to compare with (exits with 1 if a benchmark regressed)",
+        type=str,
+    )
+    parser.add_argument(
+        "--threshold",
+        help="The relative slowdown above which a benchmark regressed",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+    )
+    parser.add_argument(
+        "-k",
+        "--filter",
+        help="Only run the benchmarks whose name contains this string",
+        type=str,
+        default="",
+    )
+    parser.add_argument(
+        "--quick",
+        help="Run shorter benchmarks (less precise, e.g. for a CI smoke test)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--address",
+        help="The address where to simulate the burner for the end-to-end benchmarks",
+        type=str,
+        default=DEFAULT_SIMULATOR_ADDRESS,
+    )
+    parser.add_argument(
+        "--no-e2e",
+        help="Skip the end-to-end benchmarks (and the startup benchmarks that need a simulated burner)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--startup-budget",
+        help="The maximum time a command may spend importing modules, in milliseconds (exits with 1 if a startup "
+        "benchmark exceeds it)",
+        type=float,
+    )
+
+    args = parser.parse_args()
+
+    benchmarks = {}
+    for name, operation, items in micro_benchmarks(quick=args.quick):
+        if args.filter in name:
+            benchmarks[name] = time_operation(
+                operation,
+                items=items,
+                repeat=3 if args.quick else 5,
+                min_duration=0.05 if args.quick else 0.2,
+            )
+            print(
+                "{:<32} {:>12}".format(name, _value(benchmarks[name])), file=sys.stderr
+            )
+
+    if not args.no_e2e:
+        for name, result in end_to_end_benchmarks(
+            args.address, 2000 if args.quick else 20000, pattern=args.filter
+        ).items():
+            benchmarks[name] = result
+            print("{:<32} {:>12}".format(name, _value(result)), file=sys.stderr)
+
+    for name, result in startup_benchmarks(
+        None if args.no_e2e else args.address,
+        repeat=3 if args.quick else 5,
+        pattern=args.filter,
+    ).items():
+        benchmarks[name] = result
+        print("{:<32} {:>12}".format(name, _value(result)), file=sys.stderr)
+
+    results = dict(
+        metadata=dict(
+            date=datetime.datetime.now().isoformat(),
+            commit=_git_commit(),
+            python=platform.python_version(),
+            implementation=platform.python_implementation(),
+            platform=platform.platform(),
+            numpy=getattr(bulk.numpy, "__version__", None),
+            quick=args.quick,
+        ),
+        benchmarks=benchmarks,
+    )
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare is not None:
+        with open(args.compare, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        if compare(baseline, results, threshold=args.threshold):
+            exit(1)
+
+    if args.startup_budget is not None:
+        over_budget = [
+            name
+            for name, result in sorted(benchmarks.items())
+            if name.startswith("startup.")
+            and name.endswith(".imports")
+            and result["min"] > args.startup_budget
+        ]
+        for name in over_budget:
+            print(
+                "{} spends {} ms importing modules (budget: {} ms)".format(
+                    name, benchmarks[name]["min"], args.startup_budget
+                ),
+                file=sys.stderr,
+            )
+
+        if over_budget:
+            exit(1)
+
+
+@contextlib.contextmanager
+def _simulator(address):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "pyduro.simulator", "--address", address],
+        env=dict(os.environ, PYTHONPATH=SOURCE_DIRECTORY),
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    try:
+        # Wait for the simulator to be ready
+        process.stdout.readline()
+
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _run_cli(arguments, importtime=False):
+    return subprocess.run(
+        [sys.executable]
+        + (["-X", "importtime"] if importtime else [])
+        + ["-m", "pyduro"]
+        + arguments,
+        env=dict(os.environ, PYTHONPATH=SOURCE_DIRECTORY),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+
+def _import_time(process):
+    # Every line is "import time: <self, in us> | <cumulative, in us> | <module>", after a header
+    total = 0
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:"):
+            duration = line[len("import time:") :].split("|")[0].strip()
+            if duration.isdigit():
+                total += int(duration)
+
+    return total / 1000
+
+
+def _imported_modules(process):
+    return set(
+        line.rpartition("|")[2].strip()
+        for line in process.stderr.splitlines()
+        if line.startswith("import time:")
+    )
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _value(result):
+    return (
+        result.get("rate") if result.get("unit") == "requests/s" else result.get("min")
+    )
+
+
+# --------------------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    main()
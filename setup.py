@@ -25,6 +25,8 @@ setup(
         "Development Status :: 4 - Beta",
     ],
     description="A Pypi library to communicate with Aduro (H1) wood/pellet burner via NBE communication",
+    entry_points={"console_scripts": ["pyduro = pyduro.__main__:main"]},
+    extras_require={"numpy": ["numpy"]},
     install_requires=[],
     keywords="aduro h1 wood pellet burner nbe",
     license="MIT",
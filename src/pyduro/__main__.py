@@ -4,14 +4,23 @@
 # --------------------------------------------------------------------------------------------------
 
 import argparse
-import json
+import collections
+import sys
 
-from pyduro.actions import FUNCTIONS, STATUS_PARAMS, discover, get, set, raw
+# Only what the parser itself needs is imported here: every action imports its own modules (and `json`) when it runs,
+# and only the arguments of the action being run are defined, so that a short command starts as fast as possible.
 
 # --------------------------------------------------------------------------------------------------
 
+# The global options followed by a value (see `_find_action`)
+VALUED_OPTIONS = ("-b", "--burner", "-s", "--serial", "-p", "--pin", "--socket")
+
+# --------------------------------------------------------------------------------------------------
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
 
-def main():
     parser = argparse.ArgumentParser(
         prog="PyDuro",
         description="Discover, query or modify an Aduro wood/pellet burner using the NBE communication protocol",
@@ -40,104 +49,985 @@ def main():
         help="Display the raw frames sent and received",
         action="store_true",
     )
+    parser.add_argument(
+        "--socket",
+        help="The socket of the daemon (see the serve action, default: $PYDURO_SOCKET or pyduro.sock in the private "
+        "pyduro-<uid> directory of the temporary directory)",
+        type=str,
+    )
+    parser.add_argument(
+        "--no-daemon",
+        help="Talk to the burner directly, even if a daemon is running",
+        action="store_true",
+    )
 
     # create sub-parser
     sub_parsers = parser.add_subparsers(title="Action", dest="action")
 
-    sub_parsers.add_parser("discover", help="Discover any burner on your network")
+    action = _find_action(argv)
+    for name, (description, add_arguments, _) in ACTIONS.items():
+        sub_parser = sub_parsers.add_parser(name, help=description)
+        if name == action:
+            add_arguments(sub_parser)
 
-    sub_parsers.add_parser("status", help="Get status of the burner")
+    args = parser.parse_args(argv)
 
-    parser_get = sub_parsers.add_parser("get", help="Get information from a burner")
-    parser_get.add_argument(
-        "function_name",
-        help="Specify the part of the burner you want to query",
-        type=str,
-        choices=FUNCTIONS,
+    # The library logs the burners that don't answer in time (or with a malformed frame): print them, as always
+    import logging
+
+    logging.basicConfig(format="%(message)s", stream=sys.stdout)
+
+    ACTIONS[args.action or "discover"][2](args)
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def _add_discover_arguments(parser):
+    from pyduro.actions import DEFAULT_DISCOVERY_WINDOW
+
+    parser.add_argument(
+        "-a",
+        "--all",
+        help="Wait for every burner to answer instead of stopping at the first one",
+        action="store_true",
     )
-    parser_get.add_argument(
-        "path",
-        help="The path for your query",
+    parser.add_argument(
+        "-w",
+        "--window",
+        help="How long to wait for burners to answer when discovering all of them, in seconds",
+        type=float,
+        default=DEFAULT_DISCOVERY_WINDOW,
+    )
+    parser.add_argument(
+        "-e",
+        "--expected",
+        help="Stop discovering all burners as soon as this number of burners answered",
+        type=int,
+    )
+    parser.add_argument(
+        "--broadcast",
+        help="The address where to broadcast the discovery (can be given several times, one for each subnet)",
         type=str,
-        nargs="?",
+        action="append",
     )
 
-    parser_raw = sub_parsers.add_parser("raw", help="Send raw request to a burner")
-    parser_raw.add_argument(
-        "function_id",
-        help="Specify the function you want to call on the burner",
+
+def _discover(args):
+    from pyduro.actions import discover
+
+    if args.action == "discover" and (args.all or args.broadcast):
+        import json
+
+        from pyduro.actions import DEFAULT_DISCOVERY_ADDRESS
+
+        responses = discover.run_all(
+            window=args.window,
+            expected=args.expected,
+            broadcast_addresses=args.broadcast or (DEFAULT_DISCOVERY_ADDRESS,),
+            verbose=args.verbose,
+        )
+
+        print(
+            json.dumps(
+                [
+                    dict(
+                        address=response.burner_address,
+                        serial=response.serial,
+                        payload=response.parse_payload(),
+                    )
+                    for response in responses
+                ],
+                indent=2,
+            )
+        )
+
+        exit(0 if responses else 1)
+
+    _output(
+        args,
+        discover.run(verbose=args.verbose, transport=_connect_daemon(args)),
+    )
+
+
+def _add_no_arguments(parser):
+    pass
+
+
+def _status(args):
+    from pyduro.actions import status as status_action
+
+    _output(
+        args,
+        status_action.run(
+            burner_address=args.burner,
+            serial=args.serial,
+            pin_code=args.pin,
+            verbose=args.verbose,
+            transport=_connect_daemon(args),
+        ),
+    )
+
+
+def _add_watch_arguments(parser):
+    from pyduro.actions import DEFAULT_WATCH_INTERVAL
+    from pyduro.protocol import DEFAULT_TIMEOUT
+
+    parser.add_argument(
+        "-i",
+        "--interval",
+        help="The duration between two status requests, in seconds",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+    )
+    parser.add_argument(
+        "-n",
+        "--count",
+        help="Stop after outputting this number of changes",
         type=int,
     )
-    parser_raw.add_argument(
-        "payload",
-        help="The payload of your request",
+    parser.add_argument(
+        "--timeout",
+        help="The maximum duration to wait for each status, in seconds",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+    )
+    parser.add_argument(
+        "--record",
+        help="A directory where to record every status as time series (see `pyduro.recorder`)",
+        type=str,
+    )
+    parser.add_argument(
+        "--capture",
+        help="A file where to capture every frame sent and received (see `pyduro.protocol.capture`)",
         type=str,
-        nargs="?",
     )
 
-    parser_set = sub_parsers.add_parser("set", help="Update setting of a burner")
-    parser_set.add_argument(
-        "path",
-        help="The path for your modification",
+
+def _watch(args):
+    import json
+
+    from pyduro.client import Burner, BurnerClient
+
+    burner = Burner(args.burner, args.serial, args.pin)
+
+    recorder = None
+    if args.record is not None:
+        from pyduro.recorder import StatusRecorder
+
+        recorder = StatusRecorder(args.record)
+
+    capture = None
+    if args.capture is not None:
+        from pyduro.protocol.capture import CaptureWriter
+
+        capture = CaptureWriter(args.capture)
+
+    try:
+        with BurnerClient(timeout=args.timeout, capture=capture) as client:
+            for count, delta in enumerate(
+                client.watch(burner, interval=args.interval), 1
+            ):
+                if recorder is not None:
+                    recorder.record(burner.serial, delta.status, delta.timestamp)
+
+                print(
+                    json.dumps(dict(timestamp=delta.timestamp, changes=delta.changes)),
+                    flush=True,
+                )
+
+                if args.count is not None and count >= args.count:
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if capture is not None:
+            capture.close()
+
+    exit(0)
+
+
+def _add_events_arguments(parser):
+    from pyduro.actions import history
+    from pyduro.protocol import DEFAULT_TIMEOUT
+
+    parser.add_argument(
+        "--since",
+        help='The oldest event to get, as "YYYY-MM-DD[ HH:MM:SS]" (the whole event log if not given)',
+        type=_parse_datetime,
+    )
+    parser.add_argument(
+        "--until",
+        help='The time before which the events are wanted, as "YYYY-MM-DD[ HH:MM:SS]" (now if not given)',
+        type=_parse_datetime,
+    )
+    parser.add_argument(
+        "-w",
+        "--window",
+        help="With --since, the number of days covered by each of the time windows fetched concurrently",
+        type=float,
+        default=history.DEFAULT_EVENT_LOG_WINDOW / 86400,
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        help="The maximum number of time windows fetched at the same time",
+        type=int,
+        default=history.DEFAULT_EVENT_LOG_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--timeout",
+        help="The maximum duration to wait for each page, in seconds",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+    )
+
+
+def _events(args):
+    import json
+
+    from pyduro.actions import history
+    from pyduro.protocol import NoResponseException
+
+    try:
+        for event in history.stream_events(
+            burner_address=args.burner,
+            serial=args.serial,
+            pin_code=args.pin,
+            since=args.since,
+            until=args.until,
+            window=args.window * 86400,
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+            verbose=args.verbose,
+            transport=_connect_daemon(args),
+        ):
+            print(
+                json.dumps(
+                    dict(timestamp=event.timestamp.isoformat(), record=event.record)
+                ),
+                flush=True,
+            )
+    except NoResponseException as e:
+        print(e.message)
+
+        exit(1)
+
+    exit(0)
+
+
+def _add_get_arguments(parser):
+    from pyduro.actions import FUNCTIONS
+
+    parser.add_argument(
+        "function_name",
+        help="Specify the part of the burner you want to query",
         type=str,
+        choices=FUNCTIONS,
     )
-    parser_set.add_argument(
-        "value",
-        help="The payload for your modification",
+    parser.add_argument(
+        "path",
+        help='The path for your query (e.g. "boiler.temp" for settings, "total_days" for consumption, or "all" with '
+        "settings, range or consumption to get every settings group or consumption history at once)",
         type=str,
+        nargs="?",
+    )
+    parser.add_argument(
+        "-r",
+        "--ranges",
+        help='With "settings all", also get the range of every setting',
+        action="store_true",
     )
 
-    args = parser.parse_args()
 
-    response = None
-    if args.action is None or args.action == "discover":
-        response = discover.run(verbose=args.verbose)
-    elif args.action == "status":
-        response = raw.run(
+def _get(args):
+    from pyduro.actions import get
+
+    if not args.path and args.function_name in ("settings", "consumption"):
+        from pyduro.actions import CONSUMPTION_DATA, SETTINGS
+        from pyduro.protocol import InvalidPathException
+
+        # Unlike the actions, the command line also accepts "all"
+        paths = SETTINGS if args.function_name == "settings" else CONSUMPTION_DATA
+        print(InvalidPathException(paths + ("all",)).message)
+
+        exit(1)
+
+    if args.path == "all" and args.function_name in get.SETTINGS_FUNCTIONS:
+        import json
+
+        function_names = (args.function_name,)
+        if args.ranges and args.function_name == "settings":
+            function_names = ("settings", "range")
+
+        settings = get.run_settings(
+            burner_address=args.burner,
+            serial=args.serial,
+            pin_code=args.pin,
+            function_names=function_names,
+            verbose=args.verbose,
+            transport=_connect_daemon(args),
+        )
+
+        print(json.dumps(settings, sort_keys=True, indent=2))
+
+        exit(
+            0
+            if all(
+                fields is not None
+                for groups in settings.values()
+                for fields in groups.values()
+            )
+            else 1
+        )
+
+    if args.path == "all" and args.function_name == "consumption":
+        import json
+
+        from pyduro.actions import history
+
+        consumption = history.run_consumption(
             burner_address=args.burner,
             serial=args.serial,
             pin_code=args.pin,
-            function_id=11,
-            payload="*",
             verbose=args.verbose,
+            transport=_connect_daemon(args),
         )
-    elif args.action == "get":
-        response = get.run(
+
+        print(json.dumps(consumption, sort_keys=True, indent=2))
+
+        exit(0 if None not in consumption.values() else 1)
+
+    _output(
+        args,
+        get.run(
             burner_address=args.burner,
             serial=args.serial,
             pin_code=args.pin,
             function_name=args.function_name,
             path=args.path,
             verbose=args.verbose,
-        )
-    elif args.action == "raw":
-        response = raw.run(
+            transport=_connect_daemon(args),
+        ),
+    )
+
+
+def _add_raw_arguments(parser):
+    parser.add_argument(
+        "function_id",
+        help="Specify the function you want to call on the burner",
+        type=int,
+    )
+    parser.add_argument(
+        "payload",
+        help="The payload of your request",
+        type=str,
+        nargs="?",
+    )
+
+
+def _raw(args):
+    from pyduro.actions import raw
+
+    _output(
+        args,
+        raw.run(
             burner_address=args.burner,
             serial=args.serial,
             pin_code=args.pin,
             function_id=args.function_id,
             payload=args.payload,
             verbose=args.verbose,
+            transport=_connect_daemon(args),
+        ),
+    )
+
+
+def _add_poll_arguments(parser):
+    from pyduro.fleet import DEFAULT_CONCURRENCY, DEFAULT_RETRIES
+    from pyduro.protocol import DEFAULT_TIMEOUT
+    from pyduro.protocol.scheduler import DEFAULT_BURST
+
+    parser.add_argument(
+        "queries",
+        help='The queries to run on every burner, as "<function name>[:<path>]" (e.g. "operating:boiler_temp")',
+        type=str,
+        nargs="+",
+    )
+    parser.add_argument(
+        "-t",
+        "--target",
+        help='A burner to query, as "<address>,<serial>,<pin code>" (can be given several times)',
+        type=str,
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        help='A file listing the burners to query, one "<address>,<serial>,<pin code>" per line',
+        type=str,
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        help="The maximum number of requests in flight at the same time",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--timeout",
+        help="The maximum duration to wait for each response, in seconds",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+    )
+    parser.add_argument(
+        "--retries",
+        help="How many times a request is sent again when a burner doesn't answer",
+        type=int,
+        default=DEFAULT_RETRIES,
+    )
+    parser.add_argument(
+        "--rate",
+        help="The maximum number of requests sent to each burner per second (no limit if not given)",
+        type=float,
+    )
+    parser.add_argument(
+        "--burst",
+        help="The maximum number of requests sent to each burner in a row, when a rate is given",
+        type=int,
+        default=DEFAULT_BURST,
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        help="The maximum number of requests in flight for each burner, when a rate is given",
+        type=int,
+    )
+    parser.add_argument(
+        "--capture",
+        help="A file where to capture every frame sent and received (see `pyduro.protocol.capture`)",
+        type=str,
+    )
+    parser.add_argument(
+        "--metrics",
+        help="A file where to write the metrics of every burner (requests, timeouts, round trip times...), in the "
+        "Prometheus text format",
+        type=str,
+    )
+
+
+def _poll(args):
+    import json
+
+    from pyduro import fleet
+    from pyduro.protocol.transport import Transport
+
+    burners = _parse_burners(args)
+
+    scheduler = None
+    if args.rate is not None or args.max_in_flight is not None:
+        from pyduro.protocol.scheduler import Scheduler
+
+        scheduler = Scheduler(
+            rate=args.rate,
+            burst=args.burst,
+            max_in_flight=args.max_in_flight or args.concurrency,
+        )
+
+    capture = None
+    if args.capture is not None:
+        from pyduro.protocol.capture import CaptureWriter
+
+        capture = CaptureWriter(args.capture)
+
+    metrics = None
+    if args.metrics is not None:
+        from pyduro.protocol.metrics import Metrics
+
+        metrics = Metrics()
+
+    with Transport(scheduler=scheduler, capture=capture, metrics=metrics) as transport:
+        succeeded = True
+        for result in fleet.poll(
+            burners,
+            [fleet.parse_query(query) for query in args.queries],
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+            retries=args.retries,
+            transport=transport,
+        ):
+            output = dict(
+                address=result.burner.address,
+                serial=result.burner.serial,
+                function=result.function_name,
+                path=result.path,
+                attempts=result.attempts,
+            )
+            if result.error is not None:
+                succeeded = False
+                output["error"] = getattr(result.error, "message", str(result.error))
+            else:
+                succeeded = succeeded and result.response.status == 0
+                output["status"] = result.response.status
+                output["payload"] = result.response.parse_payload()
+
+            print(json.dumps(output), flush=True)
+
+    if capture is not None:
+        capture.close()
+    if metrics is not None:
+        with open(args.metrics, "w") as metrics_file:
+            metrics_file.write(metrics.to_prometheus())
+
+    exit(0 if succeeded else 1)
+
+
+def _add_sync_arguments(parser):
+    from pyduro.archive import DEFAULT_SYNC_CONCURRENCY
+    from pyduro.protocol import DEFAULT_TIMEOUT
+
+    parser.add_argument(
+        "database",
+        help="The SQLite database of the archive (created if needed)",
+        type=str,
+    )
+    parser.add_argument(
+        "-t",
+        "--target",
+        help='A burner to synchronize, as "<address>,<serial>,<pin code>" (can be given several times)',
+        type=str,
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        help='A file listing the burners to synchronize, one "<address>,<serial>,<pin code>" per line',
+        type=str,
+    )
+    parser.add_argument(
+        "--since",
+        help='The oldest event to get for a burner never synchronized before, as "YYYY-MM-DD[ HH:MM:SS]" (its whole '
+        "event log if not given)",
+        type=_parse_datetime,
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        help="The maximum number of burners being synchronized at the same time",
+        type=int,
+        default=DEFAULT_SYNC_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--timeout",
+        help="The maximum duration to wait for each page, in seconds",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+    )
+
+
+def _sync(args):
+    import json
+
+    from pyduro.archive import EventArchive
+
+    succeeded = True
+    with EventArchive(args.database) as archive:
+        for result in archive.sync_many(
+            _parse_burners(args),
+            since=args.since,
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+        ):
+            output = dict(
+                address=result.burner.address,
+                serial=result.burner.serial,
+                count=result.count,
+                cursor=None if result.cursor is None else result.cursor.isoformat(),
+            )
+            if result.error is not None:
+                succeeded = False
+                output["error"] = getattr(result.error, "message", str(result.error))
+
+            print(json.dumps(output), flush=True)
+
+    exit(0 if succeeded else 1)
+
+
+def _add_replay_arguments(parser):
+    from pyduro.protocol import DEFAULT_NBE_PORT
+
+    parser.add_argument(
+        "capture",
+        help="The capture file (see `--capture`)",
+        type=str,
+    )
+    parser.add_argument(
+        "--address",
+        help="The ip address where to serve the responses",
+        type=str,
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        help="The port where to serve the responses",
+        type=int,
+        default=DEFAULT_NBE_PORT,
+    )
+
+
+def _replay(args):
+    from pyduro.replay import ReplayServer
+
+    server = ReplayServer(args.capture, address=args.address, port=args.port)
+    print(
+        "Serving {} responses on {}:{}".format(
+            len(server), server.address, server.port
+        ),
+        flush=True,
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+    exit(0)
+
+
+def _add_load_arguments(parser):
+    from pyduro.protocol import DEFAULT_NBE_PORT, DEFAULT_TIMEOUT
+    from pyduro.replay import DEFAULT_LOAD_CONCURRENCY
+
+    parser.add_argument(
+        "capture",
+        help="The capture file (see `--capture`)",
+        type=str,
+    )
+    parser.add_argument(
+        "--address",
+        help="The ip address where to send the requests",
+        type=str,
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port",
+        help="The port where to send the requests",
+        type=int,
+        default=DEFAULT_NBE_PORT,
+    )
+    parser.add_argument(
+        "-n",
+        "--count",
+        help="The number of requests to send",
+        type=int,
+        default=1000,
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        help="The number of requests in flight at the same time",
+        type=int,
+        default=DEFAULT_LOAD_CONCURRENCY,
+    )
+    parser.add_argument(
+        "--timeout",
+        help="The maximum duration to wait for each response, in seconds",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+    )
+
+
+def _load(args):
+    import json
+
+    from pyduro.replay import load_test
+
+    report = load_test(
+        args.capture,
+        address=args.address,
+        port=args.port,
+        count=args.count,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+    )
+
+    print(json.dumps(report._asdict(), indent=2))
+
+    exit(0 if report.lost == 0 else 1)
+
+
+def _add_serve_arguments(parser):
+    from pyduro.daemon import DEFAULT_MAX_WAIT
+    from pyduro.protocol.scheduler import DEFAULT_BURST
+
+    parser.add_argument(
+        "--rate",
+        help="The maximum number of requests sent to each burner per second (no limit if not given)",
+        type=float,
+    )
+    parser.add_argument(
+        "--burst",
+        help="The maximum number of requests sent to each burner in a row, when a rate is given",
+        type=int,
+        default=DEFAULT_BURST,
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        help="The maximum number of requests in flight for each burner, when a rate is given",
+        type=int,
+    )
+    parser.add_argument(
+        "--max-wait",
+        help="The longest a request is kept in flight when its client neither gets a response nor gives up, in "
+        "seconds",
+        type=float,
+        default=DEFAULT_MAX_WAIT,
+    )
+
+
+def _serve(args):
+    import signal
+
+    from pyduro.daemon import Daemon
+    from pyduro.protocol import (
+        DaemonAlreadyRunningException,
+        DaemonSocketUnsafeException,
+    )
+
+    scheduler = None
+    if args.rate is not None or args.max_in_flight is not None:
+        from pyduro.fleet import DEFAULT_CONCURRENCY
+        from pyduro.protocol.scheduler import Scheduler
+
+        scheduler = Scheduler(
+            rate=args.rate,
+            burst=args.burst,
+            max_in_flight=args.max_in_flight or DEFAULT_CONCURRENCY,
         )
-    elif args.action == "set":
-        response = set.run(
+
+    try:
+        server = Daemon(args.socket, scheduler=scheduler, max_wait=args.max_wait)
+    except (DaemonAlreadyRunningException, DaemonSocketUnsafeException) as e:
+        print(e.message)
+
+        exit(1)
+
+    print("Serving on {}".format(server.path), flush=True)
+
+    # Stop as cleanly when stopped by a service manager as with Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+    exit(0)
+
+
+def _add_stats_arguments(parser):
+    parser.add_argument(
+        "--prometheus",
+        help="Output the metrics of every burner in the Prometheus text format",
+        action="store_true",
+    )
+
+
+def _stats(args):
+    import json
+
+    from pyduro import daemon
+
+    transport = daemon.connect(args.socket)
+    if transport is None:
+        print(
+            "No daemon is listening on '{}'!".format(
+                args.socket or daemon.default_socket_path()
+            )
+        )
+
+        exit(1)
+
+    with transport:
+        if args.prometheus:
+            print(transport.prometheus(), end="")
+        else:
+            print(json.dumps(transport.stats(), sort_keys=True, indent=2))
+
+    exit(0)
+
+
+def _add_set_arguments(parser):
+    parser.add_argument(
+        "path",
+        help="The path for your modification",
+        type=str,
+    )
+    parser.add_argument(
+        "value",
+        help="The payload for your modification",
+        type=str,
+    )
+
+
+def _set(args):
+    from pyduro.actions import set
+
+    _output(
+        args,
+        set.run(
             burner_address=args.burner,
             serial=args.serial,
             pin_code=args.pin,
             path=args.path,
             value=args.value,
             verbose=args.verbose,
-        )
+            transport=_connect_daemon(args),
+        ),
+    )
+
+
+# --------------------------------------------------------------------------------------------------
+
+# Every action, in the order of the help: its description, the function defining its arguments and the function running
+# it
+ACTIONS = collections.OrderedDict(
+    (
+        (
+            "discover",
+            ("Discover any burner on your network", _add_discover_arguments, _discover),
+        ),
+        ("status", ("Get status of the burner", _add_no_arguments, _status)),
+        (
+            "watch",
+            (
+                "Watch the status of the burner and output what changes",
+                _add_watch_arguments,
+                _watch,
+            ),
+        ),
+        (
+            "events",
+            (
+                "Get the event log of the burner, following its pages",
+                _add_events_arguments,
+                _events,
+            ),
+        ),
+        ("get", ("Get information from a burner", _add_get_arguments, _get)),
+        ("raw", ("Send raw request to a burner", _add_raw_arguments, _raw)),
+        (
+            "poll",
+            ("Query many burners at once, concurrently", _add_poll_arguments, _poll),
+        ),
+        (
+            "sync",
+            (
+                "Archive the events logged by many burners since their last synchronization",
+                _add_sync_arguments,
+                _sync,
+            ),
+        ),
+        (
+            "replay",
+            (
+                "Serve the responses of a capture file, as if the burner was there",
+                _add_replay_arguments,
+                _replay,
+            ),
+        ),
+        (
+            "load",
+            (
+                "Send the requests of a capture file again and again, and measure how fast they are answered",
+                _add_load_arguments,
+                _load,
+            ),
+        ),
+        (
+            "serve",
+            (
+                "Run a daemon keeping the socket to the burners, the cache and the metrics warm for every other "
+                "command",
+                _add_serve_arguments,
+                _serve,
+            ),
+        ),
+        (
+            "stats",
+            (
+                "Get the statistics and the metrics of the running daemon",
+                _add_stats_arguments,
+                _stats,
+            ),
+        ),
+        ("set", ("Update setting of a burner", _add_set_arguments, _set)),
+    )
+)
+
+# --------------------------------------------------------------------------------------------------
+
+
+def _find_action(argv):
+    # The action is the first argument naming one, skipping the values of the global options (so that only the
+    # arguments of this action have to be defined)
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument in VALUED_OPTIONS:
+            next(arguments, None)
+        elif argument in ACTIONS:
+            return argument
 
+    return None
+
+
+def _connect_daemon(args):
+    # Single burner actions go through the daemon when it is running
+    if args.no_daemon:
+        return None
+
+    import os
+
+    from pyduro.daemon_socket import default_socket_path
+
+    # Don't even load the daemon module when there is no socket to connect to
+    path = args.socket or default_socket_path()
+    if not os.path.exists(path):
+        return None
+
+    import atexit
+
+    from pyduro import daemon
+
+    transport = daemon.connect(path)
+    if transport is not None:
+        atexit.register(transport.close)
+
+    return transport
+
+
+def _output(args, response):
     if response:
         if args.action == "status":
-            status = response.parse_payload().split(",")
-            i = 0
-            for key in STATUS_PARAMS:
-                STATUS_PARAMS[key] = status[i]
-                i += 1
-            print(json.dumps(STATUS_PARAMS))
+            import json
+
+            from pyduro.actions import status as status_action
+
+            status = status_action.decode(response)
+            if status is not None:
+                print(json.dumps(status_action.STATUS_SCHEMA.to_dict(status)))
+            else:
+                print(response.parse_payload())
         elif args.action == "get":
+            import json
+
             print(json.dumps(response.parse_payload(), sort_keys=True, indent=2))
         else:
             print(response.parse_payload())
@@ -147,6 +1037,39 @@ def main():
     exit(1)
 
 
+def _parse_burners(args):
+    from pyduro import fleet
+    from pyduro.client import Burner
+
+    burners = [fleet.parse_burner(target) for target in args.target]
+    if args.burner is not None:
+        burners.append(Burner(args.burner, args.serial, args.pin))
+    if args.file is not None:
+        with open(args.file, "r") as burners_file:
+            burners.extend(
+                fleet.parse_burner(line)
+                for line in burners_file
+                if line.strip() and not line.startswith("#")
+            )
+
+    return burners
+
+
+def _parse_datetime(value):
+    import datetime
+
+    for date_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(value, date_format)
+        except ValueError:
+            pass
+
+    raise argparse.ArgumentTypeError(
+        "'{}' is not a valid date (expected YYYY-MM-DD[ HH:MM:SS])".format(value)
+    )
+
+
 # --------------------------------------------------------------------------------------------------
 
-main()
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 # --------------------------------------------------------------------------------------------------
 
 DEFAULT_DISCOVERY_ADDRESS = "255.255.255.255"
+DEFAULT_DISCOVERY_WINDOW = 3
+DEFAULT_WATCH_INTERVAL = 5
 
 FUNCTIONS = [
     "settings",
@@ -48,121 +50,126 @@ CONSUMPTION_DATA = (
     "counter",
 )
 
-STATUS_PARAMS= dict.fromkeys([
-    'boiler_temp',
-    'boiler_ref',
-    'content',
-    'dhw_temp',
-    'dhw_ref',
-    'dhw_valve_state',
-    'state',
-    'substate_sec',
-    'substate',
-    'ash_clean',
-    'compressor_clean',
-    'boiler_pump_state',
-    'house_valve_state',
-    'house_pump_state',
-    'house2_pump_state',
-    'exhaust_speed',
-    'off_on_alarm',
-    'chill_out',
-    'external_temp',
-    'forward_temp',
-    'forward_ref',
-    'mean_out_temp',
-    'distance',
-    'pressure',
-    'feed_high',
-    'feed_low',
-    'oxygen',
-    'oxygen_ref',
-    'photo_level',
-    'corr_low',
-    'corr_high',
-    'power_kw',
-    'return_temp',
-    'flow1',
-    'corr_medium',
-    'shaft_temp',
-    'power_pct',
-    'smoke_temp',
-    'internet_uptime',
-    'sun_pumpspeed',
-    'sun_temp',
-    'sun2_temp',
-    'sun_power_kw',
-    'sun_dhw_temp',
-    'city',
-    'outdoor_temp',
-    'house2_valve_state',
-    'clouds',
-    'mean2_out_temp',
-    'humidity',
-    'wind_direction',
-    'chill2_out',
-    'air_pressure',
-    'wind_speed',
-    'forward2_temp',
-    'forward2_ref',
-    'boiler.diff_over',
-    'auger.kw_min',
-    'auger.kw_max',
-    'auger.auger_capacity',
-    'hot_water.diff_under',
-    'hot_water.output',
-    'hot_water.timer',
-    'regulation.boiler_gain_i',
-    'regulation.boiler_gain_p',
-    'hopper.trip1',
-    'hopper.trip2',
-    'hopper.auger_capacity',
-    'wifi.router',
-    'cleaning.output_ash',
-    'cleaning.output_burner',
-    'cleaning.output_boiler1',
-    'cleaning.output_boiler2',
-    'cleaning.pressure_t7',
-    'pump.output',
-    'pump.start_temp_run',
-    'pump.start_temp_idle',
-    'weather.active',
-    'weather.output_pump',
-    'weather.output_up',
-    'weather.output_down',
-    'weather2.active',
-    'weather2.output_pump',
-    'weather2.output_up',
-    'weather2.output_down',
-    'fan.output_exhaust',
-    'fan.exhaust_10',
-    'fan.exhaust_50',
-    'fan.exhaust_100',
-    'sun.output_pump',
-    'sun.output_excess',
-    'consumption_midnight',
-    'consumption_total',
-    'consumption_heat_vvb',
-    'time',
-    'sun_pump_state',
-    'sun_surplus_state',
-    'state_super',
-    'state_sec',
-    'regulation.fixed_power',
-    'operation_mode',
-    'co_yellow',
-    'co_red',
-    'setup.varmluft_setpunkt',
-    'drift.back_pressure',
-    'drift.varmeblaeser_pct',
-    'drift.t1_temp',
-    'drift.wifi_load',
-    'drift.co',
-    'setup.min_beholdning',
-    'compressor_countdown',
-    'drift.vacuum_aktiv',
-    'vacuum_time',
-    'drift.askeskuffekontakt',
-    'drift.askeskuffe_minutter',
-    'boiler.timer']
+# The fields of the status vector (function 11), in the order they are sent by the burner, with their type and unit
+STATUS_FIELDS = (
+    ("boiler_temp", float, "°C"),
+    ("boiler_ref", float, "°C"),
+    ("content", float, "kg"),
+    ("dhw_temp", float, "°C"),
+    ("dhw_ref", float, "°C"),
+    ("dhw_valve_state", int, None),
+    ("state", int, None),
+    ("substate_sec", int, "s"),
+    ("substate", int, None),
+    ("ash_clean", float, None),
+    ("compressor_clean", float, None),
+    ("boiler_pump_state", int, None),
+    ("house_valve_state", int, None),
+    ("house_pump_state", int, None),
+    ("house2_pump_state", int, None),
+    ("exhaust_speed", float, "%"),
+    ("off_on_alarm", int, None),
+    ("chill_out", float, "°C"),
+    ("external_temp", float, "°C"),
+    ("forward_temp", float, "°C"),
+    ("forward_ref", float, "°C"),
+    ("mean_out_temp", float, "°C"),
+    ("distance", float, None),
+    ("pressure", float, None),
+    ("feed_high", float, None),
+    ("feed_low", float, None),
+    ("oxygen", float, "%"),
+    ("oxygen_ref", float, "%"),
+    ("photo_level", float, None),
+    ("corr_low", float, None),
+    ("corr_high", float, None),
+    ("power_kw", float, "kW"),
+    ("return_temp", float, "°C"),
+    ("flow1", float, None),
+    ("corr_medium", float, None),
+    ("shaft_temp", float, "°C"),
+    ("power_pct", float, "%"),
+    ("smoke_temp", float, "°C"),
+    ("internet_uptime", float, None),
+    ("sun_pumpspeed", float, "%"),
+    ("sun_temp", float, "°C"),
+    ("sun2_temp", float, "°C"),
+    ("sun_power_kw", float, "kW"),
+    ("sun_dhw_temp", float, "°C"),
+    ("city", str, None),
+    ("outdoor_temp", float, "°C"),
+    ("house2_valve_state", int, None),
+    ("clouds", float, None),
+    ("mean2_out_temp", float, "°C"),
+    ("humidity", float, "%"),
+    ("wind_direction", float, "°"),
+    ("chill2_out", float, "°C"),
+    ("air_pressure", float, "hPa"),
+    ("wind_speed", float, "m/s"),
+    ("forward2_temp", float, "°C"),
+    ("forward2_ref", float, "°C"),
+    ("boiler.diff_over", float, None),
+    ("auger.kw_min", float, "kW"),
+    ("auger.kw_max", float, "kW"),
+    ("auger.auger_capacity", float, None),
+    ("hot_water.diff_under", float, None),
+    ("hot_water.output", float, None),
+    ("hot_water.timer", float, None),
+    ("regulation.boiler_gain_i", float, None),
+    ("regulation.boiler_gain_p", float, None),
+    ("hopper.trip1", float, None),
+    ("hopper.trip2", float, None),
+    ("hopper.auger_capacity", float, None),
+    ("wifi.router", str, None),
+    ("cleaning.output_ash", float, None),
+    ("cleaning.output_burner", float, None),
+    ("cleaning.output_boiler1", float, None),
+    ("cleaning.output_boiler2", float, None),
+    ("cleaning.pressure_t7", float, None),
+    ("pump.output", float, None),
+    ("pump.start_temp_run", float, None),
+    ("pump.start_temp_idle", float, None),
+    ("weather.active", int, None),
+    ("weather.output_pump", float, None),
+    ("weather.output_up", float, None),
+    ("weather.output_down", float, None),
+    ("weather2.active", int, None),
+    ("weather2.output_pump", float, None),
+    ("weather2.output_up", float, None),
+    ("weather2.output_down", float, None),
+    ("fan.output_exhaust", float, None),
+    ("fan.exhaust_10", float, "%"),
+    ("fan.exhaust_50", float, "%"),
+    ("fan.exhaust_100", float, "%"),
+    ("sun.output_pump", float, None),
+    ("sun.output_excess", float, None),
+    ("consumption_midnight", float, "kg"),
+    ("consumption_total", float, "kg"),
+    ("consumption_heat_vvb", float, "kg"),
+    ("time", str, None),
+    ("sun_pump_state", int, None),
+    ("sun_surplus_state", int, None),
+    ("state_super", int, None),
+    ("state_sec", int, "s"),
+    ("regulation.fixed_power", float, None),
+    ("operation_mode", int, None),
+    ("co_yellow", float, None),
+    ("co_red", float, None),
+    ("setup.varmluft_setpunkt", float, None),
+    ("drift.back_pressure", float, None),
+    ("drift.varmeblaeser_pct", float, "%"),
+    ("drift.t1_temp", float, "°C"),
+    ("drift.wifi_load", float, None),
+    ("drift.co", float, None),
+    ("setup.min_beholdning", float, "kg"),
+    ("compressor_countdown", int, "s"),
+    ("drift.vacuum_aktiv", int, None),
+    ("vacuum_time", int, "s"),
+    ("drift.askeskuffekontakt", int, None),
+    ("drift.askeskuffe_minutter", float, None),
+    ("boiler.timer", float, None),
 )
+
+# Deprecated: use `status.decode` (or `StatusSchema`) instead, which give the typed value of every field.
+# Kept for backward compatibility: the name of every field of the status vector, without any value.
+STATUS_PARAMS = dict.fromkeys(name for name, _, _ in STATUS_FIELDS)
@@ -2,7 +2,7 @@
 
 # --------------------------------------------------------------------------------------------------
 
-from pyduro.actions import DEFAULT_DISCOVERY_ADDRESS
+from pyduro.actions import DEFAULT_DISCOVERY_ADDRESS, DEFAULT_DISCOVERY_WINDOW
 from pyduro.protocol import (
     FUNCTIONS,
     PAYLOADS,
@@ -10,11 +10,25 @@ from pyduro.protocol import (
     PayloadToLargeException,
 )
 from pyduro.protocol.frame import Frame
+from pyduro.protocol.transport import Transport
 
 # --------------------------------------------------------------------------------------------------
 
 
-def run(verbose=False):
+def build_frame():
+    """
+    Build the "Discovery" frame.
+
+    Returns:
+        frame (Frame): The frame to broadcast.
+    """
+
+    return Frame(
+        "<serial>", "<pin>", FUNCTIONS.discover.value, PAYLOADS.discovery.value
+    )
+
+
+def run(verbose=False, transport=None):
     """
     Run the discovery of burner(s) in the local network.
     This trigger a specific "Discovery" frame on an UDP broadcat and wait for any burner(s) to send back a response
@@ -22,17 +36,109 @@ def run(verbose=False):
     Args:
         verbose (bool): Indicates if we want the frame to be printed before sending it.
             Default: False
+        transport (Transport): The transport to use to send the frame.
+            If none is given, a temporary one will be opened (and closed) just for this request.
+            Default: None
     """
 
     try:
-        frame = Frame(
-            "<serial>", "<pin>", FUNCTIONS.discover.value, PAYLOADS.discovery.value
-        )
+        frame = build_frame()
 
-        response = frame.send(DEFAULT_DISCOVERY_ADDRESS, verbose=verbose)
+        response = frame.send(
+            DEFAULT_DISCOVERY_ADDRESS, verbose=verbose, transport=transport
+        )
 
         return response
     except FunctionNotFoundException as e:
         print(e.message)
     except PayloadToLargeException as e:
         print(e.message)
+
+
+def stream(
+    window=DEFAULT_DISCOVERY_WINDOW,
+    expected=None,
+    broadcast_addresses=(DEFAULT_DISCOVERY_ADDRESS,),
+    verbose=False,
+    transport=None,
+):
+    """
+    Run the discovery of every burner in the local network(s).
+    The "Discovery" frame is broadcasted on every given address at once, and the responses are yielded as soon as they
+    are received, until the window is over or the expected number of burners answered.
+
+    Args:
+        window (float): The duration during which we wait for burners to answer, in seconds.
+            Default: 3
+        expected (int): The number of burners we expect to find. The discovery stops as soon as they all answered.
+            Default: None (always wait for the whole window)
+        broadcast_addresses (list(str)): The addresses where to broadcast the frame (e.g. the broadcast address of each
+            of your subnets).
+            Default: ("255.255.255.255",)
+        verbose (bool): Indicates if we want the frames to be printed.
+            Default: False
+        transport (Transport): The transport to use to send the frame.
+            If none is given, a temporary one will be opened (and closed) just for this discovery.
+            Default: None
+
+    Yields:
+        response (Response): The response of each burner found (only once per serial number).
+            Use its `burner_address` and `serial` attributes to identify the burner.
+    """
+
+    if transport is None:
+        with Transport() as transport:
+            yield from stream(
+                window=window,
+                expected=expected,
+                broadcast_addresses=broadcast_addresses,
+                verbose=verbose,
+                transport=transport,
+            )
+
+        return
+
+    found = set()
+
+    responses = transport.collect(
+        build_frame(), list(broadcast_addresses), window, verbose=verbose
+    )
+    try:
+        for response in responses:
+            if response.serial in found:
+                continue
+
+            found.add(response.serial)
+
+            yield response
+
+            if expected is not None and len(found) >= expected:
+                return
+    finally:
+        responses.close()
+
+
+def run_all(
+    window=DEFAULT_DISCOVERY_WINDOW,
+    expected=None,
+    broadcast_addresses=(DEFAULT_DISCOVERY_ADDRESS,),
+    verbose=False,
+    transport=None,
+):
+    """
+    Run the discovery of every burner in the local network(s).
+    See `stream` for the details.
+
+    Returns:
+        responses (list(Response)): The response of each burner found (only once per serial number).
+    """
+
+    return list(
+        stream(
+            window=window,
+            expected=expected,
+            broadcast_addresses=broadcast_addresses,
+            verbose=verbose,
+            transport=transport,
+        )
+    )
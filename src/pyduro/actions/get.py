@@ -1,20 +1,157 @@
 # -*- coding: utf-8 -*-
 
 # --------------------------------------------------------------------------------------------------
+import logging
 import time
 
 from pyduro.actions import CONSUMPTION_DATA, SETTINGS
 from pyduro.protocol import (
     FUNCTIONS,
     FunctionNotFoundException,
+    InvalidPathException,
     PayloadToLargeException,
 )
-from pyduro.protocol.frame import Frame
+from pyduro.protocol.frame import Frame, Response
+from pyduro.protocol.transport import Transport
 
 # --------------------------------------------------------------------------------------------------
 
+logger = logging.getLogger(__name__)
 
-def run(burner_address, serial, pin_code, function_name, path="*", verbose=False):
+# The functions that can be run for every settings group at once
+SETTINGS_FUNCTIONS = ("settings", "range")
+
+# --------------------------------------------------------------------------------------------------
+
+
+def build_frame(serial, pin_code, function_name, path="*"):
+    """
+    Build the frame to get information from a burner.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        function_name (str): The name of the function you want to run.
+        path (str): The path of the payload to load from the burner (or the payload).
+
+    Returns:
+        frame (Frame): The frame to send to the burner.
+
+    Throws:
+        FunctionNotFoundException: If the given function name is not valid.
+        InvalidPathException: If the given path is not valid for the function.
+        PayloadToLargeException: If the given path is too long.
+    """
+
+    function_id = None
+
+    if function_name == "settings":
+        function_id = FUNCTIONS.get_settings.value
+
+        if path is None or len(path) == 0:
+            raise InvalidPathException(SETTINGS)
+    if function_name == "range":
+        function_id = FUNCTIONS.get_settings_range.value
+    elif function_name == "operating":
+        function_id = FUNCTIONS.get_operating_data.value
+    elif function_name == "advanced":
+        function_id = FUNCTIONS.get_advanced_data.value
+    elif function_name == "consumption":
+        function_id = FUNCTIONS.get_consumption_data.value
+
+        if path is None or len(path) == 0 or path not in CONSUMPTION_DATA:
+            raise InvalidPathException(CONSUMPTION_DATA)
+    elif function_name == "chart":
+        function_id = FUNCTIONS.get_chart_data.value
+    elif function_name == "logs":
+        function_id = FUNCTIONS.get_event_log.value
+
+        path = (
+            time.strftime("%y%m%d:%H%M%S;", time.localtime())
+            if path is None or len(path) == 0 or path == "now"
+            else path
+        )
+    elif function_name == "info":
+        function_id = FUNCTIONS.get_info.value
+    elif function_name == "versions":
+        function_id = FUNCTIONS.get_sw_versions.value
+    elif function_name == "status":
+        function_id = FUNCTIONS.get_status.value
+
+    if function_id is None:
+        raise FunctionNotFoundException(function_name)
+
+    return Frame(serial, pin_code, function_id, path)
+
+
+def build_settings_frames(
+    serial, pin_code, function_names=("settings",), groups=SETTINGS
+):
+    """
+    Build the frames to get every settings group from a burner.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        function_names (tuple(str)): The functions to run for every group ("settings" and/or "range").
+            Default: ("settings",)
+        groups (tuple(str)): The settings groups to get.
+            Default: every group (see `pyduro.actions.SETTINGS`)
+
+    Returns:
+        frames (list(tuple(str, str, Frame))): The function name, the group and the frame of every request to send.
+
+    Throws:
+        FunctionNotFoundException: If one of the given function names is not a settings function.
+    """
+
+    for function_name in function_names:
+        if function_name not in SETTINGS_FUNCTIONS:
+            raise FunctionNotFoundException(function_name)
+
+    return [
+        (function_name, group, build_frame(serial, pin_code, function_name, group))
+        for function_name in function_names
+        for group in groups
+    ]
+
+
+def merge_settings(frames, responses):
+    """
+    Merges the responses to the frames built by `build_settings_frames` into a single nested dict.
+
+    Args:
+        frames (list(tuple(str, str, Frame))): The frames, as returned by `build_settings_frames`.
+        responses (list(Response)): The response to each frame, in the same order (`None`, or an exception, if there
+            was no response).
+
+    Returns:
+        settings (dict): The fields of every group, by function name and group (e.g.
+            `{"settings": {"boiler": {"temp": "65", ...}, ...}}`). A group the burner didn't answer (or answered with an
+            error) is `None`.
+    """
+
+    settings = {}
+    for (function_name, group, _), response in zip(frames, responses):
+        settings.setdefault(function_name, {})[group] = (
+            dict(response.fields)
+            if isinstance(response, Response) and response.status == 0
+            else None
+        )
+
+    return settings
+
+
+def run(
+    burner_address,
+    serial,
+    pin_code,
+    function_name,
+    path="*",
+    verbose=False,
+    transport=None,
+    cache=None,
+):
     """
     Get information from the given burner.
 
@@ -30,56 +167,112 @@ def run(burner_address, serial, pin_code, function_name, path="*", verbose=False
         path (str): The path of the payload to load from the burner (or the payload).
         verbose (bool): Indicates if we want the frame to be printed before sending it.
             Default: False
+        transport (Transport): The transport to use to send the frame.
+            If none is given, a temporary one will be opened (and closed) just for this request.
+            Default: None
+        cache (ResponseCache): The cache to use, to avoid asking the burner for data that rarely changes.
+            Default: None (no cache)
     """
 
     try:
-        function_id = None
-
-        if function_name == "settings":
-            function_id = FUNCTIONS.get_settings.value
-
-            if path is None or len(path) == 0:
-                print("You must pass one of the following as path: {}".format(SETTINGS))
-
-                return
-        if function_name == "range":
-            function_id = FUNCTIONS.get_settings_range.value
-        elif function_name == "operating":
-            function_id = FUNCTIONS.get_operating_data.value
-        elif function_name == "advanced":
-            function_id = FUNCTIONS.get_advanced_data.value
-        elif function_name == "consumption":
-            function_id = FUNCTIONS.get_consumption_data.value
-
-            if path is None or len(path) == 0 or path not in CONSUMPTION_DATA:
-                print(
-                    "You must pass one of the following as path: {}".format(
-                        CONSUMPTION_DATA
-                    )
-                )
-
-                return
-        elif function_name == "chart":
-            function_id = FUNCTIONS.get_chart_data.value
-        elif function_name == "logs":
-            function_id = FUNCTIONS.get_event_log.value
-
-            path = (
-                time.strftime("%y%m%d:%H%M%S;", time.localtime())
-                if path is None or len(path) == 0 or path == "now"
-                else path
-            )
-        elif function_name == "info":
-            function_id = FUNCTIONS.get_info.value
-        elif function_name == "versions":
-            function_id = FUNCTIONS.get_sw_versions.value
+        frame = build_frame(serial, pin_code, function_name, path)
+
+        if cache is not None:
+            response = cache.lookup(frame)
+            if response is not None:
+                return response
 
-        frame = Frame(serial, pin_code, function_id, path)
+        response = frame.send(burner_address, verbose=verbose, transport=transport)
 
-        response = frame.send(burner_address, verbose=verbose)
+        if cache is not None:
+            cache.store(frame, response)
 
         return response
     except FunctionNotFoundException as e:
         print(e.message)
+    except InvalidPathException as e:
+        print(e.message)
     except PayloadToLargeException as e:
         print(e.message)
+
+
+def run_settings(
+    burner_address,
+    serial,
+    pin_code,
+    function_names=("settings",),
+    groups=SETTINGS,
+    timeout=5,
+    verbose=False,
+    transport=None,
+):
+    """
+    Get every settings group from the given burner at once.
+    Every request is sent right away, over the same socket, so that this takes about a single round trip.
+
+    Args:
+        burner_address (str): The IP address of the burner.
+        serial (str): The serial number of the burner (this can often be found on a sticker somewhere on the burner).
+            Note that this should be a 6 characters string. Any longer string will be truncated and any shorter string
+            will be left padded with 0s.
+        pin_code (str): The secret pincode of the burner (this can often be found on a sticker somewhere on the burner).
+            Note that this should be a 10 characters string. Any longer string will be truncated and any shorter string
+            will be right padded with 0s.
+        function_names (tuple(str)): The functions to run for every group ("settings" and/or "range").
+            Default: ("settings",)
+        groups (tuple(str)): The settings groups to get.
+            Default: every group (see `pyduro.actions.SETTINGS`)
+        timeout (float): The maximum duration to wait for all the responses, in seconds.
+            Default: 5
+        verbose (bool): Indicates if we want the frames to be printed before sending them.
+            Default: False
+        transport (Transport): The transport to use to send the frames.
+            If none is given, a temporary one will be opened (and closed) just for these requests.
+            Default: None
+
+    Returns:
+        settings (dict): The fields of every group, by function name and group (see `merge_settings`).
+    """
+
+    if transport is None:
+        with Transport() as transport:
+            return run_settings(
+                burner_address,
+                serial,
+                pin_code,
+                function_names=function_names,
+                groups=groups,
+                timeout=timeout,
+                verbose=verbose,
+                transport=transport,
+            )
+
+    try:
+        frames = build_settings_frames(serial, pin_code, function_names, groups)
+    except FunctionNotFoundException as e:
+        print(e.message)
+
+        return None
+
+    futures = [
+        transport.submit(frame, burner_address, verbose=verbose)
+        for _, _, frame in frames
+    ]
+
+    done, _ = transport.wait(futures, timeout)
+
+    responses = []
+    for future in futures:
+        if future in done:
+            responses.append(future.result())
+        else:
+            transport.cancel(future)
+            responses.append(None)
+
+    if None in responses:
+        # Logged rather than printed, so that the settings printed as JSON are not mixed with it
+        logger.warning(
+            "No response received from a burner in less than %s seconds!", timeout
+        )
+
+    return merge_settings(frames, responses)
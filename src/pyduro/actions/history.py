@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import collections
+import datetime
+
+from pyduro.actions import CONSUMPTION_DATA
+from pyduro.actions.get import build_frame
+from pyduro.protocol import NoResponseException
+from pyduro.protocol.frame import Response
+from pyduro.protocol.transport import Transport
+
+# --------------------------------------------------------------------------------------------------
+
+Event = collections.namedtuple("Event", ["timestamp", "record"])
+Event.__doc__ = """
+Defines one record of the event log of a burner.
+
+Attributes:
+    timestamp (datetime.datetime): When the event happened, in the local time of the burner.
+    record (str): The rest of the record, as sent by the burner.
+"""
+
+# The format of the timestamps of the event log, which is also the format of its cursor
+EVENT_LOG_TIMESTAMP_FORMAT = "%y%m%d:%H%M%S"
+EVENT_LOG_TIMESTAMP_SIZE = 13
+
+# The duration covered by each of the time windows fetched concurrently, in seconds
+DEFAULT_EVENT_LOG_WINDOW = 7 * 24 * 3600
+# The maximum number of time windows fetched at the same time
+DEFAULT_EVENT_LOG_CONCURRENCY = 4
+
+# --------------------------------------------------------------------------------------------------
+
+
+def parse_events(payload):
+    """
+    Parses a page of the event log.
+
+    Args:
+        payload (str): The payload of an event log response (`;` separated records, each one starting with its
+            "yymmdd:hhmmss" timestamp).
+
+    Returns:
+        events (list(Event)): The events of the page, newest first. Records without a valid timestamp are ignored.
+    """
+
+    events = []
+    for record in payload.split(";"):
+        try:
+            timestamp = datetime.datetime.strptime(
+                record[:EVENT_LOG_TIMESTAMP_SIZE], EVENT_LOG_TIMESTAMP_FORMAT
+            )
+        except ValueError:
+            continue
+
+        events.append(
+            Event(timestamp, record[EVENT_LOG_TIMESTAMP_SIZE:].lstrip(",:= "))
+        )
+
+    events.sort(key=lambda event: event.timestamp, reverse=True)
+
+    return events
+
+
+def build_event_log_frame(serial, pin_code, cursor):
+    """
+    Build the frame to get the page of the event log before the given cursor.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        cursor (datetime.datetime): The time before which the events are wanted.
+
+    Returns:
+        frame (Frame): The frame to send to the burner.
+    """
+
+    return build_frame(
+        serial,
+        pin_code,
+        "logs",
+        "{};".format(cursor.strftime(EVENT_LOG_TIMESTAMP_FORMAT)),
+    )
+
+
+class _EventLogWindow:
+    """
+    Follows the pages of the event log between two timestamps, from the newest to the oldest.
+
+    Args:
+        start (datetime.datetime): The oldest timestamp of the window (included), or `None` for no limit.
+        end (datetime.datetime): The newest timestamp of the window (excluded).
+
+    Attributes:
+        cursor (datetime.datetime): The timestamp of the oldest event received so far.
+        done (bool): Whether or not every page of the window has been received.
+        events (collections.deque(Event)): The received events that have not been yielded yet.
+        start (datetime.datetime)
+    """
+
+    def __init__(self, start, end):
+        self.start = start
+        self.cursor = end
+        self.done = False
+        self.events = collections.deque()
+
+        # The events of the previous page at the cursor, which the next page can repeat (`None` before the first
+        # page, whose cursor is excluded)
+        self._boundary = None
+
+    def feed(self, events):
+        """
+        Adds the events of the page received for the next cursor, and moves the cursor to the oldest of them.
+
+        Args:
+            events (list(Event)): The events of the page, newest first.
+        """
+
+        received = [
+            event
+            for event in events
+            if event.timestamp < self.cursor
+            or (
+                event.timestamp == self.cursor
+                and self._boundary is not None
+                and event not in self._boundary
+            )
+        ]
+        if not received:
+            if events and self._boundary is not None:
+                # The page only repeats the events of the second of the cursor: go on with the events before it
+                self._boundary = None
+            else:
+                self.done = True
+
+            return
+
+        for event in received:
+            if self.start is not None and event.timestamp < self.start:
+                # The rest belongs to the next window
+                self.done = True
+
+                return
+
+            self.events.append(event)
+
+        oldest = received[-1].timestamp
+        boundary = set(event for event in received if event.timestamp == oldest)
+        if oldest == self.cursor and self._boundary is not None:
+            # Still in the same second: the next page repeats the events of the previous pages as well
+            boundary |= self._boundary
+
+        self._boundary = boundary
+        self.cursor = oldest
+
+    @property
+    def next_cursor(self):
+        """
+        Returns the cursor of the next page to get.
+        Once a page has been received, the next one starts a second after its oldest event: the events logged during
+        that same second that didn't fit in the page are not skipped (the ones already received are filtered out).
+        Once a page only repeats events already received, the next one starts at the second of its oldest event.
+        """
+
+        if self._boundary is None:
+            return self.cursor
+
+        return self.cursor + datetime.timedelta(seconds=1)
+
+
+def stream_events(
+    burner_address,
+    serial,
+    pin_code,
+    since=None,
+    until=None,
+    window=DEFAULT_EVENT_LOG_WINDOW,
+    concurrency=DEFAULT_EVENT_LOG_CONCURRENCY,
+    timeout=5,
+    verbose=False,
+    transport=None,
+):
+    """
+    Gets the event log of the given burner, following its pages, and yields the events as soon as they are received.
+
+    A single response only holds a few events: the burner returns the events logged before the "yymmdd:hhmmss"
+    cursor of the request, and the timestamp of the oldest one is the cursor of the next page.
+    When a start is given, the period is split into time windows whose pages are followed concurrently (up to
+    `concurrency` at the same time), so that a long period takes about as many round trips as its longest window.
+
+    Args:
+        burner_address (str): The IP address of the burner.
+        serial (str): The serial number of the burner (this can often be found on a sticker somewhere on the burner).
+        pin_code (str): The secret pincode of the burner (this can often be found on a sticker somewhere on the burner).
+        since (datetime.datetime): The oldest event to get, in the local time of the burner.
+            Default: None (the whole event log, one page after the other)
+        until (datetime.datetime): The time before which the events are wanted, in the local time of the burner.
+            Default: None (now)
+        window (float): The duration covered by each time window, in seconds (`None` for a single window).
+            Default: 1 week
+        concurrency (int): The maximum number of time windows fetched at the same time.
+            Default: 4
+        timeout (float): The maximum duration to wait for each page, in seconds.
+            Default: 5
+        verbose (bool): Indicates if we want the frames to be printed before sending them.
+            Default: False
+        transport (Transport): The transport to use to send the frames.
+            If none is given, a temporary one will be opened (and closed) just for these requests.
+            Default: None
+
+    Yields:
+        event (Event): Every event of the period, newest first.
+
+    Throws:
+        NoResponseException: If the burner didn't answer a page in time.
+    """
+
+    if transport is None:
+        with Transport() as transport:
+            yield from stream_events(
+                burner_address,
+                serial,
+                pin_code,
+                since=since,
+                until=until,
+                window=window,
+                concurrency=concurrency,
+                timeout=timeout,
+                verbose=verbose,
+                transport=transport,
+            )
+
+        return
+
+    until = datetime.datetime.now().replace(microsecond=0) if until is None else until
+
+    windows = []
+    if since is None or window is None:
+        windows.append(_EventLogWindow(since, until))
+    else:
+        step = datetime.timedelta(seconds=window)
+        end = until
+        while end > since:
+            windows.append(_EventLogWindow(max(since, end - step), end))
+            end -= step
+
+    while windows:
+        active = [window for window in windows if not window.done][:concurrency]
+
+        futures = [
+            transport.submit(
+                build_event_log_frame(serial, pin_code, window.next_cursor),
+                burner_address,
+                verbose=verbose,
+            )
+            for window in active
+        ]
+        done, _ = transport.wait(futures, timeout)
+
+        if len(done) != len(futures):
+            for future in futures:
+                transport.cancel(future)
+
+            raise NoResponseException(burner_address, timeout)
+
+        for window, future in zip(active, futures):
+            response = future.result()
+            window.feed(parse_events(response.payload) if response.status == 0 else [])
+
+        # Yield the events in order: only the oldest windows wait for the newest ones
+        while windows:
+            while windows[0].events:
+                yield windows[0].events.popleft()
+
+            if not windows[0].done:
+                break
+
+            windows.pop(0)
+
+
+def parse_consumption(payload):
+    """
+    Parses a consumption history.
+
+    Args:
+        payload (str): The payload of a consumption response (e.g. "total_days=1.2,3.4,...").
+
+    Returns:
+        values (list(float)): The values of the history, in order (`None` for a value that is not a number).
+    """
+
+    _, _, values = payload.rpartition("=")
+
+    history = []
+    for value in values.split(","):
+        try:
+            history.append(float(value))
+        except ValueError:
+            history.append(None)
+
+    return history
+
+
+def run_consumption(
+    burner_address,
+    serial,
+    pin_code,
+    paths=CONSUMPTION_DATA,
+    timeout=5,
+    verbose=False,
+    transport=None,
+):
+    """
+    Gets several consumption histories of the given burner at once.
+    Every request is sent right away, over the same socket, so that this takes about a single round trip.
+
+    Args:
+        burner_address (str): The IP address of the burner.
+        serial (str): The serial number of the burner (this can often be found on a sticker somewhere on the burner).
+        pin_code (str): The secret pincode of the burner (this can often be found on a sticker somewhere on the burner).
+        paths (tuple(str)): The consumption histories to get.
+            Default: every history (see `pyduro.actions.CONSUMPTION_DATA`)
+        timeout (float): The maximum duration to wait for all the responses, in seconds.
+            Default: 5
+        verbose (bool): Indicates if we want the frames to be printed before sending them.
+            Default: False
+        transport (Transport): The transport to use to send the frames.
+            If none is given, a temporary one will be opened (and closed) just for these requests.
+            Default: None
+
+    Returns:
+        consumption (dict): The values of every history, by path (e.g. `{"total_days": [1.2, 3.4, ...], ...}`). A
+            history the burner didn't answer (or answered with an error) is `None`.
+
+    Throws:
+        InvalidPathException: If one of the given paths is not a consumption history.
+    """
+
+    if transport is None:
+        with Transport() as transport:
+            return run_consumption(
+                burner_address,
+                serial,
+                pin_code,
+                paths=paths,
+                timeout=timeout,
+                verbose=verbose,
+                transport=transport,
+            )
+
+    frames = [build_frame(serial, pin_code, "consumption", path) for path in paths]
+    futures = [
+        transport.submit(frame, burner_address, verbose=verbose) for frame in frames
+    ]
+
+    done, _ = transport.wait(futures, timeout)
+
+    consumption = {}
+    for path, future in zip(paths, futures):
+        response = None
+        if future in done:
+            response = future.result()
+        else:
+            transport.cancel(future)
+
+        consumption[path] = (
+            parse_consumption(response.payload)
+            if isinstance(response, Response) and response.status == 0
+            else None
+        )
+
+    return consumption
@@ -14,7 +14,35 @@ from pyduro.protocol.frame import Frame
 # --------------------------------------------------------------------------------------------------
 
 
-def run(burner_address, serial, pin_code, function_id, payload, verbose=False):
+def build_frame(serial, pin_code, function_id, payload):
+    """
+    Build a raw frame, without checking that the function is known.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        function_id (int): The raw identifier of the function you want to run on the burner.
+        payload (str): The payload to send to the burner.
+
+    Returns:
+        frame (Frame): The frame to send to the burner.
+
+    Throws:
+        PayloadToLargeException: If the given payload is too long.
+    """
+
+    return Frame(serial, pin_code, function_id, payload, function_check=False)
+
+
+def run(
+    burner_address,
+    serial,
+    pin_code,
+    function_id,
+    payload,
+    verbose=False,
+    transport=None,
+):
     """
     Get information from the given burner.
 
@@ -30,12 +58,15 @@ def run(burner_address, serial, pin_code, function_id, payload, verbose=False):
         payload (str): The payload to send to the burner.
         verbose (bool): Indicates if we want the frame to be printed before sending it.
             Default: False
+        transport (Transport): The transport to use to send the frame.
+            If none is given, a temporary one will be opened (and closed) just for this request.
+            Default: None
     """
 
     try:
-        frame = Frame(serial, pin_code, function_id, payload, function_check=False)
+        frame = build_frame(serial, pin_code, function_id, payload)
 
-        response = frame.send(burner_address, verbose=verbose)
+        response = frame.send(burner_address, verbose=verbose, transport=transport)
 
         return response
     except PayloadToLargeException as e:
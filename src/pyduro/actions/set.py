@@ -1,18 +1,78 @@
 # -*- coding: utf-8 -*-
 
 # --------------------------------------------------------------------------------------------------
+import collections
+
 from pyduro.actions import SETTINGS
+from pyduro.actions import get as get_action
 from pyduro.protocol import (
     FUNCTIONS,
     FunctionNotFoundException,
+    InvalidPathException,
+    NoResponseException,
     PayloadToLargeException,
+    SettingNotAppliedException,
+    TooManyPendingRequestsException,
 )
 from pyduro.protocol.frame import Frame
+from pyduro.protocol.transport import Transport
 
 # --------------------------------------------------------------------------------------------------
 
+SetResult = collections.namedtuple(
+    "SetResult", ["path", "value", "response", "actual", "error"]
+)
+SetResult.__doc__ = """
+Defines the result of the update of one setting.
+
+Attributes:
+    path (str): The path of the setting.
+    value (str): The value that was written.
+    response (Response): The response of the burner to the update, or `None` if it didn't answer (or if the update
+        couldn't even be sent).
+    actual (str): The value read back from the burner after the update, or `None` if it wasn't read back.
+    error (Exception): The reason why the update failed, or `None` if it succeeded.
+"""
+
+# --------------------------------------------------------------------------------------------------
+
+
+def build_frame(serial, pin_code, path, value):
+    """
+    Build the frame to update a setting of a burner.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        path (str): The path of the payload to modify on the burner.
+        value (str): The new value to set the payload on the burner.
+
+    Returns:
+        frame (Frame): The frame to send to the burner.
 
-def run(burner_address, serial, pin_code, path, value, verbose=False):
+    Throws:
+        InvalidPathException: If no path is given.
+        PayloadToLargeException: If the given path and value are too long.
+    """
+
+    if path is None or len(path) == 0:
+        raise InvalidPathException(SETTINGS)
+
+    payload = "{}={}".format(path, value)
+
+    return Frame(serial, pin_code, FUNCTIONS.set.value, payload)
+
+
+def run(
+    burner_address,
+    serial,
+    pin_code,
+    path,
+    value,
+    verbose=False,
+    transport=None,
+    cache=None,
+):
     """
     Get information from the given burner.
 
@@ -28,24 +88,293 @@ def run(burner_address, serial, pin_code, path, value, verbose=False):
         value (str): The new value to set the payload on the burner.
         verbose (bool): Indicates if we want the frame to be printed before sending it.
             Default: False
+        transport (Transport): The transport to use to send the frame.
+            If none is given, a temporary one will be opened (and closed) just for this request.
+            Default: None
+        cache (ResponseCache): The cache to invalidate once the setting is updated.
+            Default: None (no cache)
     """
 
     try:
-        function_id = FUNCTIONS.set.value
+        frame = build_frame(serial, pin_code, path, value)
 
-        if path is None or len(path) == 0:
-            print("You must pass one of the following as path: {}".format(SETTINGS))
+        response = frame.send(burner_address, verbose=verbose, transport=transport)
 
-            return
-
-        payload = "{}={}".format(path, value)
-
-        frame = Frame(serial, pin_code, function_id, payload)
-
-        response = frame.send(burner_address, verbose=verbose)
+        if cache is not None:
+            cache.store(frame, response)
 
         return response
     except FunctionNotFoundException as e:
         print(e.message)
+    except InvalidPathException as e:
+        print(e.message)
     except PayloadToLargeException as e:
         print(e.message)
+
+
+def build_frames(serial, pin_code, settings):
+    """
+    Build the frames to update several settings of a burner.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        settings (dict): The new value of every setting to update, by path (e.g. `{"boiler.temp": "65"}`).
+
+    Returns:
+        frames (list(tuple(str, str, Frame|Exception))): The path, the value and the frame of every update (or the
+            reason why the frame couldn't be built).
+    """
+
+    frames = []
+    for path, value in settings.items():
+        try:
+            frames.append((path, value, build_frame(serial, pin_code, path, value)))
+        except (InvalidPathException, PayloadToLargeException) as e:
+            frames.append((path, value, e))
+
+    return frames
+
+
+def check_responses(frames, responses):
+    """
+    Returns the results of the updates from the responses of the burner.
+
+    Args:
+        frames (list(tuple(str, str, Frame|Exception))): The frames, as returned by `build_frames`.
+        responses (list(Response|Exception)): The response to each frame, in the same order (or the reason why there
+            is no response).
+
+    Returns:
+        results (list(SetResult)): The result of every update, in the same order.
+    """
+
+    results = []
+    for (path, value, _), response in zip(frames, responses):
+        if isinstance(response, Exception):
+            results.append(SetResult(path, value, None, None, response))
+        elif response.status != 0:
+            results.append(
+                SetResult(
+                    path,
+                    value,
+                    response,
+                    None,
+                    SettingNotAppliedException(path, value),
+                )
+            )
+        else:
+            results.append(SetResult(path, value, response, None, None))
+
+    return results
+
+
+def verification_groups(results):
+    """
+    Returns the settings groups to read back to verify the given updates.
+
+    Args:
+        results (list(SetResult)): The results of the updates. Only the updates the burner accepted are verified.
+
+    Returns:
+        groups (tuple(str)): The groups to read back, each only once.
+    """
+
+    groups = []
+    for result in results:
+        if result.error is None:
+            group = result.path.split(".", 1)[0]
+            if group not in groups:
+                groups.append(group)
+
+    return tuple(groups)
+
+
+def verify(results, settings, error=None):
+    """
+    Checks that the values read back from the burner match the written ones.
+
+    Args:
+        results (list(SetResult)): The results of the updates.
+        settings (dict): The settings read back from the burner, as returned by `get.merge_settings`.
+        error (Exception): The error to report for the updates whose settings group couldn't be read back.
+            Default: None (report that the setting has not been applied)
+
+    Returns:
+        results (list(SetResult)): The results, with the value read back from the burner (and an error if it doesn't
+            match the written one, or if it couldn't be read back).
+    """
+
+    groups = settings.get("settings", {})
+
+    verified = []
+    for result in results:
+        if result.error is not None:
+            verified.append(result)
+
+            continue
+
+        group, _, name = result.path.partition(".")
+        fields = groups.get(group)
+        if fields is None:
+            verified.append(
+                result._replace(
+                    error=error or SettingNotAppliedException(result.path, result.value)
+                )
+            )
+
+            continue
+
+        actual = fields.get(name, fields.get(result.path))
+        verified.append(
+            result._replace(
+                actual=actual,
+                error=(
+                    None
+                    if _same_value(result.value, actual)
+                    else SettingNotAppliedException(result.path, result.value, actual)
+                ),
+            )
+        )
+
+    return verified
+
+
+def run_many(
+    burner_address,
+    serial,
+    pin_code,
+    settings,
+    verify_values=True,
+    timeout=5,
+    verbose=False,
+    transport=None,
+    cache=None,
+):
+    """
+    Update several settings of the given burner at once and check that they have been applied.
+
+    Every update is sent right away over the same socket, then every updated settings group is read back at once, so
+    that this takes about two round trips whatever the number of settings.
+
+    Args:
+        burner_address (str): The IP address of the burner.
+        serial (str): The serial number of the burner (this can often be found on a sticker somewhere on the burner).
+            Note that this should be a 6 characters string. Any longer string will be truncated and any shorter string
+            will be left padded with 0s.
+        pin_code (str): The secret pincode of the burner (this can often be found on a sticker somewhere on the burner).
+            Note that this should be a 10 characters string. Any longer string will be truncated and any shorter string
+            will be right padded with 0s.
+        settings (dict): The new value of every setting to update, by path (e.g. `{"boiler.temp": "65"}`).
+        verify_values (bool): Whether or not to read the updated settings back to check their values.
+            Default: True
+        timeout (float): The maximum duration to wait for the responses of each step (update and verification), in
+            seconds.
+            Default: 5
+        verbose (bool): Indicates if we want the frames to be printed before sending them.
+            Default: False
+        transport (Transport): The transport to use to send the frames.
+            If none is given, a temporary one will be opened (and closed) just for these requests.
+            Default: None
+        cache (ResponseCache): The cache to invalidate once the settings are updated.
+            Default: None (no cache)
+
+    Returns:
+        results (list(SetResult)): The result of every update, in the same order as the given settings.
+    """
+
+    if transport is None:
+        with Transport() as transport:
+            return run_many(
+                burner_address,
+                serial,
+                pin_code,
+                settings,
+                verify_values=verify_values,
+                timeout=timeout,
+                verbose=verbose,
+                transport=transport,
+                cache=cache,
+            )
+
+    frames = build_frames(serial, pin_code, settings)
+    responses = _send_all(
+        transport,
+        burner_address,
+        [frame for _, _, frame in frames],
+        timeout,
+        verbose,
+    )
+
+    if cache is not None:
+        for (_, _, frame), response in zip(frames, responses):
+            if not isinstance(response, Exception):
+                cache.store(frame, response)
+
+    results = check_responses(frames, responses)
+
+    groups = verification_groups(results)
+    if not verify_values or not groups:
+        return results
+
+    read_frames = get_action.build_settings_frames(serial, pin_code, groups=groups)
+    read_responses = _send_all(
+        transport,
+        burner_address,
+        [frame for _, _, frame in read_frames],
+        timeout,
+        verbose,
+    )
+
+    return verify(
+        results,
+        get_action.merge_settings(read_frames, read_responses),
+        error=NoResponseException(burner_address, timeout),
+    )
+
+
+def _same_value(value, actual):
+    if actual is None:
+        return False
+
+    # The burner may not format numbers as they were written (e.g. "65" becomes "65.0")
+    try:
+        return float(value) == float(actual)
+    except ValueError:
+        return str(value) == actual
+
+
+def _send_all(transport, burner_address, frames, timeout, verbose):
+    # Send every frame at once, then wait for all the responses (an exception instead of a frame or a response means
+    # that the frame couldn't be built, sent, or answered in time)
+    futures = []
+    for frame in frames:
+        if isinstance(frame, Exception):
+            futures.append(frame)
+
+            continue
+
+        try:
+            futures.append(transport.submit(frame, burner_address, verbose=verbose))
+        except TooManyPendingRequestsException as e:
+            futures.append(e)
+
+    done, _ = transport.wait(
+        [future for future in futures if not isinstance(future, Exception)], timeout
+    )
+
+    responses = []
+    for future in futures:
+        if isinstance(future, Exception):
+            responses.append(future)
+        elif future in done:
+            # e.g. the transport has been closed, or the daemon failed to send the frame
+            try:
+                responses.append(future.result())
+            except Exception as e:
+                responses.append(e)
+        else:
+            transport.cancel(future)
+            responses.append(NoResponseException(burner_address, timeout))
+
+    return responses
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import collections
+
+from pyduro.actions import STATUS_FIELDS
+from pyduro.protocol import FUNCTIONS, PayloadToLargeException
+from pyduro.protocol.frame import Frame
+
+# --------------------------------------------------------------------------------------------------
+
+StatusField = collections.namedtuple("StatusField", ["name", "index", "type", "unit"])
+StatusField.__doc__ = """
+Defines one field of the status vector returned by a burner.
+
+Attributes:
+    name (str): The name of the field (e.g. "boiler_temp" or "hopper.trip1").
+    index (int): The position of the field in the status vector.
+    type (type): The type of the value (`int`, `float` or `str`).
+    unit (str): The unit of the value, if any.
+"""
+
+StatusDelta = collections.namedtuple("StatusDelta", ["timestamp", "changes", "status"])
+StatusDelta.__doc__ = """
+Defines the changes between two consecutive statuses of a burner.
+
+Attributes:
+    timestamp (float): When the new status was received, as a UNIX timestamp.
+    changes (dict): The new value of every field that changed, by field name (e.g. "boiler_temp" or "hopper.trip1").
+    status (Status): The whole new status.
+"""
+
+# --------------------------------------------------------------------------------------------------
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        # Some firmwares send integers as decimals ("1.0"), or text for an unused field
+        try:
+            return int(float(value))
+        except ValueError:
+            return value
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _to_str(value):
+    return value
+
+
+CONVERTERS = {int: _to_int, float: _to_float, str: _to_str}
+
+
+class StatusSchema:
+    """
+    Defines how to decode the status vector of a burner (a comma separated list of values) into a `Status` record.
+
+    Everything that can be is computed once when building the schema (the record type, the position and the converter
+    of each field), so that decoding a status only has to split the payload and convert each value.
+
+    The number of fields depends on the firmware of the burner: the fields missing from a shorter status vector are
+    set to `None`, while the unknown values at the end of a longer one are kept, as strings, in the `extra` attribute of
+    the record.
+
+    Args:
+        fields (tuple(tuple(str, type, str))): The name, type and unit of every field of the status vector, in order.
+            Default: STATUS_FIELDS
+
+    Attributes:
+        fields (tuple(StatusField)): The fields of the status vector.
+        record (type): The namedtuple type of the decoded statuses. Its attributes are named after the fields, dots
+            being replaced with underscores (e.g. "hopper.trip1" becomes `hopper_trip1`), plus an `extra` attribute.
+
+    Throws:
+        ValueError: If two fields have the same attribute name, or a field has an unknown type.
+    """
+
+    def __init__(self, fields=STATUS_FIELDS):
+        self.fields = tuple(
+            StatusField(name, index, field_type, unit)
+            for index, (name, field_type, unit) in enumerate(fields)
+        )
+
+        for field in self.fields:
+            if field.type not in CONVERTERS:
+                raise ValueError(
+                    "Unknown type for the status field {}: {}".format(
+                        field.name, field.type
+                    )
+                )
+
+        self.record = collections.namedtuple(
+            "Status",
+            [field.name.replace(".", "_") for field in self.fields] + ["extra"],
+        )
+
+        self._converters = tuple(CONVERTERS[field.type] for field in self.fields)
+        self._indexes = {field.name: field.index for field in self.fields}
+        self._missing = (None,) * len(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def field(self, name):
+        """
+        Returns the definition of the field with the given name.
+
+        Args:
+            name (str): The name of the field (e.g. "boiler_temp" or "hopper.trip1").
+
+        Returns:
+            field (StatusField): The field.
+
+        Throws:
+            KeyError: If there is no field with this name.
+        """
+
+        return self.fields[self._indexes[name]]
+
+    def decode(self, payload):
+        """
+        Decodes a status vector.
+
+        Args:
+            payload (str): The payload of the response to a status request (a comma separated list of values).
+
+        Returns:
+            status (Status): The decoded status. Every value is converted to the type of its field, empty values being
+                `None`.
+        """
+
+        values = payload.split(",")
+        size = len(self.fields)
+
+        decoded = [
+            convert(value) if value else None
+            for convert, value in zip(self._converters, values)
+        ]
+        if len(decoded) < size:
+            decoded.extend(self._missing[len(decoded) :])
+
+        decoded.append(tuple(values[size:]))
+
+        return self.record._make(decoded)
+
+    def to_dict(self, status):
+        """
+        Returns the given status as a dict, with the original names of the fields (e.g. "hopper.trip1").
+
+        Args:
+            status (Status): The decoded status.
+
+        Returns:
+            status (dict): The value of every field by name. The unknown values (if any) are under the "extra" key.
+        """
+
+        result = {field.name: value for field, value in zip(self.fields, status)}
+        if status.extra:
+            result["extra"] = list(status.extra)
+
+        return result
+
+    def diff(self, previous, status):
+        """
+        Returns the fields that changed between two statuses.
+
+        Args:
+            previous (Status): The previous status, or `None` if there is none (every field is then considered changed).
+            status (Status): The new status.
+
+        Returns:
+            changes (dict): The new value of every field that changed, by name. If the unknown values changed, they are
+                all under the "extra" key.
+        """
+
+        if previous is None:
+            return self.to_dict(status)
+
+        changes = {
+            field.name: value
+            for field, old_value, value in zip(self.fields, previous, status)
+            if value != old_value
+        }
+        if status.extra != previous.extra:
+            changes["extra"] = list(status.extra)
+
+        return changes
+
+
+STATUS_SCHEMA = StatusSchema()
+
+# --------------------------------------------------------------------------------------------------
+
+
+def build_frame(serial, pin_code):
+    """
+    Build the frame to get the status of a burner.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+
+    Returns:
+        frame (Frame): The frame to send to the burner.
+    """
+
+    return Frame(serial, pin_code, FUNCTIONS.get_status.value, "*")
+
+
+def decode(response, schema=STATUS_SCHEMA):
+    """
+    Decodes the status of a burner from its response to a status request.
+
+    Args:
+        response (Response): The response from the burner.
+        schema (StatusSchema): The schema to decode the status vector with.
+            Default: STATUS_SCHEMA
+
+    Returns:
+        status (Status): The decoded status, or `None` if the burner returned an error.
+    """
+
+    if response is None or response.status != 0:
+        return None
+
+    return schema.decode(response.payload)
+
+
+def run(burner_address, serial, pin_code, verbose=False, transport=None):
+    """
+    Get the raw status of the given burner.
+
+    Args:
+        burner_address (str): The IP address of the burner.
+        serial (str): The serial number of the burner (this can often be found on a sticker somewhere on the burner).
+            Note that this should be a 6 characters string. Any longer string will be truncated and any shorter string
+            will be left padded with 0s.
+        pin_code (str): The secret pincode of the burner (this can often be found on a sticker somewhere on the burner).
+            Note that this should be a 10 characters string. Any longer string will be truncated and any shorter string
+            will be right padded with 0s.
+        verbose (bool): Indicates if we want the frame to be printed before sending it.
+            Default: False
+        transport (Transport): The transport to use to send the frame.
+            If none is given, a temporary one will be opened (and closed) just for this request.
+            Default: None
+
+    Returns:
+        response (Response): The response from the burner (if any).
+    """
+
+    try:
+        frame = build_frame(serial, pin_code)
+
+        response = frame.send(burner_address, verbose=verbose, transport=transport)
+
+        return response
+    except PayloadToLargeException as e:
+        print(e.message)
+
+
+def get_status(
+    burner_address,
+    serial,
+    pin_code,
+    verbose=False,
+    transport=None,
+    schema=STATUS_SCHEMA,
+):
+    """
+    Get the decoded status of the given burner.
+
+    Args:
+        burner_address (str): The IP address of the burner.
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        verbose (bool): Indicates if we want the frame to be printed before sending it.
+            Default: False
+        transport (Transport): The transport to use to send the frame.
+            If none is given, a temporary one will be opened (and closed) just for this request.
+            Default: None
+        schema (StatusSchema): The schema to decode the status vector with.
+            Default: STATUS_SCHEMA
+
+    Returns:
+        status (Status): The decoded status, or `None` if the burner didn't answer or returned an error.
+    """
+
+    return decode(
+        run(burner_address, serial, pin_code, verbose=verbose, transport=transport),
+        schema=schema,
+    )
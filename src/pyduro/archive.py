@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import collections
+import concurrent.futures
+import datetime
+import sqlite3
+import threading
+
+from pyduro.actions import history
+from pyduro.protocol import DEFAULT_TIMEOUT
+from pyduro.protocol.transport import Transport
+
+# --------------------------------------------------------------------------------------------------
+
+DEFAULT_SYNC_CONCURRENCY = 8
+
+# The format of the timestamps in the archive, which sorts like the timestamps themselves
+ARCHIVE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SyncResult = collections.namedtuple(
+    "SyncResult", ["burner", "count", "cursor", "error"]
+)
+SyncResult.__doc__ = """
+Defines the result of the synchronization of the event log of one burner.
+
+Attributes:
+    burner (Burner): The burner that was synchronized.
+    count (int): The number of new events added to the archive.
+    cursor (datetime.datetime): The timestamp of the newest archived event of the burner (`None` if there is none).
+    error (Exception): The reason why the synchronization failed, or `None` if it succeeded. Nothing is archived (and
+        the cursor doesn't move) when it fails.
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    serial TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    record TEXT NOT NULL,
+    UNIQUE (serial, timestamp, record)
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    serial TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL
+);
+"""
+
+# --------------------------------------------------------------------------------------------------
+
+
+class EventArchive:
+    """
+    Defines a local archive of the event logs of burners, stored in a SQLite database, with the timestamp of the newest
+    archived event of each burner (its cursor).
+
+    A synchronization only asks a burner for the events logged since its cursor, so that keeping the archive up to date
+    only takes a few frames per burner. Events are stored once, even if they are received several times.
+
+    This is thread-safe, so the same archive can be synchronized with several burners at the same time.
+
+    Args:
+        path (str): The path of the SQLite database (created if needed).
+            Default: ":memory:" (a temporary in-memory archive)
+
+    Attributes:
+        path (str)
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Closes the database.
+        """
+
+        with self._lock:
+            self._connection.close()
+
+    def cursor(self, serial):
+        """
+        Returns the cursor of the given burner.
+
+        Args:
+            serial (str): The serial number of the burner.
+
+        Returns:
+            cursor (datetime.datetime): The timestamp of the newest archived event of the burner, or `None` if none of
+                its events has been archived yet.
+        """
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT timestamp FROM cursors WHERE serial = ?", (serial,)
+            ).fetchone()
+
+        return None if row is None else _parse_timestamp(row[0])
+
+    def add(self, serial, events):
+        """
+        Adds events to the archive of the given burner, and moves its cursor to the newest of them, in a single
+        transaction. The events already in the archive are ignored.
+
+        Args:
+            serial (str): The serial number of the burner.
+            events (list(Event)): The events to add.
+
+        Returns:
+            count (int): The number of events actually added.
+        """
+
+        rows = [
+            (serial, event.timestamp.strftime(ARCHIVE_TIMESTAMP_FORMAT), event.record)
+            for event in events
+        ]
+        if not rows:
+            return 0
+
+        with self._lock, self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO events (serial, timestamp, record) VALUES (?, ?, ?)",
+                rows,
+            )
+            count = self._connection.total_changes - before
+
+            newest = max(timestamp for _, timestamp, _ in rows)
+            row = self._connection.execute(
+                "SELECT timestamp FROM cursors WHERE serial = ?", (serial,)
+            ).fetchone()
+            if row is None or row[0] < newest:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO cursors (serial, timestamp) VALUES (?, ?)",
+                    (serial, newest),
+                )
+
+        return count
+
+    def events(self, serial, since=None, until=None):
+        """
+        Returns the archived events of the given burner.
+
+        Args:
+            serial (str): The serial number of the burner.
+            since (datetime.datetime): The oldest event to return (included).
+                Default: None (no limit)
+            until (datetime.datetime): The newest event to return (excluded).
+                Default: None (no limit)
+
+        Returns:
+            events (list(Event)): The events, oldest first.
+        """
+
+        query = "SELECT timestamp, record FROM events WHERE serial = ?"
+        parameters = [serial]
+        if since is not None:
+            query += " AND timestamp >= ?"
+            parameters.append(since.strftime(ARCHIVE_TIMESTAMP_FORMAT))
+        if until is not None:
+            query += " AND timestamp < ?"
+            parameters.append(until.strftime(ARCHIVE_TIMESTAMP_FORMAT))
+        query += " ORDER BY timestamp, rowid"
+
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+
+        return [
+            history.Event(_parse_timestamp(timestamp), record)
+            for timestamp, record in rows
+        ]
+
+    def sync(self, burner, since=None, timeout=DEFAULT_TIMEOUT, transport=None):
+        """
+        Archives the events logged by the given burner since its cursor.
+
+        The events logged during the second of the cursor are asked again (the burner may have logged more events
+        during that second after the last synchronization), and ignored if they are already archived. Nothing is
+        archived if the burner doesn't answer every page in time, so the next synchronization starts over from the same
+        cursor.
+
+        Args:
+            burner (Burner): The burner to synchronize.
+            since (datetime.datetime): The oldest event to get if none of the events of the burner has been archived
+                yet.
+                Default: None (its whole event log)
+            timeout (float): The maximum duration to wait for each page, in seconds.
+                Default: 5
+            transport (Transport): The transport to use to send the requests.
+                If none is given, a temporary one will be opened (and closed) just for this synchronization.
+                Default: None
+
+        Returns:
+            result (SyncResult): The result of the synchronization.
+        """
+
+        cursor = self.cursor(burner.serial)
+
+        try:
+            events = list(
+                history.stream_events(
+                    burner.address,
+                    burner.serial,
+                    burner.pin_code,
+                    since=since if cursor is None else cursor,
+                    # Recent events are a few pages away, while there may be long periods without any event
+                    window=(
+                        None if cursor is not None else history.DEFAULT_EVENT_LOG_WINDOW
+                    ),
+                    timeout=timeout,
+                    transport=transport,
+                )
+            )
+        except Exception as e:
+            return SyncResult(burner, 0, cursor, e)
+
+        count = self.add(burner.serial, events)
+
+        return SyncResult(burner, count, self.cursor(burner.serial), None)
+
+    def sync_many(
+        self,
+        burners,
+        since=None,
+        concurrency=DEFAULT_SYNC_CONCURRENCY,
+        timeout=DEFAULT_TIMEOUT,
+        transport=None,
+    ):
+        """
+        Archives the events logged by every burner of the fleet since its cursor, and yields the result of each burner
+        as soon as it is done.
+
+        Args:
+            burners (list(Burner)): The burners to synchronize.
+            since (datetime.datetime): The oldest event to get for the burners whose events have never been archived.
+                Default: None (their whole event log)
+            concurrency (int): The maximum number of burners being synchronized at the same time.
+                Default: 8
+            timeout (float): The maximum duration to wait for each page, in seconds.
+                Default: 5
+            transport (Transport): The transport to use to send the requests.
+                If none is given, a temporary one will be opened (and closed) just for these synchronizations.
+                Default: None
+
+        Yields:
+            result (SyncResult): The result of each burner, in the order the burners are done.
+        """
+
+        if transport is None:
+            with Transport() as transport:
+                yield from self.sync_many(
+                    burners,
+                    since=since,
+                    concurrency=concurrency,
+                    timeout=timeout,
+                    transport=transport,
+                )
+
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(
+                    self.sync,
+                    burner,
+                    since=since,
+                    timeout=timeout,
+                    transport=transport,
+                )
+                for burner in burners
+            ]
+
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+
+
+def _parse_timestamp(value):
+    return datetime.datetime.strptime(value, ARCHIVE_TIMESTAMP_FORMAT)
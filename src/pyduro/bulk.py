@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import array
+import collections
+import warnings
+
+from pyduro.actions.status import STATUS_SCHEMA
+from pyduro.protocol import END_CHAR, FUNCTIONS, START_CHAR
+from pyduro.protocol.codec import (
+    RESPONSE_FUNCTION_OFFSET,
+    RESPONSE_PAYLOAD_OFFSET,
+    RESPONSE_SERIAL_OFFSET,
+    decode_text,
+)
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# --------------------------------------------------------------------------------------------------
+
+_START = ord(START_CHAR)
+_END = ord(END_CHAR)
+_END_BYTES = END_CHAR.encode()
+_ZERO = ord("0")
+_NAN = float("nan")
+
+# The offset of the start character in a response frame, between the serial and the function
+_START_OFFSET = RESPONSE_SERIAL_OFFSET + 6
+
+# --------------------------------------------------------------------------------------------------
+
+
+class FrameTable:
+    """
+    Defines many response frames decoded at once, as columns: the n-th value of every column belongs to the n-th
+    frame.
+
+    The columns are NumPy arrays if NumPy is installed, `array.array`s otherwise. In both cases they can be indexed,
+    sliced and iterated over.
+
+    Args:
+        data (bytes): The buffer the frames have been decoded from.
+        app_id (list(str)): The application identifier of every frame.
+        serial (list(str)): The serial of every frame.
+        function (array): The function of every frame.
+        sequence_number (array): The sequence number of every frame.
+        status (array): The status of every frame.
+        payload_size (array): The payload size of every frame.
+        offset (array): The offset of every frame in the buffer.
+
+    Attributes:
+        app_id (list(str))
+        data (bytes)
+        function (array)
+        offset (array)
+        payload_size (array)
+        sequence_number (array)
+        serial (list(str))
+        status (array)
+    """
+
+    def __init__(
+        self,
+        data,
+        app_id,
+        serial,
+        function,
+        sequence_number,
+        status,
+        payload_size,
+        offset,
+    ):
+        self.data = data
+        self.app_id = app_id
+        self.serial = serial
+        self.function = function
+        self.sequence_number = sequence_number
+        self.status = status
+        self.payload_size = payload_size
+        self.offset = offset
+
+    def __len__(self):
+        return len(self.offset)
+
+    def payload(self, index):
+        """
+        Returns the payload of a frame.
+
+        Args:
+            index (int): The position of the frame.
+
+        Returns:
+            payload (str): The decoded payload.
+        """
+
+        start = int(self.offset[index]) + RESPONSE_PAYLOAD_OFFSET
+
+        return decode_text(self.data, start, start + int(self.payload_size[index]))
+
+    def payloads(self, indexes=None):
+        """
+        Returns the raw payloads of several frames.
+
+        Args:
+            indexes (list(int)): The positions of the frames.
+                Default: None (every frame)
+
+        Returns:
+            payloads (list(bytes)): The payloads, in the order of the given positions.
+        """
+
+        data = self.data
+        offsets = self.offset
+        sizes = self.payload_size
+        if indexes is None:
+            indexes = range(len(self))
+
+        payloads = []
+        for index in indexes:
+            start = int(offsets[index]) + RESPONSE_PAYLOAD_OFFSET
+            payloads.append(data[start : start + int(sizes[index])])
+
+        return payloads
+
+    def select(self, function=None, status=None):
+        """
+        Returns the positions of the frames of the given function and/or status.
+
+        Args:
+            function (int): The function of the wanted frames.
+                Default: None (any function)
+            status (int): The status of the wanted frames.
+                Default: None (any status)
+
+        Returns:
+            indexes (list(int)): The positions of the matching frames, in order.
+        """
+
+        if numpy is not None and isinstance(self.function, numpy.ndarray):
+            mask = numpy.ones(len(self), dtype=bool)
+            if function is not None:
+                mask &= self.function == function
+            if status is not None:
+                mask &= self.status == status
+
+            return numpy.flatnonzero(mask).tolist()
+
+        return [
+            index
+            for index in range(len(self))
+            if (function is None or self.function[index] == function)
+            and (status is None or self.status[index] == status)
+        ]
+
+
+def decode_frames(data, use_numpy=None):
+    """
+    Decodes the headers of many response frames at once (e.g. responses captured to a file).
+
+    The frames must follow each other in the buffer, each one ending with the end character of the NBE protocol. Any
+    malformed part of the buffer is skipped, up to the next end character.
+
+    Args:
+        data (bytes|bytearray|memoryview|mmap): The frames, back to back.
+        use_numpy (bool): Whether or not to use NumPy to decode the whole buffer at once.
+            Default: None (if it is installed)
+
+    Returns:
+        frames (FrameTable): The decoded frames, in order.
+    """
+
+    if not isinstance(data, bytes):
+        data = bytes(data)
+
+    if use_numpy is None:
+        use_numpy = numpy is not None
+
+    if use_numpy:
+        return _decode_frames_numpy(data)
+
+    return _decode_frames_python(data)
+
+
+def decode_file(path, use_numpy=None):
+    """
+    Decodes the headers of every response frame of a file.
+
+    Args:
+        path (str): The path of a file containing frames, back to back.
+        use_numpy (bool): Whether or not to use NumPy to decode the whole file at once.
+            Default: None (if it is installed)
+
+    Returns:
+        frames (FrameTable): The decoded frames, in order.
+    """
+
+    with open(path, "rb") as frames_file:
+        return decode_frames(frames_file.read(), use_numpy=use_numpy)
+
+
+def decode_status(frames, schema=STATUS_SCHEMA, fields=None, use_numpy=None):
+    """
+    Decodes the status vectors of many frames at once, as one column of numbers per field.
+
+    Only the successful status responses (function 11, status 0) are decoded.
+
+    Args:
+        frames (FrameTable): The decoded frames.
+        schema (StatusSchema): The schema of the status vectors.
+            Default: STATUS_SCHEMA
+        fields (list(str)): The fields to decode (e.g. "boiler_temp" or "hopper.trip1").
+            Default: every numeric field of the schema
+        use_numpy (bool): Whether or not to use NumPy to convert the values.
+            Default: None (if it is installed)
+
+    Returns:
+        status (tuple(list(int), dict)): The positions of the status frames, and the values of every field by name (as
+            floats, NaN when a value is missing or is not a number).
+
+    Throws:
+        KeyError: If one of the given fields is not a field of the schema.
+    """
+
+    if fields is None:
+        fields = [field.name for field in schema.fields if field.type in (int, float)]
+    positions = [schema.field(name).index for name in fields]
+
+    if use_numpy is None:
+        use_numpy = numpy is not None
+
+    indexes = frames.select(function=FUNCTIONS.get_status.value, status=0)
+    payloads = frames.payloads(indexes)
+
+    # The vectors can have different lengths (e.g. several firmwares in the same capture): convert each length at once
+    # Only the values up to the last wanted field need to be parsed
+    needed = max(positions, default=-1) + 1
+    rows_by_width = collections.defaultdict(list)
+    for row, payload in enumerate(payloads):
+        width = payload.count(b",") + 1
+        if 0 < needed and needed * 2 <= width:
+            payloads[row] = payload[: _nth_comma(payload, needed)]
+            width = needed
+
+        rows_by_width[width].append(row)
+
+    groups = {name: [] for name in fields}
+    for width, rows in rows_by_width.items():
+        text = b",".join([payloads[row] for row in rows]).decode("utf-8", "replace")
+
+        matrix = _to_float_matrix(text, len(rows), width) if use_numpy else None
+        if matrix is not None:
+            for name, position in zip(fields, positions):
+                groups[name].append(
+                    matrix[:, position]
+                    if position < width
+                    else numpy.full(len(rows), numpy.nan)
+                )
+
+            continue
+
+        # Split every vector of the group at once, then convert each field as a whole column
+        values = text.split(",")
+        for name, position in zip(fields, positions):
+            group = (
+                _to_floats(values[position::width])
+                if position < width
+                else array.array("d", [_NAN]) * len(rows)
+            )
+            groups[name].append(numpy.frombuffer(group) if use_numpy else group)
+
+    # The position of every vector once the groups are put back to back
+    order = None
+    if len(rows_by_width) > 1:
+        order = [0] * len(payloads)
+        for position, row in enumerate(
+            row for rows in rows_by_width.values() for row in rows
+        ):
+            order[row] = position
+
+    columns = {}
+    for name in fields:
+        if use_numpy:
+            column = numpy.concatenate(groups[name]) if groups[name] else numpy.empty(0)
+            columns[name] = (
+                numpy.ascontiguousarray(column) if order is None else column[order]
+            )
+        else:
+            column = array.array("d")
+            for group in groups[name]:
+                column.extend(group)
+            columns[name] = (
+                column
+                if order is None
+                else array.array("d", map(column.__getitem__, order))
+            )
+
+    return indexes, columns
+
+
+def _decode_frames_numpy(data):
+    buffer = numpy.frombuffer(data, dtype=numpy.uint8)
+
+    ends = numpy.flatnonzero(buffer == _END)
+    starts = numpy.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+
+    # Only keep the parts that are long enough to hold a header
+    long_enough = ends - starts >= RESPONSE_PAYLOAD_OFFSET
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    header = (
+        buffer[
+            starts[:, None]
+            + numpy.arange(RESPONSE_FUNCTION_OFFSET, RESPONSE_PAYLOAD_OFFSET)
+        ].astype(numpy.int64)
+        - _ZERO
+    )
+    digits = ((header >= 0) & (header <= 9)).all(axis=1)
+
+    payload_size = header[:, 5] * 100 + header[:, 6] * 10 + header[:, 7]
+    valid = (
+        digits
+        & (buffer[starts + _START_OFFSET] == _START)
+        & (ends - starts - RESPONSE_PAYLOAD_OFFSET == payload_size)
+    )
+
+    starts, header, payload_size = starts[valid], header[valid], payload_size[valid]
+
+    identity = buffer[starts[:, None] + numpy.arange(_START_OFFSET)]
+    app_id = (
+        identity[:, :RESPONSE_SERIAL_OFFSET]
+        .copy()
+        .view("S{}".format(RESPONSE_SERIAL_OFFSET))
+    )
+    serial = (
+        identity[:, RESPONSE_SERIAL_OFFSET:]
+        .copy()
+        .view("S{}".format(_START_OFFSET - RESPONSE_SERIAL_OFFSET))
+    )
+
+    return FrameTable(
+        data,
+        numpy.char.decode(app_id.ravel(), "utf-8", "replace").tolist(),
+        numpy.char.decode(serial.ravel(), "utf-8", "replace").tolist(),
+        (header[:, 0] * 10 + header[:, 1]).astype(numpy.uint8),
+        (header[:, 2] * 10 + header[:, 3]).astype(numpy.uint8),
+        header[:, 4].astype(numpy.uint8),
+        payload_size.astype(numpy.uint16),
+        starts,
+    )
+
+
+def _decode_frames_python(data):
+    app_ids = []
+    serials = []
+    functions = array.array("B")
+    sequence_numbers = array.array("B")
+    statuses = array.array("B")
+    payload_sizes = array.array("H")
+    offsets = array.array("q")
+
+    start = 0
+    size = len(data)
+    while start < size:
+        end = data.find(_END_BYTES, start)
+        if end < 0:
+            break
+
+        header = data[
+            start + RESPONSE_FUNCTION_OFFSET : start + RESPONSE_PAYLOAD_OFFSET
+        ]
+        if (
+            end - start >= RESPONSE_PAYLOAD_OFFSET
+            and header.isdigit()
+            and data[start + _START_OFFSET] == _START
+        ):
+            # Each digit is an ASCII character, i.e. its value + 48
+            function0, function1, sequence0, sequence1, status, size0, size1, size2 = (
+                header
+            )
+            payload_size = size0 * 100 + size1 * 10 + size2 - 5328
+
+            if end - start - RESPONSE_PAYLOAD_OFFSET == payload_size:
+                app_ids.append(decode_text(data, start, start + RESPONSE_SERIAL_OFFSET))
+                serials.append(
+                    decode_text(
+                        data, start + RESPONSE_SERIAL_OFFSET, start + _START_OFFSET
+                    )
+                )
+                functions.append(function0 * 10 + function1 - 528)
+                sequence_numbers.append(sequence0 * 10 + sequence1 - 528)
+                statuses.append(status - _ZERO)
+                payload_sizes.append(payload_size)
+                offsets.append(start)
+
+        start = end + 1
+
+    return FrameTable(
+        data,
+        app_ids,
+        serials,
+        functions,
+        sequence_numbers,
+        statuses,
+        payload_sizes,
+        offsets,
+    )
+
+
+def _nth_comma(payload, count):
+    index = -1
+    for _ in range(count):
+        index = payload.index(b",", index + 1)
+
+    return index
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return _NAN
+
+
+def _to_floats(values):
+    try:
+        # Convert the whole column at once when every value is a number
+        return array.array("d", map(float, values))
+    except ValueError:
+        return array.array("d", map(_to_float, values))
+
+
+def _to_float_matrix(text, rows, width):
+    # Let NumPy parse the whole text at once, as long as every value is a number
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            values = numpy.fromstring(text, dtype=numpy.float64, sep=",")
+        except (DeprecationWarning, ValueError):
+            return None
+
+    if len(values) != rows * width:
+        return None
+
+    return values.reshape(rows, width)
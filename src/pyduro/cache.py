@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import collections
+import threading
+import time
+
+from pyduro.protocol import FUNCTIONS
+
+# --------------------------------------------------------------------------------------------------
+
+DEFAULT_MAX_ENTRIES = 1024
+
+# Time to live of the cached responses, in seconds, by function identifier.
+# Any function not listed here is never cached.
+DEFAULT_TTLS = {
+    FUNCTIONS.get_settings.value: 300,
+    FUNCTIONS.get_settings_range.value: 3600,
+    FUNCTIONS.get_info.value: 3600,
+    FUNCTIONS.get_sw_versions.value: 3600,
+}
+
+# The functions whose cached responses must be dropped when a setting is updated
+SETTINGS_FUNCTIONS = (
+    FUNCTIONS.get_settings.value,
+    FUNCTIONS.get_settings_range.value,
+)
+
+# --------------------------------------------------------------------------------------------------
+
+
+class ResponseCache:
+    """
+    Defines a cache of the responses received from burners, to avoid asking a burner for data that rarely changes (like
+    its settings or its software versions) over and over again.
+
+    Responses are cached by (serial, function, payload), each for the time to live of its function, and the least
+    recently used responses are evicted once the cache is full. Updating a setting of a burner drops every cached
+    settings response of the same group (e.g. setting "boiler.temp" drops "boiler", "boiler.*", "boiler.temp", ...).
+
+    This is thread-safe, so the same cache can be shared between several clients.
+
+    Args:
+        ttls (dict): The time to live of the responses, in seconds, by function identifier.
+            A function that is not in this dict (or with a time to live of 0) is never cached.
+            Default: DEFAULT_TTLS
+        max_entries (int): The maximum number of responses to keep in the cache.
+            Default: 1024
+
+    Attributes:
+        hits (int): The number of lookups that found a valid response.
+        max_entries (int)
+        misses (int): The number of lookups that didn't find a valid response.
+        ttls (dict)
+    """
+
+    def __init__(self, ttls=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        # (serial, function, payload) -> (expiration, response)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(frame):
+        """
+        Returns the key identifying the response to the given request frame.
+
+        Args:
+            frame (Frame): The request frame.
+
+        Returns:
+            key (tuple(str, int, str)): The serial of the burner, the function and the payload of the frame.
+        """
+
+        return (frame.serial, frame.function_id, frame.payload)
+
+    def lookup(self, frame):
+        """
+        Returns the cached response to the given request frame, if any.
+
+        Args:
+            frame (Frame): The request frame.
+
+        Returns:
+            response (Response): The cached response, or `None` if there is no valid response in the cache.
+        """
+
+        key = self.key(frame)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+
+                self.misses += 1
+
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def store(self, frame, response):
+        """
+        Caches the response to the given request frame, if its function is cacheable and the burner succeeded.
+        If the frame updates a setting, every cached response of the same settings group is dropped instead.
+
+        Args:
+            frame (Frame): The request frame.
+            response (Response): The response from the burner.
+        """
+
+        if frame.function_id == FUNCTIONS.set.value:
+            self.invalidate(frame.serial, frame.payload.split("=", 1)[0])
+
+            return
+
+        ttl = self.ttls.get(frame.function_id, 0)
+        if ttl <= 0 or response is None or response.status != 0:
+            return
+
+        key = self.key(frame)
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, serial, path=None):
+        """
+        Drops the cached responses of the given burner.
+
+        Args:
+            serial (str): The serial number of the burner (as sent in the frames, i.e. left padded with 0s).
+            path (str): The path of the setting that has been updated. Only the settings responses of the same group
+                will be dropped.
+                Default: None (drop every cached response of the burner)
+        """
+
+        group = path.split(".", 1)[0] if path else None
+
+        with self._lock:
+            for key in list(self._entries):
+                entry_serial, function_id, payload = key
+                if entry_serial != serial:
+                    continue
+
+                if group is not None and (
+                    function_id not in SETTINGS_FUNCTIONS
+                    or payload.split(".", 1)[0] not in (group, "*")
+                ):
+                    continue
+
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Drops every cached response.
+        """
+
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,1222 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import asyncio
+import collections
+import time
+
+from pyduro.actions import (
+    DEFAULT_DISCOVERY_ADDRESS,
+    DEFAULT_DISCOVERY_WINDOW,
+    DEFAULT_WATCH_INTERVAL,
+    SETTINGS,
+)
+from pyduro.actions import discover as discover_action
+from pyduro.actions import get as get_action
+from pyduro.actions import raw as raw_action
+from pyduro.actions import set as set_action
+from pyduro.actions import status as status_action
+from pyduro.protocol import (
+    DEFAULT_LOCAL_ADDRESS,
+    DEFAULT_NBE_PORT,
+    DEFAULT_ORIGIN_PORT,
+    DEFAULT_TIMEOUT,
+    FUNCTIONS,
+    NoResponseException,
+    ResponseMalformedException,
+    TooManyPendingRequestsException,
+    TransportClosedException,
+)
+from pyduro.protocol.capture import RECEIVED, SENT
+from pyduro.protocol.codec import MAX_REQUEST_SIZE
+from pyduro.protocol.dispatcher import Dispatcher
+from pyduro.protocol.frame import Response
+from pyduro.protocol.transport import Transport, open_socket
+
+# --------------------------------------------------------------------------------------------------
+
+# `asyncio.get_running_loop` only exists since Python 3.7, where `get_event_loop` returns the running loop as well
+_get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+# --------------------------------------------------------------------------------------------------
+
+Burner = collections.namedtuple("Burner", ["address", "serial", "pin_code"])
+Burner.__doc__ = """
+Identifies a burner on the network.
+
+Attributes:
+    address (str): The IP address of the burner.
+    serial (str): The serial number of the burner.
+    pin_code (str): The secret pincode of the burner.
+"""
+
+# --------------------------------------------------------------------------------------------------
+
+
+class BurnerClient:
+    """
+    Defines a blocking client to talk to one or several burners over a single, long-lived, UDP socket.
+
+    Contrary to the actions, every method raises an exception instead of printing it, and a burner not answering in
+    time raises a `NoResponseException` instead of returning `None`.
+
+    Args:
+        source_address (str): The ip address where to wait for responses.
+            Default: 0.0.0.0 (any local IP)
+        source_port (int): The local port where to wait for responses.
+            Default: 1901 (port used by the Aduro Android application)
+        timeout (float): The default maximum duration to wait for a response from a burner, in seconds.
+            Default: 5
+        cache (ResponseCache): The cache to use to avoid asking burners for data that rarely changes.
+            Default: None (no cache)
+        coalesce (bool): Whether or not identical requests in flight at the same time share the same round trip.
+            Default: True
+        rtt (RttTable): The round trip time estimations of the burners, used to send a request again when its
+            response is late.
+            Default: None (a new table)
+        scheduler (Scheduler): The scheduler deciding when each request can be sent, to limit the number of requests
+            per second and in flight for each burner.
+            Default: None (every request is sent right away)
+        capture (CaptureWriter): Where to record every datagram sent and received, with its timestamp.
+            Default: None (nothing is recorded)
+        metrics (Metrics): Where to count the requests, responses, timeouts, bytes... of every burner.
+            Default: None (nothing is counted)
+
+    Attributes:
+        cache (ResponseCache)
+        timeout (float)
+        transport (Transport): The transport used to send every request.
+    """
+
+    def __init__(
+        self,
+        source_address=DEFAULT_LOCAL_ADDRESS,
+        source_port=DEFAULT_ORIGIN_PORT,
+        timeout=DEFAULT_TIMEOUT,
+        cache=None,
+        coalesce=True,
+        rtt=None,
+        scheduler=None,
+        capture=None,
+        metrics=None,
+    ):
+        self.timeout = timeout
+        self.cache = cache
+        self.transport = Transport(
+            source_address,
+            source_port,
+            coalesce=coalesce,
+            rtt=rtt,
+            scheduler=scheduler,
+            capture=capture,
+            metrics=metrics,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Closes the underlying transport.
+        """
+
+        self.transport.close()
+
+    def request(self, address, frame, timeout=None, destination_port=DEFAULT_NBE_PORT):
+        """
+        Sends the given frame to a burner and wait for its response.
+
+        Args:
+            address (str): The ip address where to send the frame.
+            frame (Frame): The NBE frame to send.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+
+        Returns:
+            response (Response): The response from the burner.
+
+        Throws:
+            NoResponseException: If the burner didn't answer in time.
+        """
+
+        if self.cache is not None:
+            response = self.cache.lookup(frame)
+            if response is not None:
+                return response
+
+        timeout = self.timeout if timeout is None else timeout
+
+        future = self.transport.submit(
+            frame, address, destination_port=destination_port
+        )
+
+        done, _ = self.transport.wait([future], timeout)
+        if not done:
+            self.transport.cancel(future)
+
+            raise NoResponseException(address, timeout)
+
+        response = future.result()
+
+        if self.cache is not None:
+            self.cache.store(frame, response)
+
+        return response
+
+    def request_many(
+        self,
+        address,
+        frames,
+        timeout=None,
+        destination_port=DEFAULT_NBE_PORT,
+        return_exceptions=False,
+    ):
+        """
+        Sends all the given frames to a burner at once and wait for all their responses.
+
+        Args:
+            address (str): The ip address where to send the frames.
+            frames (list(Frame)): The NBE frames to send.
+            timeout (float): The maximum duration to wait for all the responses, in seconds.
+                Default: the timeout of the client
+            destination_port (int): The port where to send the frames.
+                Default: 8483 (default NBE communication protocol port)
+            return_exceptions (bool): Whether to return the exception instead of the response of a frame that failed,
+                rather than raising it.
+                Default: False
+
+        Returns:
+            responses (list(Response)): The response to each frame, in the same order.
+
+        Throws:
+            NoResponseException: If the burner didn't answer every frame in time.
+            TooManyPendingRequestsException: If there are already 99 requests in flight to this burner.
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+
+        responses = []
+        futures = []
+        try:
+            for frame in frames:
+                response = self.cache.lookup(frame) if self.cache is not None else None
+                future = None
+
+                if response is None:
+                    try:
+                        future = self.transport.submit(
+                            frame, address, destination_port=destination_port
+                        )
+                    except TooManyPendingRequestsException as e:
+                        if not return_exceptions:
+                            raise
+
+                        response = e
+
+                responses.append(response)
+                futures.append(future)
+
+            done, _ = self.transport.wait(
+                [future for future in futures if future is not None], timeout
+            )
+
+            for index, (frame, future) in enumerate(zip(frames, futures)):
+                if future is None:
+                    continue
+
+                if future not in done:
+                    if not return_exceptions:
+                        raise NoResponseException(address, timeout)
+
+                    responses[index] = NoResponseException(address, timeout)
+
+                    continue
+
+                responses[index] = future.result()
+
+                if self.cache is not None:
+                    self.cache.store(frame, responses[index])
+        finally:
+            for future in futures:
+                if future is not None and not future.done():
+                    self.transport.cancel(future)
+
+        return responses
+
+    def discover(self, address=DEFAULT_DISCOVERY_ADDRESS, timeout=None):
+        """
+        Discovers a burner on the network.
+
+        Args:
+            address (str): The address where to send the discovery frame.
+                Default: 255.255.255.255
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response of the first burner that answered.
+        """
+
+        return self.request(address, discover_action.build_frame(), timeout=timeout)
+
+    def discover_all(
+        self,
+        window=DEFAULT_DISCOVERY_WINDOW,
+        expected=None,
+        broadcast_addresses=(DEFAULT_DISCOVERY_ADDRESS,),
+    ):
+        """
+        Discovers every burner on the network(s).
+
+        Args:
+            window (float): The duration during which we wait for burners to answer, in seconds.
+                Default: 3
+            expected (int): The number of burners we expect to find. The discovery stops as soon as they all answered.
+                Default: None (always wait for the whole window)
+            broadcast_addresses (list(str)): The addresses where to broadcast the discovery frame.
+                Default: ("255.255.255.255",)
+
+        Returns:
+            responses (list(Response)): The response of each burner found (only once per serial number).
+        """
+
+        return discover_action.run_all(
+            window=window,
+            expected=expected,
+            broadcast_addresses=broadcast_addresses,
+            transport=self.transport,
+        )
+
+    def get(self, burner, function_name, path="*", timeout=None):
+        """
+        Gets information from the given burner.
+
+        Args:
+            burner (Burner): The burner to query.
+            function_name (str): The name of the function you want to run (see `pyduro.actions.FUNCTIONS`).
+            path (str): The path of the payload to load from the burner (or the payload).
+                Default: *
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response from the burner.
+        """
+
+        frame = get_action.build_frame(
+            burner.serial, burner.pin_code, function_name, path
+        )
+
+        return self.request(burner.address, frame, timeout=timeout)
+
+    def get_settings(
+        self, burner, function_names=("settings",), groups=SETTINGS, timeout=None
+    ):
+        """
+        Gets every settings group of the given burner at once (in about a single round trip).
+
+        Args:
+            burner (Burner): The burner to query.
+            function_names (tuple(str)): The functions to run for every group ("settings" and/or "range").
+                Default: ("settings",)
+            groups (tuple(str)): The settings groups to get.
+                Default: every group (see `pyduro.actions.SETTINGS`)
+            timeout (float): The maximum duration to wait for all the responses, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            settings (dict): The fields of every group, by function name and group (e.g.
+                `{"settings": {"boiler": {"temp": "65", ...}, ...}}`).
+
+        Throws:
+            FunctionNotFoundException: If one of the given function names is not a settings function.
+            NoResponseException: If the burner didn't answer every request in time.
+        """
+
+        frames = get_action.build_settings_frames(
+            burner.serial, burner.pin_code, function_names, groups
+        )
+        responses = self.request_many(
+            burner.address, [frame for _, _, frame in frames], timeout=timeout
+        )
+
+        return get_action.merge_settings(frames, responses)
+
+    def set(self, burner, path, value, timeout=None):
+        """
+        Updates a setting of the given burner.
+
+        Args:
+            burner (Burner): The burner to modify.
+            path (str): The path of the setting to modify.
+            value (str): The new value of the setting.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response from the burner.
+        """
+
+        frame = set_action.build_frame(burner.serial, burner.pin_code, path, value)
+
+        return self.request(burner.address, frame, timeout=timeout)
+
+    def set_many(self, burner, settings, verify_values=True, timeout=None):
+        """
+        Updates several settings of the given burner at once and checks that they have been applied.
+
+        Every update is sent at once, then every updated settings group is read back at once.
+
+        Args:
+            burner (Burner): The burner to modify.
+            settings (dict): The new value of every setting to update, by path (e.g. `{"boiler.temp": "65"}`).
+            verify_values (bool): Whether or not to read the updated settings back to check their values.
+                Default: True
+            timeout (float): The maximum duration to wait for the responses of each step (update and verification), in
+                seconds.
+                Default: the timeout of the client
+
+        Returns:
+            results (list(SetResult)): The result of every update, in the same order as the given settings (see
+                `pyduro.actions.set.SetResult`).
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+
+        frames = set_action.build_frames(burner.serial, burner.pin_code, settings)
+        responses = iter(
+            self.request_many(
+                burner.address,
+                [frame for _, _, frame in frames if not isinstance(frame, Exception)],
+                timeout=timeout,
+                return_exceptions=True,
+            )
+        )
+        results = set_action.check_responses(
+            frames,
+            [
+                frame if isinstance(frame, Exception) else next(responses)
+                for _, _, frame in frames
+            ],
+        )
+
+        groups = set_action.verification_groups(results)
+        if not verify_values or not groups:
+            return results
+
+        read_frames = get_action.build_settings_frames(
+            burner.serial, burner.pin_code, groups=groups
+        )
+        read_responses = self.request_many(
+            burner.address,
+            [frame for _, _, frame in read_frames],
+            timeout=timeout,
+            return_exceptions=True,
+        )
+
+        return set_action.verify(
+            results,
+            get_action.merge_settings(read_frames, read_responses),
+            error=NoResponseException(burner.address, timeout),
+        )
+
+    def raw(self, burner, function_id, payload, timeout=None):
+        """
+        Sends a raw request to the given burner.
+
+        Args:
+            burner (Burner): The burner to query.
+            function_id (int): The raw identifier of the function you want to run on the burner.
+            payload (str): The payload to send to the burner.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response from the burner.
+        """
+
+        frame = raw_action.build_frame(
+            burner.serial, burner.pin_code, function_id, payload
+        )
+
+        return self.request(burner.address, frame, timeout=timeout)
+
+    def status(self, burner, timeout=None):
+        """
+        Gets the status of the given burner.
+
+        Args:
+            burner (Burner): The burner to query.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response from the burner.
+        """
+
+        return self.raw(burner, FUNCTIONS.get_status.value, "*", timeout=timeout)
+
+    def get_status(self, burner, timeout=None):
+        """
+        Gets the decoded status of the given burner.
+
+        Args:
+            burner (Burner): The burner to query.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            status (Status): The decoded status (see `pyduro.actions.status.StatusSchema`), or `None` if the burner
+                returned an error.
+        """
+
+        return status_action.decode(self.status(burner, timeout=timeout))
+
+    def watch(self, burner, interval=DEFAULT_WATCH_INTERVAL, timeout=None):
+        """
+        Polls the status of the given burner at a regular interval and yields the fields that changed since the previous
+        sample.
+
+        The first sample yields every field. The samples that the burner doesn't answer in time (or answers with an
+        error) are skipped, the next one is then compared with the last known status.
+
+        Args:
+            burner (Burner): The burner to watch.
+            interval (float): The duration between two samples, in seconds.
+                Default: 5
+            timeout (float): The maximum duration to wait for each sample, in seconds.
+                Default: the timeout of the client
+
+        Yields:
+            delta (StatusDelta): The changes of each sample that differs from the previous one.
+        """
+
+        previous = None
+        next_sample = time.monotonic()
+
+        while True:
+            try:
+                status = self.get_status(burner, timeout=timeout)
+            except NoResponseException:
+                status = None
+
+            if status is not None:
+                changes = status_action.STATUS_SCHEMA.diff(previous, status)
+                if changes:
+                    yield status_action.StatusDelta(time.time(), changes, status)
+
+                previous = status
+
+            # Don't drift, but don't try to catch up on the samples that took too long either
+            next_sample = max(next_sample + interval, time.monotonic())
+            time.sleep(max(0, next_sample - time.monotonic()))
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    """
+    Routes every datagram received by the asyncio client to the request it answers.
+    """
+
+    def __init__(self, dispatcher, release=None, capture=None):
+        self.dispatcher = dispatcher
+        self.release = release
+        self.capture = capture
+
+    def datagram_received(self, data, addr):
+        metrics = self.dispatcher.metrics
+        if self.capture is not None:
+            self.capture.write(RECEIVED, addr[0], addr[1], data)
+        if metrics is not None:
+            metrics.increment("received_bytes", addr[0], len(data))
+
+        try:
+            response = Response(data, addr)
+        except ResponseMalformedException:
+            if metrics is not None:
+                metrics.increment("malformed", addr[0])
+
+            return
+
+        request = self.dispatcher.dispatch(response)
+        if self.release is not None and request is not None:
+            self.release(request)
+
+    def error_received(self, exc):
+        # Most likely an ICMP "port unreachable" from a burner that is not there, the request will time out anyway
+        pass
+
+    def connection_lost(self, exc):
+        self.dispatcher.fail_all(TransportClosedException())
+
+
+class AsyncBurnerClient:
+    """
+    Defines an asyncio client to talk to one or several burners over a single, long-lived, UDP socket.
+
+    Every request is given its own sequence number, so any number of requests (up to 99 per burner) can be awaited
+    concurrently on the same event loop, each with its own timeout.
+    The socket is opened on the first request (or when entering the client as an async context manager).
+
+    Args:
+        source_address (str): The ip address where to wait for responses.
+            Default: 0.0.0.0 (any local IP)
+        source_port (int): The local port where to wait for responses.
+            Default: 1901 (port used by the Aduro Android application)
+        timeout (float): The default maximum duration to wait for a response from a burner, in seconds.
+            Default: 5
+        cache (ResponseCache): The cache to use to avoid asking burners for data that rarely changes.
+            Default: None (no cache)
+        coalesce (bool): Whether or not identical requests in flight at the same time share the same round trip.
+            Default: True
+        rtt (RttTable): The round trip time estimations of the burners, used to send a request again when its
+            response is late.
+            Default: None (a new table)
+        scheduler (Scheduler): The scheduler deciding when each request can be sent, to limit the number of requests
+            per second and in flight for each burner.
+            Note that discoveries and retransmissions are always sent right away.
+            Default: None (every request is sent right away)
+        capture (CaptureWriter): Where to record every datagram sent and received, with its timestamp.
+            Default: None (nothing is recorded)
+        metrics (Metrics): Where to count the requests, responses, timeouts, bytes... of every burner.
+            Default: None (nothing is counted)
+
+    Attributes:
+        capture (CaptureWriter)
+        cache (ResponseCache)
+        coalesce (bool)
+        metrics (Metrics)
+        rtt (RttTable)
+        scheduler (Scheduler)
+        source_address (str)
+        source_port (int)
+        timeout (float)
+    """
+
+    def __init__(
+        self,
+        source_address=DEFAULT_LOCAL_ADDRESS,
+        source_port=DEFAULT_ORIGIN_PORT,
+        timeout=DEFAULT_TIMEOUT,
+        cache=None,
+        coalesce=True,
+        rtt=None,
+        scheduler=None,
+        capture=None,
+        metrics=None,
+    ):
+        self.source_address = source_address
+        self.source_port = source_port
+        self.timeout = timeout
+        self.cache = cache
+        self.coalesce = coalesce
+        self.scheduler = scheduler
+        self.capture = capture
+        self.metrics = metrics
+
+        self._dispatcher = Dispatcher(rtt, metrics)
+        self.rtt = self._dispatcher.rtt
+        self._pump_handle = None
+        self._send_buffer = bytearray(MAX_REQUEST_SIZE)
+        self._send_view = memoryview(self._send_buffer)
+        self._transport = None
+
+    async def __aenter__(self):
+        await self.open()
+
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    async def open(self):
+        """
+        Opens the underlying socket (if not already opened).
+        """
+
+        if self._transport is not None:
+            return
+
+        sock = open_socket(self.source_address, self.source_port)
+        sock.setblocking(False)
+
+        # Keep the actual port, in case we asked the system to pick one (source_port=0)
+        self.source_port = sock.getsockname()[1]
+
+        self._transport, _ = await _get_running_loop().create_datagram_endpoint(
+            lambda: _DatagramProtocol(self._dispatcher, self._release, self.capture),
+            sock=sock,
+        )
+
+    def close(self):
+        """
+        Closes the underlying socket. Any request still in flight will fail with a `TransportClosedException`.
+        """
+
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+        if self._pump_handle is not None:
+            self._pump_handle.cancel()
+            self._pump_handle = None
+        if self.scheduler is not None:
+            self.scheduler.clear()
+
+        self._dispatcher.fail_all(TransportClosedException())
+
+    async def request(
+        self, address, frame, timeout=None, destination_port=DEFAULT_NBE_PORT
+    ):
+        """
+        Sends the given frame to a burner and wait for its response.
+
+        Args:
+            address (str): The ip address where to send the frame.
+            frame (Frame): The NBE frame to send.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+
+        Returns:
+            response (Response): The response from the burner.
+
+        Throws:
+            NoResponseException: If the burner didn't answer in time.
+            TooManyPendingRequestsException: If there are already 99 requests in flight to this burner.
+        """
+
+        if self.cache is not None:
+            response = self.cache.lookup(frame)
+            if response is not None:
+                return response
+
+        await self.open()
+
+        timeout = self.timeout if timeout is None else timeout
+
+        future = _get_running_loop().create_future()
+        broadcast = frame.function_id == FUNCTIONS.discover.value
+
+        request = None
+        if self.coalesce and not broadcast:
+            request = self._dispatcher.join(frame, address, destination_port, future)
+
+        try:
+            if request is None:
+                request = self._dispatcher.register(
+                    frame,
+                    address,
+                    destination_port,
+                    future,
+                    broadcast=broadcast,
+                    coalesce=self.coalesce,
+                )
+
+                if self.scheduler is not None and not broadcast:
+                    self.scheduler.push(request)
+                    self._pump()
+                else:
+                    self._send(request)
+
+            response = await self._wait(request, future, timeout)
+        except asyncio.TimeoutError:
+            raise NoResponseException(address, timeout)
+        finally:
+            if request is not None:
+                self._dispatcher.cancel(request, future)
+                self._release(request)
+
+        if self.cache is not None:
+            self.cache.store(frame, response)
+
+        return response
+
+    async def request_many(
+        self,
+        address,
+        frames,
+        timeout=None,
+        destination_port=DEFAULT_NBE_PORT,
+        return_exceptions=False,
+    ):
+        """
+        Sends all the given frames to a burner at once and wait for all their responses.
+
+        Args:
+            address (str): The ip address where to send the frames.
+            frames (list(Frame)): The NBE frames to send.
+            timeout (float): The maximum duration to wait for all the responses, in seconds.
+                Default: the timeout of the client
+            destination_port (int): The port where to send the frames.
+                Default: 8483 (default NBE communication protocol port)
+            return_exceptions (bool): Whether to return the exception instead of the response of a frame that failed,
+                rather than raising it.
+                Default: False
+
+        Returns:
+            responses (list(Response)): The response to each frame, in the same order.
+
+        Throws:
+            NoResponseException: If the burner didn't answer every frame in time.
+            TooManyPendingRequestsException: If there are already 99 requests in flight to this burner.
+        """
+
+        responses = await asyncio.gather(
+            *[
+                self.request(
+                    address,
+                    frame,
+                    timeout=timeout,
+                    destination_port=destination_port,
+                )
+                for frame in frames
+            ],
+            return_exceptions=True
+        )
+
+        if not return_exceptions:
+            for response in responses:
+                if isinstance(response, Exception):
+                    raise response
+
+        return responses
+
+    async def discover(self, address=DEFAULT_DISCOVERY_ADDRESS, timeout=None):
+        """
+        Discovers a burner on the network.
+
+        Args:
+            address (str): The address where to send the discovery frame.
+                Default: 255.255.255.255
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response of the first burner that answered.
+        """
+
+        return await self.request(
+            address, discover_action.build_frame(), timeout=timeout
+        )
+
+    async def discover_iter(
+        self,
+        window=DEFAULT_DISCOVERY_WINDOW,
+        expected=None,
+        broadcast_addresses=(DEFAULT_DISCOVERY_ADDRESS,),
+        destination_port=DEFAULT_NBE_PORT,
+    ):
+        """
+        Discovers every burner on the network(s), yielding each of them as soon as it answers.
+
+        Args:
+            window (float): The duration during which we wait for burners to answer, in seconds.
+                Default: 3
+            expected (int): The number of burners we expect to find. The discovery stops as soon as they all answered.
+                Default: None (always wait for the whole window)
+            broadcast_addresses (list(str)): The addresses where to broadcast the discovery frame.
+                Default: ("255.255.255.255",)
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+
+        Yields:
+            response (Response): The response of each burner found (only once per serial number).
+        """
+
+        await self.open()
+
+        loop = _get_running_loop()
+        responses = asyncio.Queue()
+        future = loop.create_future()
+        future.add_done_callback(lambda _: responses.put_nowait(None))
+
+        frame = discover_action.build_frame()
+        request = self._dispatcher.register(
+            frame,
+            broadcast_addresses[0],
+            destination_port,
+            future,
+            broadcast=True,
+            listener=responses.put_nowait,
+        )
+
+        found = set()
+        deadline = loop.time() + window
+
+        try:
+            size = frame.encode_into(self._send_buffer)
+            for address in broadcast_addresses:
+                self._transport.sendto(
+                    self._send_view[:size], (address, destination_port)
+                )
+
+                if self.capture is not None:
+                    self.capture.write(
+                        SENT, address, destination_port, self._send_view[:size]
+                    )
+                if self.metrics is not None:
+                    self.metrics.increment("sent_bytes", address, size)
+
+            while expected is None or len(found) < expected:
+                try:
+                    response = await asyncio.wait_for(
+                        responses.get(), deadline - loop.time()
+                    )
+                except asyncio.TimeoutError:
+                    return
+
+                if response is None:
+                    # The client has been closed
+                    future.result()
+
+                    return
+
+                if response.serial not in found:
+                    found.add(response.serial)
+
+                    yield response
+        finally:
+            self._dispatcher.cancel(request)
+
+    async def discover_all(
+        self,
+        window=DEFAULT_DISCOVERY_WINDOW,
+        expected=None,
+        broadcast_addresses=(DEFAULT_DISCOVERY_ADDRESS,),
+    ):
+        """
+        Discovers every burner on the network(s).
+        See `discover_iter` for the details.
+
+        Returns:
+            responses (list(Response)): The response of each burner found (only once per serial number).
+        """
+
+        return [
+            response
+            async for response in self.discover_iter(
+                window=window,
+                expected=expected,
+                broadcast_addresses=broadcast_addresses,
+            )
+        ]
+
+    async def get(self, burner, function_name, path="*", timeout=None):
+        """
+        Gets information from the given burner.
+
+        Args:
+            burner (Burner): The burner to query.
+            function_name (str): The name of the function you want to run (see `pyduro.actions.FUNCTIONS`).
+            path (str): The path of the payload to load from the burner (or the payload).
+                Default: *
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response from the burner.
+        """
+
+        frame = get_action.build_frame(
+            burner.serial, burner.pin_code, function_name, path
+        )
+
+        return await self.request(burner.address, frame, timeout=timeout)
+
+    async def get_settings(
+        self, burner, function_names=("settings",), groups=SETTINGS, timeout=None
+    ):
+        """
+        Gets every settings group of the given burner at once (in about a single round trip).
+
+        Args:
+            burner (Burner): The burner to query.
+            function_names (tuple(str)): The functions to run for every group ("settings" and/or "range").
+                Default: ("settings",)
+            groups (tuple(str)): The settings groups to get.
+                Default: every group (see `pyduro.actions.SETTINGS`)
+            timeout (float): The maximum duration to wait for all the responses, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            settings (dict): The fields of every group, by function name and group (e.g.
+                `{"settings": {"boiler": {"temp": "65", ...}, ...}}`).
+
+        Throws:
+            FunctionNotFoundException: If one of the given function names is not a settings function.
+            NoResponseException: If the burner didn't answer every request in time.
+        """
+
+        frames = get_action.build_settings_frames(
+            burner.serial, burner.pin_code, function_names, groups
+        )
+        responses = await self.request_many(
+            burner.address, [frame for _, _, frame in frames], timeout=timeout
+        )
+
+        return get_action.merge_settings(frames, responses)
+
+    async def set(self, burner, path, value, timeout=None):
+        """
+        Updates a setting of the given burner.
+
+        Args:
+            burner (Burner): The burner to modify.
+            path (str): The path of the setting to modify.
+            value (str): The new value of the setting.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response from the burner.
+        """
+
+        frame = set_action.build_frame(burner.serial, burner.pin_code, path, value)
+
+        return await self.request(burner.address, frame, timeout=timeout)
+
+    async def set_many(self, burner, settings, verify_values=True, timeout=None):
+        """
+        Updates several settings of the given burner at once and checks that they have been applied.
+
+        Every update is sent at once, then every updated settings group is read back at once.
+
+        Args:
+            burner (Burner): The burner to modify.
+            settings (dict): The new value of every setting to update, by path (e.g. `{"boiler.temp": "65"}`).
+            verify_values (bool): Whether or not to read the updated settings back to check their values.
+                Default: True
+            timeout (float): The maximum duration to wait for the responses of each step (update and verification), in
+                seconds.
+                Default: the timeout of the client
+
+        Returns:
+            results (list(SetResult)): The result of every update, in the same order as the given settings (see
+                `pyduro.actions.set.SetResult`).
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+
+        frames = set_action.build_frames(burner.serial, burner.pin_code, settings)
+        responses = iter(
+            await self.request_many(
+                burner.address,
+                [frame for _, _, frame in frames if not isinstance(frame, Exception)],
+                timeout=timeout,
+                return_exceptions=True,
+            )
+        )
+        results = set_action.check_responses(
+            frames,
+            [
+                frame if isinstance(frame, Exception) else next(responses)
+                for _, _, frame in frames
+            ],
+        )
+
+        groups = set_action.verification_groups(results)
+        if not verify_values or not groups:
+            return results
+
+        read_frames = get_action.build_settings_frames(
+            burner.serial, burner.pin_code, groups=groups
+        )
+        read_responses = await self.request_many(
+            burner.address,
+            [frame for _, _, frame in read_frames],
+            timeout=timeout,
+            return_exceptions=True,
+        )
+
+        return set_action.verify(
+            results,
+            get_action.merge_settings(read_frames, read_responses),
+            error=NoResponseException(burner.address, timeout),
+        )
+
+    async def raw(self, burner, function_id, payload, timeout=None):
+        """
+        Sends a raw request to the given burner.
+
+        Args:
+            burner (Burner): The burner to query.
+            function_id (int): The raw identifier of the function you want to run on the burner.
+            payload (str): The payload to send to the burner.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response from the burner.
+        """
+
+        frame = raw_action.build_frame(
+            burner.serial, burner.pin_code, function_id, payload
+        )
+
+        return await self.request(burner.address, frame, timeout=timeout)
+
+    async def status(self, burner, timeout=None):
+        """
+        Gets the status of the given burner.
+
+        Args:
+            burner (Burner): The burner to query.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            response (Response): The response from the burner.
+        """
+
+        return await self.raw(burner, FUNCTIONS.get_status.value, "*", timeout=timeout)
+
+    async def get_status(self, burner, timeout=None):
+        """
+        Gets the decoded status of the given burner.
+
+        Args:
+            burner (Burner): The burner to query.
+            timeout (float): The maximum duration to wait for the response, in seconds.
+                Default: the timeout of the client
+
+        Returns:
+            status (Status): The decoded status (see `pyduro.actions.status.StatusSchema`), or `None` if the burner
+                returned an error.
+        """
+
+        return status_action.decode(await self.status(burner, timeout=timeout))
+
+    async def watch(self, burner, interval=DEFAULT_WATCH_INTERVAL, timeout=None):
+        """
+        Polls the status of the given burner at a regular interval and yields the fields that changed since the previous
+        sample.
+
+        The first sample yields every field. The samples that the burner doesn't answer in time (or answers with an
+        error) are skipped, the next one is then compared with the last known status.
+
+        Args:
+            burner (Burner): The burner to watch.
+            interval (float): The duration between two samples, in seconds.
+                Default: 5
+            timeout (float): The maximum duration to wait for each sample, in seconds.
+                Default: the timeout of the client
+
+        Yields:
+            delta (StatusDelta): The changes of each sample that differs from the previous one.
+        """
+
+        previous = None
+        next_sample = time.monotonic()
+
+        while True:
+            try:
+                status = await self.get_status(burner, timeout=timeout)
+            except NoResponseException:
+                status = None
+
+            if status is not None:
+                changes = status_action.STATUS_SCHEMA.diff(previous, status)
+                if changes:
+                    yield status_action.StatusDelta(time.time(), changes, status)
+
+                previous = status
+
+            # Don't drift, but don't try to catch up on the samples that took too long either
+            next_sample = max(next_sample + interval, time.monotonic())
+            await asyncio.sleep(max(0, next_sample - time.monotonic()))
+
+    def _send(self, request):
+        size = request.frame.encode_into(self._send_buffer)
+        self._transport.sendto(self._send_view[:size], (request.address, request.port))
+
+        if self.capture is not None:
+            self.capture.write(
+                SENT, request.address, request.port, self._send_view[:size]
+            )
+        if self.metrics is not None:
+            self.metrics.increment("sent_bytes", request.address, size)
+
+        self._dispatcher.sent(request)
+
+    async def _wait(self, request, future, timeout):
+        # Wait for the response, sending the request again (with the same sequence number) whenever it is late.
+        # The `sent_at` of the requests is measured with `time.monotonic`, which is the clock of the loop as well.
+        loop = _get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        delay = self.rtt.timeout(request.address)
+
+        while not future.done():
+            now = loop.time()
+            if deadline is not None and now >= deadline:
+                raise asyncio.TimeoutError()
+
+            if request.sent_at is None:
+                # Still waiting for its turn (see `Scheduler`)
+                retransmission = now + delay
+            else:
+                # Every caller sharing this request (see `Dispatcher.join`) computes the same time from its last
+                # transmission, so only the first of them to wake up sends it again
+                retransmission = request.sent_at + min(
+                    delay * 2 ** (request.transmissions - 1), self.rtt.maximum
+                )
+
+                if retransmission <= now:
+                    if (
+                        self._transport is None
+                        or self._dispatcher.pending.get(request.key) is not request
+                    ):
+                        # Nothing left to send again: just wait for the response (or the deadline)
+                        retransmission = None
+                    else:
+                        if request.transmissions == 1:
+                            self.rtt.backoff(request.address, request.sent_at)
+
+                        self._send(request)
+
+                        continue
+
+            until = (
+                retransmission
+                if deadline is None
+                else min(retransmission or deadline, deadline)
+            )
+
+            await asyncio.wait(
+                [future], timeout=None if until is None else max(0, until - now)
+            )
+
+        return future.result()
+
+    def _pump(self):
+        # Send every request whose turn has come, and come back when the next one's turn comes
+        if self._pump_handle is not None:
+            self._pump_handle.cancel()
+            self._pump_handle = None
+
+        if self.scheduler is None or self._transport is None:
+            return
+
+        for request in self.scheduler.pop():
+            self._send(request)
+
+        next_at = self.scheduler.next_at()
+        if next_at is not None:
+            self._pump_handle = _get_running_loop().call_later(
+                max(0, next_at - time.monotonic()), self._pump
+            )
+
+    def _release(self, request):
+        # Give the turn of a request that is not in flight anymore to another one
+        if self.scheduler is None or request.listener is not None:
+            return
+
+        if self._dispatcher.pending.get(request.key) is not request:
+            self.scheduler.done(request)
+            self._pump()
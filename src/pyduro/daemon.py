@@ -0,0 +1,855 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import concurrent.futures
+import itertools
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+import time
+
+from pyduro.cache import ResponseCache
+from pyduro.daemon_socket import (
+    SOCKET_PATH_VARIABLE,
+    default_socket_directory,
+    default_socket_path,
+)
+from pyduro.protocol import (
+    DEFAULT_LOCAL_ADDRESS,
+    DEFAULT_NBE_PORT,
+    DEFAULT_ORIGIN_PORT,
+    DaemonAlreadyRunningException,
+    DaemonRequestException,
+    DaemonSocketUnsafeException,
+    NoResponseException,
+    TooManyPendingRequestsException,
+    TransportClosedException,
+)
+from pyduro.protocol.frame import Frame, Response
+from pyduro.protocol.metrics import Metrics
+from pyduro.protocol.transport import Transport
+
+# --------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# The longest a request is kept in flight by the daemon, when its client neither gets a response nor cancels it
+DEFAULT_MAX_WAIT = 60
+
+# --------------------------------------------------------------------------------------------------
+
+
+def connect(path=None):
+    """
+    Connects to the daemon, if it is running.
+
+    Args:
+        path (str): The path of the daemon socket.
+            Default: None (see `default_socket_path`)
+
+    Returns:
+        transport (DaemonTransport): A transport sending every request through the daemon, or `None` if no daemon is
+            listening on this socket, or if the socket (or the daemon) belongs to another user.
+    """
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    try:
+        return DaemonTransport(path)
+    except OSError:
+        return None
+    except DaemonSocketUnsafeException as e:
+        logger.warning(e.message)
+
+        return None
+
+
+class Daemon:
+    """
+    Defines a long-running process owning the UDP socket to the burners, so that every local script or command shares
+    it (see `DaemonTransport`): the round trip time estimations, the cache of the responses and the metrics of every
+    burner stay warm between two commands, and answering a command takes a round trip to the burner (or none, when
+    cached) instead of opening a new socket each time.
+
+    The daemon listens on a Unix socket, only accessible to the current user: the socket is created with no permission
+    for the group and the others, in a private directory by default, and the connections of other users are refused.
+    Each line sent on a connection is a JSON
+    request, answered by a JSON line with the same "id" (maybe out of order):
+        - `{"op": "submit", "id": 1, "address": "192.168.1.250", "port": 8483, "frame": {"serial": ...,
+          "pin_code": ..., "function_id": ..., "payload": ..., "app_id": ...}}` sends a frame to a burner, and is
+          answered with the response (`{"id": 1, "data": <response frame>, "address": ..., "port": ...}`) or an error
+          (`{"id": 1, "error": <message>, "exception": <exception name>}`).
+        - `{"op": "cancel", "id": 1}` stops waiting for the response of a frame (not answered).
+        - `{"op": "stats", "id": 2}` is answered with the uptime of the daemon, the statistics of its cache and the
+          metrics of every burner (see `Metrics.snapshot`).
+        - `{"op": "metrics", "id": 3}` is answered with the metrics in the Prometheus text format (under "text").
+
+    Args:
+        path (str): The path of the socket where to listen.
+            Default: None (see `default_socket_path`)
+        source_address (str): The ip address where to wait for responses from the burners.
+            Default: 0.0.0.0 (any local IP)
+        source_port (int): The local port where to wait for responses from the burners.
+            Default: 1901 (port used by the Aduro Android application)
+        cache (ResponseCache): The cache of the responses.
+            Default: None (a new cache, with the default time to live of every function)
+        scheduler (Scheduler): The scheduler deciding when each request can be sent (see `Transport`).
+            Default: None (every request is sent right away)
+        metrics (Metrics): Where to count the requests, responses, timeouts, bytes... of every burner.
+            Default: None (new metrics)
+        max_wait (float): The longest a request is kept in flight, in seconds, if its client doesn't cancel it.
+            Default: 60
+
+    Attributes:
+        cache (ResponseCache)
+        max_wait (float)
+        metrics (Metrics)
+        path (str)
+        requests (int): The number of frames submitted by the clients.
+        started_at (float): When the daemon started, as a UNIX timestamp.
+        transport (Transport): The transport used to send every request.
+
+    Throws:
+        DaemonAlreadyRunningException: If another daemon is already listening on the socket.
+        DaemonSocketUnsafeException: If the socket, or the default directory of the socket, belongs to another user (or
+            if this directory is accessible to other users).
+    """
+
+    def __init__(
+        self,
+        path=None,
+        source_address=DEFAULT_LOCAL_ADDRESS,
+        source_port=DEFAULT_ORIGIN_PORT,
+        cache=None,
+        scheduler=None,
+        metrics=None,
+        max_wait=DEFAULT_MAX_WAIT,
+    ):
+        self.path = default_socket_path() if path is None else path
+        self.cache = ResponseCache() if cache is None else cache
+        self.metrics = Metrics() if metrics is None else metrics
+        self.max_wait = max_wait
+        self.requests = 0
+        self.started_at = time.time()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if directory == default_socket_directory():
+            try:
+                os.mkdir(directory, 0o700)
+            except FileExistsError:
+                pass
+
+            _check_owner(directory, private=True)
+
+        running = connect(self.path)
+        if running is not None:
+            running.close()
+
+            raise DaemonAlreadyRunningException(self.path)
+
+        # A socket left behind by a daemon that didn't stop properly
+        if os.path.lexists(self.path):
+            _check_owner(self.path)
+            os.unlink(self.path)
+
+        self.transport = Transport(
+            source_address, source_port, scheduler=scheduler, metrics=self.metrics
+        )
+
+        # Every request in flight is waited for by a single thread, woken up by the responses and the timers (see
+        # `_wait_forever`), so that there is no limit to the number of requests in flight
+        self._waiting = {}
+        self._finished = []
+        self._condition = threading.Condition()
+        self._closing = False
+        self._waiter = threading.Thread(
+            target=self._wait_forever, name="pyduro-daemon-waiter", daemon=True
+        )
+
+        # Create the socket without any permission for the group and the others, rather than restricting them once
+        # anybody may have connected
+        mask = os.umask(0o177)
+        try:
+            self._server = _Server(self.path, _Handler)
+        except:
+            self.transport.close()
+            raise
+        finally:
+            os.umask(mask)
+
+        self._server.daemon = self
+        self._serving = False
+        self._waiter.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def serve_forever(self):
+        """
+        Serves the clients until the daemon is closed (from another thread).
+        """
+
+        self._serving = True
+        self._server.serve_forever()
+
+    def close(self):
+        """
+        Stops serving the clients, closes the transport (every request still in flight fails) and removes the socket.
+        """
+
+        if self._serving:
+            self._server.shutdown()
+        self._server.server_close()
+        self.transport.close()
+
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        self._waiter.join()
+
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def stats(self):
+        """
+        Returns the statistics of the daemon.
+
+        Returns:
+            stats (dict): The uptime of the daemon (in seconds), the number of frames submitted, the statistics of the
+                cache and the metrics of every burner (see `Metrics.snapshot`).
+        """
+
+        return dict(
+            uptime=time.time() - self.started_at,
+            requests=self.requests,
+            cache=dict(
+                entries=len(self.cache), hits=self.cache.hits, misses=self.cache.misses
+            ),
+            burners=self.metrics.snapshot(),
+        )
+
+    def process(self, message, in_flight, reply):
+        """
+        Processes a request of a client.
+
+        Args:
+            message (dict): The request (see `Daemon`).
+            in_flight (dict): The futures of the frames of this client still in flight, by request identifier.
+            reply (callable): The function to call with the answer (a dict) to send to the client.
+        """
+
+        request_id = message.get("id")
+        operation = message.get("op")
+
+        try:
+            if operation == "submit":
+                self._submit(request_id, message, in_flight, reply)
+            elif operation == "cancel":
+                future = in_flight.pop(request_id, None)
+                if future is not None:
+                    self.transport.cancel(future)
+            elif operation == "stats":
+                reply(dict(self.stats(), id=request_id))
+            elif operation == "metrics":
+                reply(dict(id=request_id, text=self.metrics.to_prometheus()))
+            else:
+                reply(
+                    dict(
+                        id=request_id,
+                        error="Unknown operation: {}".format(operation),
+                        exception=None,
+                    )
+                )
+        except Exception as e:
+            reply(_error(request_id, e))
+
+    def _submit(self, request_id, message, in_flight, reply):
+        self.requests += 1
+
+        frame = Frame(
+            function_check=False,
+            **{
+                name: message["frame"][name]
+                for name in ("serial", "pin_code", "function_id", "payload", "app_id")
+            }
+        )
+
+        response = self.cache.lookup(frame)
+        if response is not None:
+            reply(_answer(request_id, response))
+
+            return
+
+        future = self.transport.submit(
+            frame,
+            message["address"],
+            destination_port=message.get("port", DEFAULT_NBE_PORT),
+        )
+        in_flight[request_id] = future
+
+        now = time.monotonic()
+        delay = self.transport.rtt.timeout(future.request.address)
+        with self._condition:
+            self._waiting[future] = _Waiting(
+                request_id,
+                frame,
+                in_flight,
+                reply,
+                now + self.max_wait,
+                delay,
+                (future.request.sent_at or now) + delay,
+            )
+            self._condition.notify()
+
+        # Called right away if the response has already been received
+        future.add_done_callback(self._done)
+
+    def _done(self, future):
+        # Called by the receiver thread of the transport: replying to the client is left to the waiter thread
+        with self._condition:
+            self._finished.append(future)
+            self._condition.notify()
+
+    def _wait_forever(self):
+        while True:
+            with self._condition:
+                while not self._finished and not self._closing:
+                    timeout = self._next_timer() - time.monotonic()
+                    if timeout <= 0:
+                        break
+
+                    self._condition.wait(timeout)
+
+                if self._closing and not self._finished:
+                    return
+
+                finished, self._finished = self._finished, []
+                answered = [
+                    (future, self._waiting.pop(future, None)) for future in finished
+                ]
+
+            for future, waiting in answered:
+                if waiting is not None:
+                    self._reply(future, waiting)
+
+            self._run_timers()
+
+    def _next_timer(self):
+        # The earliest retransmission or deadline of the requests in flight
+        return min(
+            (
+                min(waiting.deadline, waiting.retransmission)
+                for waiting in self._waiting.values()
+            ),
+            default=time.monotonic() + self.max_wait,
+        )
+
+    def _run_timers(self):
+        now = time.monotonic()
+        with self._condition:
+            expired = [
+                (future, self._waiting.pop(future))
+                for future, waiting in list(self._waiting.items())
+                if waiting.deadline <= now
+            ]
+            late = [
+                (future, waiting)
+                for future, waiting in self._waiting.items()
+                if waiting.retransmission <= now
+            ]
+
+        for future, waiting in expired:
+            if waiting.in_flight.pop(waiting.request_id, None) is None:
+                # Cancelled by the client
+                continue
+
+            self.transport.cancel(future)
+            waiting.reply(
+                _error(
+                    waiting.request_id,
+                    NoResponseException(future.request.address, self.max_wait),
+                )
+            )
+
+        # Same retransmissions as `Transport.wait`
+        for future, waiting in late:
+            request = future.request
+            if request.sent_at is None or request.sent_at + waiting.delay > now:
+                # The request is still waiting for its turn (see `Scheduler`), or has been sent later than expected
+                waiting.retransmission = (request.sent_at or now) + waiting.delay
+            elif self.transport.retransmit(future):
+                waiting.delay = min(waiting.delay * 2, self.transport.rtt.maximum)
+                waiting.retransmission = now + waiting.delay
+            else:
+                # Answered or cancelled in the meantime
+                waiting.retransmission = float("inf")
+
+    def _reply(self, future, waiting):
+        request_id, frame, reply = waiting.request_id, waiting.frame, waiting.reply
+
+        if waiting.in_flight.pop(request_id, None) is None:
+            # Cancelled by the client
+            return
+
+        try:
+            response = future.result()
+        except Exception as e:
+            reply(_error(request_id, e))
+
+            return
+
+        self.cache.store(frame, response)
+        reply(_answer(request_id, response))
+
+
+class DaemonTransport:
+    """
+    Defines a transport sending every request through the daemon (see `Daemon`) instead of its own UDP socket. It can
+    be given to any action instead of a `Transport`.
+
+    The daemon sends the requests again when their responses are late, so `wait` just waits.
+
+    Args:
+        path (str): The path of the daemon socket.
+            Default: None (see `default_socket_path`)
+
+    Attributes:
+        closed (bool): Whether or not the connection to the daemon has been closed.
+        path (str)
+
+    Throws:
+        OSError: If no daemon is listening on the socket.
+        DaemonSocketUnsafeException: If the socket (or its default directory) belongs to another user, or if the daemon
+            listening on it is run by another user.
+    """
+
+    def __init__(self, path=None):
+        self.path = default_socket_path() if path is None else path
+        self.closed = False
+
+        self._futures = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+        # Never send the pin codes to a process of another user
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if directory == default_socket_directory():
+            _check_owner(directory, private=True)
+        _check_owner(self.path)
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.connect(self.path)
+            _check_peer(self._socket, self.path)
+        except:
+            self._socket.close()
+            raise
+
+        self._receiver = threading.Thread(
+            target=self._receive, name="pyduro-daemon-client", daemon=True
+        )
+        self._receiver.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Closes the connection to the daemon. Any request still in flight will fail with a `TransportClosedException`
+        (and is cancelled by the daemon), and any later request will fail the same way.
+        """
+
+        with self._lock:
+            if self.closed:
+                return
+
+            self.closed = True
+
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+        self._receiver.join()
+        self._socket.close()
+
+    def submit(
+        self,
+        frame,
+        destination_address,
+        destination_port=DEFAULT_NBE_PORT,
+        verbose=False,
+    ):
+        """
+        Sends the given frame to the burner, through the daemon, without waiting for the response.
+
+        Args:
+            frame (Frame): The NBE frame to send.
+            destination_address (str): The ip address where to send the frame.
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+            verbose (bool): Indicates if we want to display the frame before sending it.
+                Default: False
+
+        Returns:
+            future (concurrent.futures.Future): The future that will hold the response of the burner.
+
+        Throws:
+            TransportClosedException: If the connection to the daemon has been closed.
+        """
+
+        if verbose:
+            print(frame.encode())
+
+        future = self._request(
+            dict(
+                op="submit",
+                address=destination_address,
+                port=destination_port,
+                frame=dict(
+                    serial=frame.serial,
+                    pin_code=frame.pin_code,
+                    function_id=frame.function_id,
+                    payload=frame.payload,
+                    app_id=frame.app_id,
+                ),
+            )
+        )
+        future.address = destination_address
+
+        return future
+
+    def cancel(self, future):
+        """
+        Stops waiting for the response of the given request. A late response will then be dropped.
+
+        Args:
+            future (concurrent.futures.Future): The future returned by `submit`.
+        """
+
+        with self._lock:
+            pending = self._futures.pop(future.request_id, None) is not None
+
+        if pending:
+            try:
+                self._write(dict(op="cancel", id=future.request_id))
+            except OSError:
+                pass
+
+        future.cancel()
+
+    def send(
+        self,
+        frame,
+        destination_address,
+        destination_port=DEFAULT_NBE_PORT,
+        timeout=5,
+        verbose=False,
+    ):
+        """
+        Sends the given frame to the burner, through the daemon, and wait for the response.
+
+        Args:
+            frame (Frame): The NBE frame to send.
+            destination_address (str): The ip address where to send the frame.
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+            timeout (int): The maximum duration to wait for a response from a burner, in seconds.
+                If `None` is given, then the call will be blocking.
+                Default: 5
+            verbose (bool): Indicates if we want to display the frame before sending it.
+                Default: False
+
+        Returns:
+            response (Response): The response from the burner, or `None` if it didn't answer in time or if the daemon
+                failed to send the request (which is logged as a warning).
+        """
+
+        future = self.submit(
+            frame,
+            destination_address,
+            destination_port=destination_port,
+            verbose=verbose,
+        )
+
+        done, _ = self.wait([future], timeout)
+        if not done:
+            self.cancel(future)
+
+            logger.warning(
+                "No response received from a burner in less than %s seconds!", timeout
+            )
+
+            return None
+
+        try:
+            response = future.result()
+        except (NoResponseException, DaemonRequestException) as e:
+            logger.warning(e.message)
+
+            return None
+
+        if verbose:
+            print(response.data)
+
+        return response
+
+    def wait(self, futures, timeout, retransmit=True):
+        """
+        Waits for the responses of the given requests.
+
+        Args:
+            futures (list(concurrent.futures.Future)): The futures returned by `submit`.
+            timeout (float): The maximum duration to wait for all the responses, in seconds.
+                If `None` is given, then the call will be blocking.
+            retransmit (bool): Ignored: the daemon always sends the requests again when their responses are late.
+                Default: True
+
+        Returns:
+            futures (tuple(set(Future), set(Future))): The futures that are done, and the ones that are not (those are
+                not cancelled).
+        """
+
+        return concurrent.futures.wait(futures, timeout)
+
+    def stats(self, timeout=5):
+        """
+        Returns the statistics of the daemon (see `Daemon.stats`).
+
+        Args:
+            timeout (float): The maximum duration to wait for the daemon, in seconds.
+                Default: 5
+
+        Returns:
+            stats (dict): The statistics of the daemon.
+        """
+
+        return self._request(dict(op="stats")).result(timeout)
+
+    def prometheus(self, timeout=5):
+        """
+        Returns the metrics of every burner known by the daemon, in the Prometheus text format.
+
+        Args:
+            timeout (float): The maximum duration to wait for the daemon, in seconds.
+                Default: 5
+
+        Returns:
+            text (str): The metrics (see `Metrics.to_prometheus`).
+        """
+
+        return self._request(dict(op="metrics")).result(timeout)["text"]
+
+    def _request(self, message):
+        future = concurrent.futures.Future()
+        future.address = None
+
+        with self._lock:
+            if self.closed:
+                raise TransportClosedException()
+
+            future.request_id = message["id"] = next(self._ids)
+            self._futures[future.request_id] = future
+
+        try:
+            self._write(message)
+        except OSError:
+            with self._lock:
+                self._futures.pop(future.request_id, None)
+
+            raise TransportClosedException()
+
+        return future
+
+    def _write(self, message):
+        self._socket.sendall((json.dumps(message) + "\n").encode())
+
+    def _receive(self):
+        with self._socket.makefile("rb") as lines:
+            try:
+                for line in lines:
+                    try:
+                        message = json.loads(line.decode())
+                    except ValueError:
+                        continue
+
+                    with self._lock:
+                        future = self._futures.pop(message.get("id"), None)
+                    # The caller may cancel the request right after it has been popped: a cancelled future can't be
+                    # given a result, while a running one can't be cancelled anymore
+                    if future is None or not future.set_running_or_notify_cancel():
+                        continue
+
+                    if "error" in message:
+                        future.set_exception(_exception(message, future.address))
+                    elif "data" in message:
+                        future.set_result(
+                            Response(
+                                message["data"].encode("latin-1"),
+                                (message["address"], message["port"]),
+                            )
+                        )
+                    else:
+                        future.set_result(message)
+            except OSError:
+                pass
+
+        # The daemon stopped, or the connection has been closed
+        with self._lock:
+            self.closed = True
+            futures, self._futures = self._futures, {}
+
+        for future in futures.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(TransportClosedException())
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+class _Waiting:
+    # A request in flight in the daemon, its client and its timers
+    __slots__ = (
+        "deadline",
+        "delay",
+        "frame",
+        "in_flight",
+        "reply",
+        "request_id",
+        "retransmission",
+    )
+
+    def __init__(
+        self, request_id, frame, in_flight, reply, deadline, delay, retransmission
+    ):
+        self.request_id = request_id
+        self.frame = frame
+        self.in_flight = in_flight
+        self.reply = reply
+        self.deadline = deadline
+        self.delay = delay
+        self.retransmission = retransmission
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon = self.server.daemon
+
+        try:
+            _check_peer(self.connection, daemon.path)
+        except DaemonSocketUnsafeException:
+            return
+
+        in_flight = {}
+        lock = threading.Lock()
+
+        def reply(message):
+            data = (json.dumps(message) + "\n").encode()
+            with lock:
+                try:
+                    self.wfile.write(data)
+                except OSError:
+                    pass
+
+        try:
+            for line in self.rfile:
+                try:
+                    message = json.loads(line.decode())
+                except ValueError:
+                    reply(
+                        dict(
+                            id=None,
+                            error="Invalid request: {!r}".format(line),
+                            exception=None,
+                        )
+                    )
+
+                    continue
+
+                daemon.process(message, in_flight, reply)
+        except OSError:
+            pass
+        finally:
+            # Nobody is waiting for these responses anymore
+            for future in list(in_flight.values()):
+                daemon.transport.cancel(future)
+            in_flight.clear()
+
+
+def _check_owner(path, private=False):
+    # Without user identifiers (i.e. on Windows), the permissions of the file system are all we have
+    if not hasattr(os, "getuid"):
+        return
+
+    status = os.lstat(path)
+    if status.st_uid != os.getuid():
+        raise DaemonSocketUnsafeException(path, "it belongs to another user")
+
+    if private and (not stat.S_ISDIR(status.st_mode) or status.st_mode & 0o077):
+        raise DaemonSocketUnsafeException(
+            path, "it isn't a directory only accessible to its owner"
+        )
+
+
+def _check_peer(connection, path):
+    # Only Linux tells who is at the other end of a Unix socket
+    if not hasattr(socket, "SO_PEERCRED"):
+        return
+
+    credentials = connection.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, user_id, _ = struct.unpack("3i", credentials)
+
+    if user_id != os.getuid():
+        raise DaemonSocketUnsafeException(path, "it is used by another user")
+
+
+def _answer(request_id, response):
+    return dict(
+        id=request_id,
+        data=bytes(response.data).decode("latin-1"),
+        address=response.burner_address,
+        port=response.burner_port,
+    )
+
+
+def _error(request_id, exception):
+    return dict(
+        id=request_id,
+        error=getattr(exception, "message", str(exception)),
+        exception=type(exception).__name__,
+    )
+
+
+def _exception(message, address):
+    if message.get("exception") == NoResponseException.__name__:
+        exception = NoResponseException(address, None)
+    elif message.get("exception") == TooManyPendingRequestsException.__name__:
+        exception = TooManyPendingRequestsException(address)
+    else:
+        exception = DaemonRequestException(message["error"])
+
+    # Keep the message of the daemon, which knows the details (e.g. how long it waited)
+    exception.message = message["error"]
+
+    return exception
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import getpass
+import os
+import tempfile
+
+# --------------------------------------------------------------------------------------------------
+
+# The environment variable overriding the default path of the daemon socket
+SOCKET_PATH_VARIABLE = "PYDURO_SOCKET"
+
+# --------------------------------------------------------------------------------------------------
+
+
+def default_socket_path():
+    """
+    Returns the path of the daemon socket: `$PYDURO_SOCKET` if set, or `pyduro.sock` in a private directory of the
+    current user (see `default_socket_directory`).
+
+    Note that it doesn't depend on the session (e.g. `$XDG_RUNTIME_DIR`), so that commands run by cron find the daemon
+    started by a service manager, and the other way around.
+
+    This lives apart from `pyduro.daemon`, so that the command line can check whether a daemon may be running without
+    loading the daemon (and everything it needs to serve requests).
+
+    Returns:
+        path (str): The path of the daemon socket.
+    """
+
+    path = os.environ.get(SOCKET_PATH_VARIABLE)
+    if path:
+        return path
+
+    return os.path.join(default_socket_directory(), "pyduro.sock")
+
+
+def default_socket_directory():
+    """
+    Returns the private directory of the current user where the daemon socket is created by default: `pyduro-<uid>`
+    in the temporary directory, only accessible to this user.
+
+    Returns:
+        directory (str): The path of the directory.
+    """
+
+    user_id = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+
+    return os.path.join(tempfile.gettempdir(), "pyduro-{}".format(user_id))
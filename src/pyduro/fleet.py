@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import collections
+import concurrent.futures
+import time
+
+from pyduro.actions import get as get_action
+from pyduro.actions import set as set_action
+from pyduro.client import Burner
+from pyduro.protocol import (
+    DEFAULT_TIMEOUT,
+    FunctionNotFoundException,
+    InvalidPathException,
+    NoResponseException,
+    PayloadToLargeException,
+    TooManyPendingRequestsException,
+)
+from pyduro.protocol.transport import Transport
+
+# --------------------------------------------------------------------------------------------------
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_RETRIES = 1
+
+# How long to wait before trying again, when every sequence number of a burner is used by the requests of others
+BACKOFF_DELAY = 0.05
+
+PollResult = collections.namedtuple(
+    "PollResult", ["burner", "function_name", "path", "response", "error", "attempts"]
+)
+PollResult.__doc__ = """
+Defines the result of one query sent to one burner of the fleet.
+
+Attributes:
+    burner (Burner): The burner that was queried.
+    function_name (str): The name of the function that was run.
+    path (str): The path of the query.
+    response (Response): The response from the burner, or `None` if the query failed.
+    error (Exception): The reason why the query failed, or `None` if it succeeded.
+    attempts (int): The number of times the query has been sent.
+"""
+
+# --------------------------------------------------------------------------------------------------
+
+
+def parse_burner(value):
+    """
+    Parses a burner given as an "<address>,<serial>,<pin code>" string.
+
+    Args:
+        value (str): The burner to parse.
+
+    Returns:
+        burner (Burner): The parsed burner.
+
+    Throws:
+        ValueError: If the string doesn't have exactly 3 comma separated fields.
+    """
+
+    address, serial, pin_code = (field.strip() for field in value.split(","))
+
+    return Burner(address, serial, pin_code)
+
+
+def parse_query(value):
+    """
+    Parses a query given as a "<function name>[:<path>]" string.
+
+    Args:
+        value (str): The query to parse.
+
+    Returns:
+        query (tuple(str, str)): The function name and the path of the query (`None` if no path was given).
+    """
+
+    function_name, _, path = value.partition(":")
+
+    return (function_name, path or None)
+
+
+def poll(
+    burners,
+    queries,
+    concurrency=DEFAULT_CONCURRENCY,
+    timeout=DEFAULT_TIMEOUT,
+    retries=DEFAULT_RETRIES,
+    transport=None,
+):
+    """
+    Sends every query to every burner of the fleet, concurrently, and yields the results as soon as they arrive.
+
+    Every request goes through a single socket: at most `concurrency` requests are in flight at the same time and the
+    queries are interleaved so that consecutive requests go to different burners.
+    The total duration is thus bounded by the slowest burner rather than by the sum of all of them.
+
+    Args:
+        burners (list(Burner)): The burners to query.
+        queries (list(tuple(str, str))): The (function name, path) to run on every burner.
+            See `pyduro.actions.get` for the valid function names and paths.
+        concurrency (int): The maximum number of requests in flight at the same time.
+            Default: 32
+        timeout (float): The maximum duration to wait for each response, in seconds.
+            Default: 5
+        retries (int): How many times a request is sent again when a burner doesn't answer in time.
+            Default: 1
+        transport (Transport): The transport to use to send the requests.
+            If none is given, a temporary one will be opened (and closed) just for this poll.
+            Default: None
+
+    Yields:
+        result (PollResult): The result of each query, in the order the responses are received.
+    """
+
+    if transport is None:
+        with Transport() as transport:
+            yield from poll(
+                burners,
+                queries,
+                concurrency=concurrency,
+                timeout=timeout,
+                retries=retries,
+                transport=transport,
+            )
+
+        return
+
+    # (burner, function name, path, attempts)
+    jobs = collections.deque(
+        (burner, function_name, path, 0)
+        for function_name, path in queries
+        for burner in burners
+    )
+    in_flight = {}
+
+    try:
+        while jobs or in_flight:
+            while jobs and len(in_flight) < concurrency:
+                burner, function_name, path, attempts = jobs.popleft()
+
+                try:
+                    frame = get_action.build_frame(
+                        burner.serial, burner.pin_code, function_name, path
+                    )
+                    future = transport.submit(frame, burner.address)
+                except TooManyPendingRequestsException:
+                    # Wait for some of the requests to this burner to complete
+                    jobs.appendleft((burner, function_name, path, attempts))
+
+                    break
+                except (
+                    FunctionNotFoundException,
+                    InvalidPathException,
+                    PayloadToLargeException,
+                ) as e:
+                    yield PollResult(burner, function_name, path, None, e, attempts)
+
+                    continue
+
+                in_flight[future] = (
+                    burner,
+                    function_name,
+                    path,
+                    attempts + 1,
+                    time.monotonic() + timeout,
+                )
+
+            if not in_flight:
+                if jobs:
+                    # Nothing to wait for but the requests others sent over the transport: don't spin until they
+                    # complete
+                    time.sleep(BACKOFF_DELAY)
+
+                continue
+
+            done, _ = concurrent.futures.wait(
+                in_flight,
+                timeout=max(
+                    0, min(job[-1] for job in in_flight.values()) - time.monotonic()
+                ),
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+
+            for future in done:
+                burner, function_name, path, attempts, _ = in_flight.pop(future)
+
+                try:
+                    response, error = future.result(), None
+                except Exception as e:
+                    response, error = None, e
+
+                yield PollResult(burner, function_name, path, response, error, attempts)
+
+            now = time.monotonic()
+            for future, job in list(in_flight.items()):
+                burner, function_name, path, attempts, deadline = job
+                if deadline > now:
+                    continue
+
+                del in_flight[future]
+                transport.cancel(future)
+
+                if attempts <= retries:
+                    jobs.appendleft((burner, function_name, path, attempts))
+                else:
+                    yield PollResult(
+                        burner,
+                        function_name,
+                        path,
+                        None,
+                        NoResponseException(burner.address, timeout),
+                        attempts,
+                    )
+    finally:
+        for future in in_flight:
+            transport.cancel(future)
+
+
+def set_many(
+    burners,
+    settings,
+    concurrency=DEFAULT_CONCURRENCY,
+    timeout=DEFAULT_TIMEOUT,
+    verify_values=True,
+    transport=None,
+):
+    """
+    Updates the same settings on every burner of the fleet (e.g. to roll out a tuning profile), checks that they have
+    been applied, and yields the results of each burner as soon as it is done.
+
+    Every burner is updated as with `pyduro.actions.set.run_many` (all the updates at once, then all the verifications
+    at once), through a single socket, with at most `concurrency` burners being updated at the same time.
+
+    Args:
+        burners (list(Burner)): The burners to update.
+        settings (dict): The new value of every setting to update, by path (e.g. `{"boiler.temp": "65"}`).
+        concurrency (int): The maximum number of burners being updated at the same time.
+            Default: 32
+        timeout (float): The maximum duration to wait for the responses of each step of each burner, in seconds.
+            Default: 5
+        verify_values (bool): Whether or not to read the updated settings back to check their values.
+            Default: True
+        transport (Transport): The transport to use to send the requests.
+            If none is given, a temporary one will be opened (and closed) just for these updates.
+            Default: None
+
+    Yields:
+        result (tuple(Burner, list(SetResult))): The burner and the result of every update on this burner, in the order
+            the burners are done.
+    """
+
+    if transport is None:
+        with Transport() as transport:
+            yield from set_many(
+                burners,
+                settings,
+                concurrency=concurrency,
+                timeout=timeout,
+                verify_values=verify_values,
+                transport=transport,
+            )
+
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(
+                set_action.run_many,
+                burner.address,
+                burner.serial,
+                burner.pin_code,
+                settings,
+                verify_values=verify_values,
+                timeout=timeout,
+                transport=transport,
+            ): burner
+            for burner in burners
+        }
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                # Only this burner failed: the others' results must still be yielded
+                results = [
+                    set_action.SetResult(path, value, None, None, e)
+                    for path, value in settings.items()
+                ]
+
+            yield (futures[future], results)
@@ -12,6 +12,9 @@ DEFAULT_NBE_PORT = 8483
 DEFAULT_ORIGIN_PORT = 1901
 DEFAULT_LOCAL_ADDRESS = "0.0.0.0"
 
+# The default maximum duration to wait for a response from a burner, in seconds
+DEFAULT_TIMEOUT = 5
+
 
 class PAYLOADS(enum.Enum):
     discovery = "NBE Discovery"
@@ -31,12 +34,14 @@ class FUNCTIONS(enum.Enum):
     get_event_log = 8
     get_info = 9
     get_sw_versions = 10
+    get_status = 11
 
 
 START_CHAR = chr(0x02)
 END_CHAR = chr(0x04)
 
 MAX_PAYLOAD_SIZE = 495
+MAX_SEQUENCE_NUMBER = 99
 
 # --------------------------------------------------------------------------------------------------
 
@@ -50,6 +55,15 @@ class FunctionNotFoundException(Exception):
         self.message = "The function '{}' is not valid!".format(function)
 
 
+class InvalidPathException(Exception):
+    """
+    Raised when the path of a request is not one of the paths allowed for its function.
+    """
+
+    def __init__(self, paths):
+        self.message = "You must pass one of the following as path: {}".format(paths)
+
+
 class ResponseMalformedException(Exception):
     """
     Raised when the a frame received from a burner doesn't match the NBE protocol specifications.
@@ -68,3 +82,83 @@ class PayloadToLargeException(Exception):
         self.message = "The payload '{}' exceeds the maximum allowed payload size for a NBE frame (size = {}, max = {})!".format(
             payload, len(payload), MAX_PAYLOAD_SIZE
         )
+
+
+class TooManyPendingRequestsException(Exception):
+    """
+    Raised when every sequence number is already used by a request in flight to the same burner.
+    """
+
+    def __init__(self, address):
+        self.message = (
+            "There are already {} requests in flight to the burner '{}'!".format(
+                MAX_SEQUENCE_NUMBER, address
+            )
+        )
+
+
+class TransportClosedException(Exception):
+    """
+    Raised when a request is sent through (or still waiting on) a transport that has been closed.
+    """
+
+    def __init__(self):
+        self.message = "The transport has been closed!"
+
+
+class NoResponseException(Exception):
+    """
+    Raised when a burner didn't answer a request in time.
+    """
+
+    def __init__(self, address, timeout):
+        self.message = (
+            "No response received from the burner '{}' in less than {} seconds!".format(
+                address, timeout
+            )
+        )
+
+
+class SettingNotAppliedException(Exception):
+    """
+    Raised when a burner refused to update a setting, or when the value read back doesn't match the one written.
+    """
+
+    def __init__(self, path, value, actual=None):
+        if actual is None:
+            self.message = "The setting '{}' has not been set to '{}'!".format(
+                path, value
+            )
+        else:
+            self.message = "The setting '{}' has not been set to '{}' (the burner has '{}')!".format(
+                path, value, actual
+            )
+
+
+class DaemonAlreadyRunningException(Exception):
+    """
+    Raised when a daemon is started while another one is already listening on the same socket.
+    """
+
+    def __init__(self, path):
+        self.message = "A daemon is already listening on '{}'!".format(path)
+
+
+class DaemonRequestException(Exception):
+    """
+    Raised when the daemon failed to process a request.
+    """
+
+    def __init__(self, error):
+        self.message = "The daemon failed to process the request: {}".format(error)
+
+
+class DaemonSocketUnsafeException(Exception):
+    """
+    Raised when the socket of the daemon (or its directory) could be tampered with by another user.
+    """
+
+    def __init__(self, path, reason):
+        self.message = "Refusing to use the daemon socket '{}': {}!".format(
+            path, reason
+        )
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import collections
+import functools
+import socket
+import struct
+import threading
+import time
+
+# --------------------------------------------------------------------------------------------------
+
+# Capture file layout: <magic:8> then, for every datagram, <timestamp:8 (double)><direction:1><IPv4 address:4>
+# <port:2><size:2><datagram:size>, little endian
+CAPTURE_MAGIC = b"PYDCAP01"
+
+SENT = 0
+RECEIVED = 1
+
+CaptureRecord = collections.namedtuple(
+    "CaptureRecord", ["timestamp", "direction", "address", "port", "data"]
+)
+CaptureRecord.__doc__ = """
+Defines one datagram of a capture.
+
+Attributes:
+    timestamp (float): When the datagram was sent or received, as a UNIX timestamp.
+    direction (int): `SENT` for a request sent to a burner, `RECEIVED` for a datagram received from a burner.
+    address (str): The ip address of the burner.
+    port (int): The port of the burner.
+    data (bytes): The datagram, as sent or received.
+"""
+
+_RECORD = struct.Struct("<dB4sHH")
+
+# --------------------------------------------------------------------------------------------------
+
+
+class CaptureWriter:
+    """
+    Writes every datagram exchanged with burners to a capture file, with the time it was sent or received.
+
+    Give it to a transport (or a client) to record a live session, then read it back with `read_capture`, decode the
+    responses in bulk (see `pyduro.bulk`) or serve them again with a `ReplayServer`.
+
+    This is thread-safe, so the same writer can be shared between several transports.
+
+    Args:
+        path (str): The path of the capture file (overwritten if it already exists).
+
+    Attributes:
+        count (int): The number of datagrams written.
+        path (str)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+
+        self._file = open(path, "wb")
+        self._file.write(CAPTURE_MAGIC)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Flushes and closes the capture file.
+        """
+
+        with self._lock:
+            self._file.close()
+
+    def write(self, direction, address, port, data, timestamp=None):
+        """
+        Appends a datagram to the capture.
+
+        Args:
+            direction (int): `SENT` or `RECEIVED`.
+            address (str): The ip address of the burner.
+            port (int): The port of the burner.
+            data (bytes|bytearray|memoryview): The datagram.
+            timestamp (float): When the datagram was sent or received, as a UNIX timestamp.
+                Default: None (now)
+        """
+
+        header = _RECORD.pack(
+            time.time() if timestamp is None else timestamp,
+            direction,
+            _pack_address(address),
+            port,
+            len(data),
+        )
+
+        with self._lock:
+            if self._file.closed:
+                return
+
+            self._file.write(header)
+            self._file.write(data)
+            self.count += 1
+
+
+def read_capture(path):
+    """
+    Reads a capture file.
+
+    Args:
+        path (str): The path of the capture file.
+
+    Yields:
+        record (CaptureRecord): Every datagram of the capture, in the order they were written. A truncated last record
+            (e.g. if the capture was not closed properly) is ignored.
+
+    Throws:
+        ValueError: If the file is not a capture file.
+    """
+
+    with open(path, "rb") as capture_file:
+        if capture_file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError("Invalid capture file: {}".format(path))
+
+        while True:
+            header = capture_file.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return
+
+            timestamp, direction, address, port, size = _RECORD.unpack(header)
+            data = capture_file.read(size)
+            if len(data) < size:
+                return
+
+            yield CaptureRecord(
+                timestamp, direction, socket.inet_ntoa(address), port, data
+            )
+
+
+def extract_frames(path, direction=RECEIVED):
+    """
+    Extracts the datagrams of a capture file, back to back, e.g. to decode them with `pyduro.bulk.decode_frames`.
+
+    Args:
+        path (str): The path of the capture file.
+        direction (int): The direction of the datagrams to extract (`SENT` or `RECEIVED`).
+            Default: RECEIVED
+
+    Returns:
+        frames (bytes): The datagrams, in order.
+    """
+
+    return b"".join(
+        record.data for record in read_capture(path) if record.direction == direction
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _pack_address(address):
+    try:
+        return socket.inet_aton(address)
+    except OSError:
+        # A host name
+        return socket.inet_aton(socket.gethostbyname(address))
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import functools
+import time
+
+from pyduro.protocol import (
+    DEFAULT_APP_ID,
+    END_CHAR,
+    MAX_PAYLOAD_SIZE,
+    START_CHAR,
+    PayloadToLargeException,
+    ResponseMalformedException,
+)
+
+# --------------------------------------------------------------------------------------------------
+
+# Request frame layout: <app id:12><serial:6><encryption:1><start:1><function:2><sequence:2><pin code:10>
+# <timestamp:10>pad <payload size:3><payload><end:1>
+REQUEST_FUNCTION_OFFSET = 20
+REQUEST_SEQUENCE_OFFSET = 22
+REQUEST_PIN_CODE_OFFSET = 24
+REQUEST_TIMESTAMP_OFFSET = 34
+REQUEST_PAD_OFFSET = 44
+REQUEST_PAYLOAD_SIZE_OFFSET = 48
+REQUEST_PAYLOAD_OFFSET = 51
+
+MAX_REQUEST_SIZE = REQUEST_PAYLOAD_OFFSET + MAX_PAYLOAD_SIZE + 1
+
+# Response frame layout: <app id:12><serial:6><start:1><function:2><sequence:2><status:1><payload size:3><payload>
+# <end:1>
+RESPONSE_APP_ID_OFFSET = 0
+RESPONSE_SERIAL_OFFSET = 12
+RESPONSE_FUNCTION_OFFSET = 19
+RESPONSE_SEQUENCE_OFFSET = 21
+RESPONSE_PAYLOAD_OFFSET = 27
+
+_PAD = b"pad "
+_END = END_CHAR.encode()
+
+# --------------------------------------------------------------------------------------------------
+
+
+class FrameEncoder:
+    """
+    Encodes the request frames for a given burner at the bytes level, without formatting any intermediate string.
+    The parts of the frame that never change for a burner (application identifier, serial and pin code) are encoded
+    once and for all, so only the function, sequence number, timestamp and payload are encoded for each frame, and
+    all the parts are joined at once.
+
+    Use `get_encoder` to get the (cached) encoder of a burner instead of creating a new one for each frame.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        app_id (str): The application identifier to give to the burner.
+            Default: ___pyduro___
+
+    Attributes:
+        pin_code (bytes): The encoded pin code.
+        prefix (bytes): The encoded application identifier, serial, encryption level and start character.
+    """
+
+    def __init__(self, serial, pin_code, app_id=DEFAULT_APP_ID):
+        self.prefix = "{:_<12.12}{:0>6.6} {}".format(
+            app_id, serial, START_CHAR
+        ).encode()
+        self.pin_code = "{:0<10.10}".format(pin_code).encode()
+
+    def encode(self, function_id, sequence_number, payload):
+        """
+        Returns the encoded frame.
+
+        Args:
+            function_id (int): The code of the function to run.
+            sequence_number (int): The number of the sequence.
+            payload (bytes|str): The payload of the function.
+
+        Returns:
+            frame (bytes): The encoded frame.
+
+        Throws:
+            PayloadToLargeException: If the encoded payload is larger than 495 bytes.
+        """
+
+        encoded = payload.encode() if isinstance(payload, str) else payload
+        if len(encoded) > MAX_PAYLOAD_SIZE:
+            raise PayloadToLargeException(_text(payload))
+
+        return b"".join(
+            (
+                self.prefix,
+                b"%02d%02d" % (function_id, sequence_number),
+                self.pin_code,
+                b"%010d" % (int(time.time()) % 10000000000),
+                _PAD,
+                b"%03d" % len(encoded),
+                encoded,
+                _END,
+            )
+        )
+
+    def encode_into(self, buffer, function_id, sequence_number, payload):
+        """
+        Encodes the frame (see `encode`) and copies it into the given buffer.
+
+        Args:
+            buffer (bytearray|memoryview): The writable buffer, at least `MAX_REQUEST_SIZE` bytes long.
+            function_id (int): The code of the function to run.
+            sequence_number (int): The number of the sequence.
+            payload (bytes|str): The payload of the function.
+
+        Returns:
+            size (int): The number of bytes written in the buffer.
+
+        Throws:
+            PayloadToLargeException: If the encoded payload is larger than 495 bytes, or if the frame doesn't fit in the
+                buffer (nothing is written then).
+        """
+
+        frame = self.encode(function_id, sequence_number, payload)
+
+        # Never resize the buffer: the transports share theirs, with memoryviews exported
+        size = len(frame)
+        if size > len(buffer):
+            raise PayloadToLargeException(_text(payload))
+
+        buffer[:size] = frame
+
+        return size
+
+
+@functools.lru_cache(maxsize=1024)
+def get_encoder(serial, pin_code, app_id=DEFAULT_APP_ID):
+    """
+    Returns the encoder of the given burner, creating it if needed.
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The secret pincode of the burner.
+        app_id (str): The application identifier to give to the burner.
+            Default: ___pyduro___
+
+    Returns:
+        encoder (FrameEncoder): The encoder of the burner.
+    """
+
+    return FrameEncoder(serial, pin_code, app_id)
+
+
+def decode_header(data):
+    """
+    Decodes the numeric fields of the header of a response frame, without decoding (nor copying) the rest of it.
+
+    Args:
+        data (bytes|bytearray|memoryview): The response frame, as received from the burner.
+
+    Returns:
+        header (tuple(int, int, int, int)): The function, the sequence number, the status and the payload size of the
+            response.
+
+    Throws:
+        ResponseMalformedException: If the header doesn't match the NBE protocol specifications, or if the frame is
+            shorter than announced in its header.
+    """
+
+    header = data[RESPONSE_FUNCTION_OFFSET:RESPONSE_PAYLOAD_OFFSET]
+    if not isinstance(header, bytes):
+        header = bytes(header)
+
+    if len(header) != RESPONSE_PAYLOAD_OFFSET - RESPONSE_FUNCTION_OFFSET or not (
+        header.isdigit()
+    ):
+        raise ResponseMalformedException(decode_text(data, 0, len(data)))
+
+    # Each digit is an ASCII character, i.e. its value + 48
+    function0, function1, sequence0, sequence1, status, size0, size1, size2 = header
+    payload_size = size0 * 100 + size1 * 10 + size2 - 5328
+
+    if RESPONSE_PAYLOAD_OFFSET + payload_size > len(data):
+        raise ResponseMalformedException(decode_text(data, 0, len(data)))
+
+    return (
+        function0 * 10 + function1 - 528,
+        sequence0 * 10 + sequence1 - 528,
+        status - 48,
+        payload_size,
+    )
+
+
+def decode_text(data, start, end):
+    """
+    Decodes a part of a frame to text, without copying it first.
+
+    Args:
+        data (bytes|bytearray|memoryview): The frame.
+        start (int): The index of the first byte to decode.
+        end (int): The index after the last byte to decode.
+
+    Returns:
+        text (str): The decoded text.
+    """
+
+    return str(memoryview(data)[start:end], "utf-8", "replace")
+
+
+def _text(payload):
+    return (
+        payload.decode(errors="replace")
+        if isinstance(payload, (bytes, bytearray))
+        else payload
+    )
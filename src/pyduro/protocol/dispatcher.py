@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import time
+
+from pyduro.protocol import (
+    FUNCTIONS,
+    MAX_SEQUENCE_NUMBER,
+    TooManyPendingRequestsException,
+)
+from pyduro.protocol.rtt import RttTable
+
+# --------------------------------------------------------------------------------------------------
+
+
+class Request:
+    """
+    Defines a request that has been sent (or is about to be sent) to a burner and is waiting for its response.
+
+    Args:
+        frame (Frame): The NBE frame of the request.
+        address (str): The ip address the frame is sent to.
+        port (int): The port the frame is sent to.
+        future (Future): The future to resolve with the response of the burner.
+            This can either be a `concurrent.futures.Future` or an `asyncio.Future`.
+        broadcast (bool): Whether or not the response can come from any address (e.g. for a discovery).
+            Default: False
+        listener (callable): A function to call with every response received for this request.
+            If given, the request stays pending (and can receive several responses) until it is cancelled, and the
+            future is only used to report a failure.
+            Default: None
+
+    Attributes:
+        address (str)
+        broadcast (bool)
+        frame (Frame)
+        futures (list(Future)): The futures of every caller waiting for the response (several callers can share the
+            same request, see `Dispatcher.join`).
+        key (tuple(str, int)): The key identifying the request in the pending table.
+        listener (callable)
+        port (int)
+        query (tuple(str, int, int, str)): What the request asks for (address, port, function and payload).
+        sent_at (float): When the frame was last sent, as returned by `time.monotonic` (`None` until it is sent).
+        transmissions (int): The number of times the frame has been sent.
+    """
+
+    def __init__(self, frame, address, port, future, broadcast=False, listener=None):
+        self.frame = frame
+        self.address = address
+        self.port = port
+        self.futures = [future]
+        self.broadcast = broadcast
+        self.listener = listener
+        self.sent_at = None
+        self.transmissions = 0
+
+    @property
+    def key(self):
+        return (None if self.broadcast else self.address, self.frame.sequence_number)
+
+    @property
+    def query(self):
+        return (self.address, self.port, self.frame.function_id, self.frame.payload)
+
+
+class Dispatcher:
+    """
+    Keeps track of the requests in flight and routes each received response to the request it answers.
+
+    This is only the bookkeeping part of the protocol: it doesn't send or receive anything by itself, so it can be
+    used by both the blocking `Transport` and the asyncio client.
+    Each registered request is given a rotating sequence number (modulo 99) so that several requests can be in flight
+    for the same burner at the same time. Requests are then identified by their (burner address, sequence number).
+
+    Identical requests (same burner, function and payload) can also share the same round trip: see `join`.
+
+    The round trip time of every request answered after a single transmission is measured, to estimate the
+    retransmission timeout of each burner (see `RttTable`).
+
+    Note that this is not thread-safe, callers must hold their own lock when sharing a dispatcher between threads.
+
+    Args:
+        rtt (RttTable): The round trip time estimations to update.
+            Default: None (a new table)
+        metrics (Metrics): Where to count the requests, retransmissions, responses and timeouts, and record the round
+            trip times.
+            Default: None (nothing is counted)
+
+    Attributes:
+        metrics (Metrics)
+        pending (dict): The requests in flight, by key.
+        rtt (RttTable)
+    """
+
+    def __init__(self, rtt=None, metrics=None):
+        self.pending = {}
+        self.rtt = RttTable() if rtt is None else rtt
+        self.metrics = metrics
+
+        self._queries = {}
+        self._sequence_number = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    def register(
+        self,
+        frame,
+        address,
+        port,
+        future,
+        broadcast=False,
+        listener=None,
+        coalesce=False,
+    ):
+        """
+        Assigns a free sequence number to the frame and adds it to the pending requests.
+
+        Args:
+            frame (Frame): The NBE frame of the request. Its `sequence_number` will be overwritten.
+            address (str): The ip address the frame is sent to.
+            port (int): The port the frame is sent to.
+            future (Future): The future to resolve with the response of the burner.
+            broadcast (bool): Whether or not the response can come from any address.
+                Default: False
+            listener (callable): A function to call with every response received for this request, instead of
+                resolving the future with the first one.
+                Default: None
+            coalesce (bool): Whether or not later identical requests can `join` this one.
+                Note that requests updating a setting, broadcasted requests and requests with a listener are never
+                coalesced.
+                Default: False
+
+        Returns:
+            request (Request): The registered request.
+
+        Throws:
+            TooManyPendingRequestsException: If every sequence number is already in use for this address.
+        """
+
+        request = Request(
+            frame, address, port, future, broadcast=broadcast, listener=listener
+        )
+
+        for _ in range(MAX_SEQUENCE_NUMBER):
+            frame.sequence_number = self._sequence_number
+            self._sequence_number = (self._sequence_number + 1) % MAX_SEQUENCE_NUMBER
+
+            if request.key not in self.pending:
+                self.pending[request.key] = request
+
+                if (
+                    coalesce
+                    and not broadcast
+                    and listener is None
+                    and frame.function_id != FUNCTIONS.set.value
+                ):
+                    self._queries[request.query] = request
+
+                return request
+
+        raise TooManyPendingRequestsException(address)
+
+    def join(self, frame, address, port, future):
+        """
+        Makes the given future wait for the response of an identical request already in flight, if any.
+
+        Args:
+            frame (Frame): The NBE frame of the request.
+            address (str): The ip address the frame would be sent to.
+            port (int): The port the frame would be sent to.
+            future (Future): The future to resolve with the response of the burner.
+
+        Returns:
+            request (Request): The request in flight the future now waits for, or `None` if there is no such request
+                (the frame then needs to be registered and sent).
+        """
+
+        request = self._queries.get((address, port, frame.function_id, frame.payload))
+        if request is not None:
+            request.futures.append(future)
+
+        return request
+
+    def sent(self, request):
+        """
+        Records that the frame of the given request has just been sent (again).
+
+        Args:
+            request (Request): The request that has been sent.
+        """
+
+        request.sent_at = time.monotonic()
+        request.transmissions += 1
+
+        if self.metrics is not None:
+            self.metrics.increment(
+                "requests" if request.transmissions == 1 else "retransmissions",
+                request.address,
+            )
+
+    def cancel(self, request, future=None):
+        """
+        Stops waiting for the response of the given request.
+
+        Args:
+            request (Request): The request to forget about.
+            future (Future): The future that doesn't need the response anymore. The request is only dropped once none
+                of its futures need it anymore.
+                Default: None (drop the request for every future)
+        """
+
+        if future is not None:
+            if future in request.futures:
+                request.futures.remove(future)
+            if request.futures:
+                return
+
+        if (
+            self.metrics is not None
+            and request.transmissions
+            and request.listener is None
+            and not request.broadcast
+            and self.pending.get(request.key) is request
+        ):
+            # Still in flight: nobody waits for its response anymore
+            self.metrics.increment("timeouts", request.address)
+
+        self._forget(request)
+
+    def dispatch(self, response):
+        """
+        Resolves the request matching the given response.
+
+        Args:
+            response (Response): The response received from a burner.
+
+        Returns:
+            request (Request): The request the response was for, or `None` if the response doesn't match any pending
+                request (e.g. a late duplicate of a request that already timed out).
+        """
+
+        request = self.pending.get((response.burner_address, response.sequence_number))
+        if request is None:
+            request = self.pending.get((None, response.sequence_number))
+        if request is None:
+            if self.metrics is not None:
+                self.metrics.increment("unmatched", response.burner_address)
+
+            return None
+
+        if self.metrics is not None:
+            self.metrics.increment("responses", response.burner_address)
+
+        if request.listener is not None:
+            request.listener(response)
+
+            return request
+
+        self._forget(request)
+
+        # There is no way to know which transmission a response answers if the frame has been sent several times
+        if request.transmissions == 1 and not request.broadcast:
+            rtt = time.monotonic() - request.sent_at
+            self.rtt.observe(request.address, rtt)
+
+            if self.metrics is not None:
+                self.metrics.observe_rtt(request.address, rtt)
+
+        for future in request.futures:
+            if not future.done():
+                future.set_result(response)
+
+        return request
+
+    def fail_all(self, exception):
+        """
+        Fails every pending request with the given exception.
+
+        Args:
+            exception (Exception): The exception to set on every pending future.
+        """
+
+        for request in self.pending.values():
+            for future in request.futures:
+                if not future.done():
+                    future.set_exception(exception)
+
+        self.pending.clear()
+        self._queries.clear()
+
+    def _forget(self, request):
+        if self.pending.get(request.key) is request:
+            del self.pending[request.key]
+        if self._queries.get(request.query) is request:
+            del self._queries[request.query]
@@ -2,22 +2,28 @@
 
 # --------------------------------------------------------------------------------------------------
 
-import socket
-from time import time
+import collections.abc
 
 from pyduro.protocol import (
     DEFAULT_APP_ID,
     DEFAULT_LOCAL_ADDRESS,
     DEFAULT_NBE_PORT,
     DEFAULT_ORIGIN_PORT,
-    END_CHAR,
     FUNCTIONS,
     MAX_PAYLOAD_SIZE,
-    START_CHAR,
+    MAX_SEQUENCE_NUMBER,
     FunctionNotFoundException,
     PayloadToLargeException,
-    ResponseMalformedException,
 )
+from pyduro.protocol.codec import (
+    RESPONSE_APP_ID_OFFSET,
+    RESPONSE_PAYLOAD_OFFSET,
+    RESPONSE_SERIAL_OFFSET,
+    decode_header,
+    decode_text,
+    get_encoder,
+)
+from pyduro.protocol.transport import Transport
 
 # --------------------------------------------------------------------------------------------------
 
@@ -66,6 +72,16 @@ class Frame:
         PayloadToLargeException: If the given payload is larger than 495 bytes.
     """
 
+    __slots__ = (
+        "app_id",
+        "function_id",
+        "payload",
+        "payload_size",
+        "pin_code",
+        "sequence_number",
+        "serial",
+    )
+
     def __init__(
         self,
         serial,
@@ -80,7 +96,7 @@ class Frame:
         self.serial = "{:0>6.6}".format(serial)
         self.pin_code = "{:0<10.10}".format(pin_code)
         self.function_id = function_id
-        self.sequence_number = sequence_number % 99
+        self.sequence_number = sequence_number % MAX_SEQUENCE_NUMBER
         self.payload = payload if payload is not None else "*"
         self.payload_size = len(self.payload) if self.payload is not None else 0
 
@@ -100,25 +116,34 @@ class Frame:
             frame (str): The encoded NBE frame.
         """
 
-        function_id = "{:02d}".format(self.function_id)
-        sequence_number = "{:02d}".format(self.sequence_number)
-        timestamp = "{:0>10.10}".format(str(time()))
-        payload_size = "{:03d}".format(self.payload_size)
-
-        frame = "{}{} {}{}{}{}{}pad {}{}{}".format(
-            self.app_id,
-            self.serial,
-            START_CHAR,
-            function_id,
-            sequence_number,
-            self.pin_code,
-            timestamp,
-            payload_size,
-            self.payload,
-            END_CHAR,
+        return self.encode().decode()
+
+    def encode(self):
+        """
+        Returns the encoded NBE frame, as bytes.
+
+        Returns:
+            frame (bytes): The encoded NBE frame.
+        """
+
+        return get_encoder(self.serial, self.pin_code, self.app_id).encode(
+            self.function_id, self.sequence_number, self.payload
         )
 
-        return frame
+    def encode_into(self, buffer):
+        """
+        Writes the encoded NBE frame into the given buffer.
+
+        Args:
+            buffer (bytearray|memoryview): The writable buffer, at least `MAX_REQUEST_SIZE` bytes long.
+
+        Returns:
+            size (int): The number of bytes written in the buffer.
+        """
+
+        return get_encoder(self.serial, self.pin_code, self.app_id).encode_into(
+            buffer, self.function_id, self.sequence_number, self.payload
+        )
 
     def send(
         self,
@@ -128,6 +153,7 @@ class Frame:
         source_port=DEFAULT_ORIGIN_PORT,
         timeout=5,
         verbose=False,
+        transport=None,
     ):
         """
         Sends the frame to the burner over an UDP socket and wait for the response.
@@ -137,55 +163,51 @@ class Frame:
             destination_port (int): The port where to send the frame.
                 Default: 8483 (default NBE communication protocol port)
             source_address (str): The ip address where to wait for a response.
+                Ignored if a `transport` is given.
                 Default: 0.0.0.0 (any local IP)
             source_port (int): The local port where to wait for a response.
+                Ignored if a `transport` is given.
                 Default: 1901 (port used by the Aduro Android application)
             timeout (int): The maximum duration to wait for a response from a burner, in seconds.
                 If `None` is given, then the call will be blocking.
                 Default: 5
             verbose (bool): Indicates if we want to display the frame before sending it.
                 Default: False
+            transport (Transport): The transport to use to send the frame.
+                If none is given, a temporary one will be opened (and closed) just for this frame.
+                Default: None
 
         Returns:
             response (Response): The response from the burner (if any)
         """
 
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.bind((source_address, source_port))
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        sock.settimeout(timeout)
-
-        frame = self.get().encode()
-
-        if verbose:
-            print(frame)
-
-        sock.sendto(frame, (destination_address, destination_port))
-
-        try:
-            response_frame, origin = sock.recvfrom(4096)
-
-            if verbose:
-                print(response_frame)
+        if transport is not None:
+            return transport.send(
+                self,
+                destination_address,
+                destination_port=destination_port,
+                timeout=timeout,
+                verbose=verbose,
+            )
 
-            return Response(response_frame.decode(), origin)
-        except socket.timeout:
-            print("No response received from a burner in less than 5 seconds!")
-        except:
-            print(
-                "Unable to parse the answer from the burner ({}): {}".format(
-                    origin, response_frame
-                )
+        with Transport(source_address, source_port) as transport:
+            return transport.send(
+                self,
+                destination_address,
+                destination_port=destination_port,
+                timeout=timeout,
+                verbose=verbose,
             )
-            raise
 
 
 class Response:
     """
     Defines a NBE communication received from a burner.
+    Only the numeric fields of the header are decoded right away, the text fields (including the payload) are decoded
+    when accessed, and the payload is only parsed once, when first needed.
 
     Args:
-        frame (Frame): The NBE frame received from the burner.
+        frame (bytes|str): The NBE frame received from the burner.
         origin (tuple(str, int)): The origin of the frame. The first item of the tuple is the ip address of the burner,
             the second one is the origin port.
 
@@ -194,7 +216,10 @@ class Response:
             Note that this will be a 12 characters string.
         burner_address (str): The ip address of the burner that sent the response.
         burner_port (int): The port the response of the burner came from.
+        data (bytes): The original received NBE frame, as received.
         extra (str): The extra information the burner may add after the timestamp and before the payload size.
+        fields (PayloadView): A read-only view of the "name=value" fields of the payload, that can look up a single
+            field without parsing the whole payload.
         frame (str): The original received NBE frame.
         function (int): The code of the function the response is for (0: discover, 1: get settings, ...).
             Note that this will be a number between 0 and 11.
@@ -214,46 +239,84 @@ class Response:
         ResponseMalformedException: If the received response frame doesn't match the NBE protocol specifications.
     """
 
+    __slots__ = (
+        "burner_address",
+        "burner_port",
+        "data",
+        "function",
+        "payload_size",
+        "sequence_number",
+        "status",
+        "_parsed_payload",
+        "_payload",
+    )
+
     def __init__(self, frame, origin):
-        self.frame = frame
+        if isinstance(frame, str):
+            frame = frame.encode()
+
+        self.data = frame
 
         self.burner_address = origin[0]
         self.burner_port = origin[1]
 
-        start = 0
-        end = start + 12
-        self.app_id = frame[start:end]
-
-        start = end
-        end = start + 6
-        self.serial = frame[start:end]
+        (
+            self.function,
+            self.sequence_number,
+            self.status,
+            self.payload_size,
+        ) = decode_header(frame)
+
+        self._payload = None
+        self._parsed_payload = None
+
+    @property
+    def app_id(self):
+        return decode_text(self.data, RESPONSE_APP_ID_OFFSET, RESPONSE_SERIAL_OFFSET)
+
+    @property
+    def fields(self):
+        return PayloadView(self.payload)
+
+    @property
+    def frame(self):
+        return decode_text(self.data, 0, len(self.data))
+
+    @property
+    def payload(self):
+        # Only decode the payload the first time someone needs it
+        if self._payload is None:
+            self._payload = decode_text(
+                self.data,
+                RESPONSE_PAYLOAD_OFFSET,
+                RESPONSE_PAYLOAD_OFFSET + self.payload_size,
+            )
 
-        start = end + 1
-        end = start + 2
-        self.function = int(frame[start:end])
+        return self._payload
 
-        start = end
-        end = start + 2
-        self.sequence_number = int(frame[start:end])
+    @property
+    def serial(self):
+        return decode_text(
+            self.data, RESPONSE_SERIAL_OFFSET, RESPONSE_SERIAL_OFFSET + 6
+        )
 
-        start = end
-        end = start + 1
-        self.status = int(frame[start:end])
+    def parse_payload(self):
+        """
+        Parses the payload of the response.
+        The payload is only parsed the first time, later calls return the very same object: do not modify it.
 
-        start = end
-        end = start + 3
-        self.payload_size = int(frame[start:end])
+        Returns:
+            payload (str|dict|list): The payload itself if it is a simple string, a dict if it is a semicolon separated
+                list of fields (name=value), or a list if it is a semicolon separated list of values.
+        """
 
-        start = end
-        end = start + self.payload_size
-        if end > len(frame):
-            raise ResponseMalformedException(frame)
-        else:
-            self.payload = frame[start:end]
+        if self._parsed_payload is not None:
+            return self._parsed_payload
 
-    def parse_payload(self):
         if ";" not in self.payload:
-            return self.payload
+            self._parsed_payload = self.payload
+
+            return self._parsed_payload
 
         items = {} if "=" in self.payload else []
         for item in self.payload.split(";"):
@@ -263,4 +326,61 @@ class Response:
                 name, value = item.split("=")
                 items[name] = value
 
+        self._parsed_payload = items
+
         return items
+
+
+class PayloadView(collections.abc.Mapping):
+    """
+    Defines a read-only view of the "name=value" fields of a response payload (e.g. "boiler_temp=67.4;...").
+
+    Looking up a single field only scans the payload for it, without splitting the whole payload. The fields are only
+    all parsed (once) when iterating over the view or asking for its length.
+
+    Args:
+        payload (str): The payload of the response.
+    """
+
+    __slots__ = ("_fields", "_payload")
+
+    def __init__(self, payload):
+        self._payload = payload
+        self._fields = None
+
+    def __getitem__(self, name):
+        if self._fields is not None:
+            return self._fields[name]
+
+        payload = self._payload
+        prefix = name + "="
+
+        # Like when parsing the whole payload, the last field with the name wins
+        start = payload.rfind(";" + prefix)
+        if start >= 0:
+            start += len(prefix) + 1
+        elif payload.startswith(prefix):
+            start = len(prefix)
+        else:
+            raise KeyError(name)
+
+        end = payload.find(";", start)
+
+        return payload[start:] if end < 0 else payload[start:end]
+
+    def __iter__(self):
+        return iter(self._get_fields())
+
+    def __len__(self):
+        return len(self._get_fields())
+
+    def __repr__(self):
+        return "PayloadView({!r})".format(self._payload)
+
+    def _get_fields(self):
+        if self._fields is None:
+            self._fields = dict(
+                item.split("=", 1) for item in self._payload.split(";") if "=" in item
+            )
+
+        return self._fields
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import bisect
+import collections
+import threading
+
+# --------------------------------------------------------------------------------------------------
+
+# The upper bounds of the buckets of the round trip time histograms, in seconds
+DEFAULT_RTT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# The counters kept for every burner, with their description
+COUNTERS = collections.OrderedDict(
+    (
+        ("requests", "Requests sent (first transmissions only)"),
+        ("retransmissions", "Requests sent again because their response was late"),
+        ("responses", "Responses matched with a request"),
+        ("timeouts", "Requests given up on without any response"),
+        (
+            "unmatched",
+            "Responses that didn't match any request in flight (e.g. late duplicates)",
+        ),
+        ("malformed", "Datagrams that are not valid NBE response frames"),
+        ("sent_bytes", "Bytes sent"),
+        ("received_bytes", "Bytes received"),
+    )
+)
+
+# --------------------------------------------------------------------------------------------------
+
+
+class Metrics:
+    """
+    Counts what happens on the wire, for every burner: requests, retransmissions, responses, timeouts, unmatched and
+    malformed frames, bytes in and out, and a histogram of the round trip times.
+
+    Give it to a transport (or a client) to instrument it. Nothing is measured (and nothing costs anything) when no
+    metrics are given. Read the metrics with `snapshot`, export them with `to_prometheus`, or get every measure as soon
+    as it is made with `add_hook` (e.g. to feed OpenTelemetry instruments).
+
+    This is thread-safe, so the same metrics can be shared between several transports.
+
+    Args:
+        buckets (tuple(float)): The upper bounds of the buckets of the round trip time histograms, in seconds.
+            Default: DEFAULT_RTT_BUCKETS
+
+    Attributes:
+        buckets (tuple(float))
+    """
+
+    def __init__(self, buckets=DEFAULT_RTT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+
+        self._counters = collections.defaultdict(collections.Counter)
+        # The histogram of every burner: [the count of every bucket (and of +Inf), the sum of the observations]
+        self._histograms = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """
+        Calls the given function with every measure, as soon as it is made.
+
+        Note that it is called from the thread that made the measure (e.g. the receiving thread of a transport), so it
+        must be quick and must not block.
+
+        Args:
+            hook (callable): The function to call with the name of the measure (one of `COUNTERS` for a counter
+                increment, or "rtt" for a round trip time), its value and its attributes (a dict with the "burner"
+                address).
+        """
+
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook):
+        """
+        Stops calling the given function.
+
+        Args:
+            hook (callable): A function given to `add_hook`.
+        """
+
+        with self._lock:
+            self._hooks = [other for other in self._hooks if other is not hook]
+
+    def increment(self, name, burner, value=1):
+        """
+        Increments a counter of a burner.
+
+        Args:
+            name (str): The name of the counter (one of `COUNTERS`).
+            burner (str): The ip address of the burner.
+            value (int): How much to add to the counter.
+                Default: 1
+        """
+
+        with self._lock:
+            self._counters[burner][name] += value
+            hooks = self._hooks
+
+        for hook in hooks:
+            hook(name, value, {"burner": burner})
+
+    def observe_rtt(self, burner, rtt):
+        """
+        Adds a round trip time to the histogram of a burner.
+
+        Args:
+            burner (str): The ip address of the burner.
+            rtt (float): The round trip time, in seconds.
+        """
+
+        with self._lock:
+            histogram = self._histograms.get(burner)
+            if histogram is None:
+                histogram = self._histograms[burner] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                ]
+
+            histogram[0][bisect.bisect_left(self.buckets, rtt)] += 1
+            histogram[1] += rtt
+            hooks = self._hooks
+
+        for hook in hooks:
+            hook("rtt", rtt, {"burner": burner})
+
+    def snapshot(self):
+        """
+        Returns the current value of every metric.
+
+        Returns:
+            metrics (dict): The counters of every burner, by address (e.g. `{"192.168.1.250": {"requests": 12, ...}}`),
+                with its round trip time histogram under the "rtt" key (the cumulative count of every bucket by upper
+                bound, plus "count" and "sum").
+        """
+
+        with self._lock:
+            snapshot = {}
+            for burner in set(self._counters) | set(self._histograms):
+                metrics = {name: self._counters[burner][name] for name in COUNTERS}
+
+                counts, total = self._histograms.get(
+                    burner, ([0] * (len(self.buckets) + 1), 0.0)
+                )
+                cumulative = 0
+                buckets = collections.OrderedDict()
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                metrics["rtt"] = dict(buckets=buckets, count=cumulative, sum=total)
+
+                snapshot[burner] = metrics
+
+        return snapshot
+
+    def to_prometheus(self, prefix="pyduro"):
+        """
+        Exports the metrics in the Prometheus text format.
+
+        Args:
+            prefix (str): The prefix of the name of every metric.
+                Default: "pyduro"
+
+        Returns:
+            text (str): The metrics, e.g. to serve on a "/metrics" endpoint or to write for the textfile collector of the
+                node exporter.
+        """
+
+        snapshot = self.snapshot()
+        burners = sorted(snapshot)
+
+        lines = []
+        for name, description in COUNTERS.items():
+            metric = "{}_{}_total".format(prefix, name)
+            lines.append("# HELP {} {}".format(metric, description))
+            lines.append("# TYPE {} counter".format(metric))
+            for burner in burners:
+                lines.append(
+                    '{}{{burner="{}"}} {}'.format(
+                        metric, burner, snapshot[burner][name]
+                    )
+                )
+
+        metric = "{}_rtt_seconds".format(prefix)
+        lines.append(
+            "# HELP {} Round trip times of the requests answered after a single transmission".format(
+                metric
+            )
+        )
+        lines.append("# TYPE {} histogram".format(metric))
+        for burner in burners:
+            rtt = snapshot[burner]["rtt"]
+            for bound, count in rtt["buckets"].items():
+                lines.append(
+                    '{}_bucket{{burner="{}",le="{}"}} {}'.format(
+                        metric,
+                        burner,
+                        "+Inf" if bound == float("inf") else bound,
+                        count,
+                    )
+                )
+            lines.append('{}_sum{{burner="{}"}} {}'.format(metric, burner, rtt["sum"]))
+            lines.append(
+                '{}_count{{burner="{}"}} {}'.format(metric, burner, rtt["count"])
+            )
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import threading
+import time
+
+# --------------------------------------------------------------------------------------------------
+
+# The retransmission timeout before any round trip time has been measured, in seconds
+INITIAL_RTO = 1.0
+# The bounds of the retransmission timeout, in seconds
+MIN_RTO = 0.05
+MAX_RTO = 4.0
+
+# The gains of the smoothed round trip time and of its variation (see RFC 6298)
+ALPHA = 1 / 8
+BETA = 1 / 4
+K = 4
+
+# --------------------------------------------------------------------------------------------------
+
+
+class RttEstimator:
+    """
+    Estimates the round trip time to a burner and the retransmission timeout to use for it, the same way TCP does
+    (see RFC 6298): the timeout is the smoothed round trip time plus 4 times its variation, and it is doubled when a
+    request has to be sent again, until a new round trip time is measured.
+
+    Args:
+        initial (float): The retransmission timeout before any round trip time has been measured, in seconds.
+            Default: 1
+        minimum (float): The minimum retransmission timeout, in seconds.
+            Default: 0.05
+        maximum (float): The maximum retransmission timeout, in seconds.
+            Default: 4
+
+    Attributes:
+        backed_off_at (float): When the timeout was last doubled, as returned by `time.monotonic`.
+        maximum (float)
+        minimum (float)
+        rto (float): The current retransmission timeout, in seconds.
+        rttvar (float): The variation of the round trip time, in seconds (`None` until the first measure).
+        samples (int): The number of round trip times measured.
+        srtt (float): The smoothed round trip time, in seconds (`None` until the first measure).
+    """
+
+    __slots__ = (
+        "backed_off_at",
+        "maximum",
+        "minimum",
+        "rto",
+        "rttvar",
+        "samples",
+        "srtt",
+    )
+
+    def __init__(self, initial=INITIAL_RTO, minimum=MIN_RTO, maximum=MAX_RTO):
+        self.backed_off_at = None
+        self.minimum = minimum
+        self.maximum = maximum
+        self.rto = initial
+        self.rttvar = None
+        self.samples = 0
+        self.srtt = None
+
+    def observe(self, rtt):
+        """
+        Updates the estimation with a new measure of the round trip time.
+        Note that only the requests that were sent once should be measured, since there is no way to know which
+        transmission a response answers otherwise.
+
+        Args:
+            rtt (float): The measured round trip time, in seconds.
+        """
+
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - ALPHA) * self.srtt + ALPHA * rtt
+
+        self.samples += 1
+        self.rto = min(max(self.srtt + K * self.rttvar, self.minimum), self.maximum)
+
+    def backoff(self, sent_at=None):
+        """
+        Doubles the retransmission timeout (up to its maximum), after a request had to be sent again.
+
+        Like TCP does for a whole window, the requests that were already in flight when the timeout was last doubled
+        don't double it again: several requests lost at the same time only count once.
+
+        Args:
+            sent_at (float): When the request was first sent, as returned by `time.monotonic`.
+                Default: None (always double the timeout)
+        """
+
+        if (
+            sent_at is not None
+            and self.backed_off_at is not None
+            and sent_at < self.backed_off_at
+        ):
+            return
+
+        self.rto = min(self.rto * 2, self.maximum)
+        self.backed_off_at = time.monotonic()
+
+
+class RttTable:
+    """
+    Keeps a `RttEstimator` for every burner address.
+
+    This is thread-safe, so the same table can be shared between several transports.
+
+    Args:
+        initial (float): The retransmission timeout before any round trip time has been measured, in seconds.
+            Default: 1
+        minimum (float): The minimum retransmission timeout, in seconds.
+            Default: 0.05
+        maximum (float): The maximum retransmission timeout, in seconds.
+            Default: 4
+
+    Attributes:
+        initial (float)
+        maximum (float)
+        minimum (float)
+    """
+
+    def __init__(self, initial=INITIAL_RTO, minimum=MIN_RTO, maximum=MAX_RTO):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+
+        self._estimators = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._estimators)
+
+    def get(self, address):
+        """
+        Returns the estimator of the given burner, creating it if needed.
+
+        Args:
+            address (str): The ip address of the burner.
+
+        Returns:
+            estimator (RttEstimator): The estimator of the burner.
+        """
+
+        estimator = self._estimators.get(address)
+        if estimator is None:
+            with self._lock:
+                estimator = self._estimators.setdefault(
+                    address, RttEstimator(self.initial, self.minimum, self.maximum)
+                )
+
+        return estimator
+
+    def timeout(self, address):
+        """
+        Returns the current retransmission timeout of the given burner.
+
+        Args:
+            address (str): The ip address of the burner.
+
+        Returns:
+            timeout (float): The retransmission timeout, in seconds.
+        """
+
+        return self.get(address).rto
+
+    def observe(self, address, rtt):
+        """
+        Updates the estimation of the given burner with a new measure of the round trip time.
+
+        Args:
+            address (str): The ip address of the burner.
+            rtt (float): The measured round trip time, in seconds.
+        """
+
+        estimator = self.get(address)
+        with self._lock:
+            estimator.observe(rtt)
+
+    def backoff(self, address, sent_at=None):
+        """
+        Doubles the retransmission timeout of the given burner, after a request had to be sent again.
+
+        Args:
+            address (str): The ip address of the burner.
+            sent_at (float): When the request was first sent, as returned by `time.monotonic` (see
+                `RttEstimator.backoff`).
+                Default: None (always double the timeout)
+        """
+
+        estimator = self.get(address)
+        with self._lock:
+            estimator.backoff(sent_at)
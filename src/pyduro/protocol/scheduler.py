@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import collections
+import time
+
+from pyduro.protocol import FUNCTIONS
+
+# --------------------------------------------------------------------------------------------------
+
+# The maximum number of requests sent to a burner per second (on average), and in a row
+DEFAULT_RATE = 10
+DEFAULT_BURST = 5
+# The maximum number of requests in flight (sent but not answered yet) for a burner
+DEFAULT_MAX_IN_FLIGHT = 4
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# The priority of the requests by function identifier, any function not listed here has a normal priority
+PRIORITIES = {
+    FUNCTIONS.set.value: PRIORITY_HIGH,
+    FUNCTIONS.get_status.value: PRIORITY_HIGH,
+    FUNCTIONS.get_consumption_data.value: PRIORITY_LOW,
+    FUNCTIONS.get_chart_data.value: PRIORITY_LOW,
+    FUNCTIONS.get_event_log.value: PRIORITY_LOW,
+}
+
+# --------------------------------------------------------------------------------------------------
+
+
+class TokenBucket:
+    """
+    Defines a token bucket: tokens are added at a constant rate, up to the size of the bucket, and each request takes
+    one of them. The requests can thus be sent in bursts (up to the size of the bucket), but not faster than the rate
+    on average.
+
+    Args:
+        rate (float): The number of tokens added per second.
+        burst (int): The maximum number of tokens in the bucket.
+
+    Attributes:
+        burst (int)
+        rate (float)
+        tokens (float): The number of tokens currently in the bucket.
+    """
+
+    __slots__ = ("burst", "rate", "tokens", "_updated_at")
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+
+        self._updated_at = None
+
+    def take(self, now):
+        """
+        Takes a token from the bucket, if there is one.
+
+        Args:
+            now (float): The current time, as returned by `time.monotonic`.
+
+        Returns:
+            taken (bool): Whether or not a token has been taken.
+        """
+
+        self._refill(now)
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+
+        return True
+
+    def ready_at(self, now):
+        """
+        Returns when the next token will be available.
+
+        Args:
+            now (float): The current time, as returned by `time.monotonic`.
+
+        Returns:
+            time (float): When a token will be available, as returned by `time.monotonic`.
+        """
+
+        self._refill(now)
+
+        return now + max(0, 1 - self.tokens) / self.rate
+
+    def _refill(self, now):
+        if self._updated_at is not None:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self._updated_at) * self.rate
+            )
+
+        self._updated_at = now
+
+
+class Scheduler:
+    """
+    Decides when each request can be sent, to avoid overwhelming the (tiny) controllers of the burners.
+
+    Every burner has its own token bucket (limiting the number of requests per second) and a maximum number of
+    requests in flight. The requests waiting for their turn are sent by priority (updating a setting and getting the
+    status first, bulk reads like the chart data or the event log last), and in turn for each burner, so that a burner
+    with many waiting requests doesn't delay the other ones.
+
+    This is only the bookkeeping part: it doesn't send anything by itself, so it can be used by both the blocking
+    `Transport` and the asyncio client.
+    Note that this is not thread-safe, callers must hold their own lock when sharing a scheduler between threads.
+
+    Args:
+        rate (float): The maximum number of requests sent to a burner per second, on average (`None` for no limit).
+            Default: 10
+        burst (int): The maximum number of requests sent to a burner in a row.
+            Default: 5
+        max_in_flight (int): The maximum number of requests in flight (sent but not answered yet) for a burner.
+            Default: 4
+        priorities (dict): The priority of the requests by function identifier (the lower, the sooner).
+            Default: PRIORITIES
+
+    Attributes:
+        burst (int)
+        max_in_flight (int)
+        priorities (dict)
+        rate (float)
+    """
+
+    def __init__(
+        self,
+        rate=DEFAULT_RATE,
+        burst=DEFAULT_BURST,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        priorities=None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.priorities = dict(PRIORITIES if priorities is None else priorities)
+
+        self._buckets = {}
+        self._in_flight = collections.defaultdict(set)
+        # Priority -> address -> requests, the addresses being kept in the order they get their turn
+        self._queues = collections.defaultdict(collections.OrderedDict)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def priority(self, request):
+        """
+        Returns the priority of the given request.
+
+        Args:
+            request (Request): The request.
+
+        Returns:
+            priority (int): The priority of the request (the lower, the sooner).
+        """
+
+        return self.priorities.get(request.frame.function_id, PRIORITY_NORMAL)
+
+    def push(self, request):
+        """
+        Adds the given request to the requests waiting for their turn.
+
+        Args:
+            request (Request): The request to send.
+        """
+
+        self._queues[self.priority(request)].setdefault(
+            request.address, collections.deque()
+        ).append(request)
+        self._size += 1
+
+    def pop(self, now=None):
+        """
+        Returns the requests that can be sent right away, and counts them as in flight.
+
+        Args:
+            now (float): The current time, as returned by `time.monotonic`.
+                Default: None (the current time)
+
+        Returns:
+            requests (list(Request)): The requests to send, in order.
+        """
+
+        now = time.monotonic() if now is None else now
+
+        ready = []
+        progress = True
+        while progress and self._size:
+            progress = False
+
+            for priority in sorted(self._queues):
+                queues = self._queues[priority]
+
+                for address in list(queues):
+                    if not self._can_send(address, now):
+                        continue
+
+                    request = queues[address].popleft()
+                    if queues[address]:
+                        # Give the next burner its turn
+                        queues.move_to_end(address)
+                    else:
+                        del queues[address]
+
+                    self._size -= 1
+                    self._in_flight[address].add(request)
+                    ready.append(request)
+                    progress = True
+
+                    # Start over from the highest priority
+                    break
+
+                if progress:
+                    break
+
+        return ready
+
+    def next_at(self, now=None):
+        """
+        Returns when a waiting request will be allowed to be sent, if nothing else happens in the meantime.
+
+        Args:
+            now (float): The current time, as returned by `time.monotonic`.
+                Default: None (the current time)
+
+        Returns:
+            time (float): When the next request can be sent, as returned by `time.monotonic`, or `None` if no request
+                is waiting (or if they are all waiting for the response of a request in flight).
+        """
+
+        now = time.monotonic() if now is None else now
+
+        next_at = None
+        for queues in self._queues.values():
+            for address in queues:
+                if len(self._in_flight.get(address, ())) >= self.max_in_flight:
+                    continue
+
+                ready_at = (
+                    now if self.rate is None else self._bucket(address).ready_at(now)
+                )
+                if next_at is None or ready_at < next_at:
+                    next_at = ready_at
+
+        return next_at
+
+    def done(self, request):
+        """
+        Forgets about the given request, either because it has been answered or because it has been cancelled.
+
+        Args:
+            request (Request): The request.
+        """
+
+        in_flight = self._in_flight.get(request.address)
+        if in_flight is not None and request in in_flight:
+            in_flight.remove(request)
+            if not in_flight:
+                del self._in_flight[request.address]
+
+            return
+
+        queues = self._queues.get(self.priority(request))
+        if queues is None or request not in queues.get(request.address, ()):
+            return
+
+        queues[request.address].remove(request)
+        if not queues[request.address]:
+            del queues[request.address]
+
+        self._size -= 1
+
+    def clear(self):
+        """
+        Forgets about every request.
+        """
+
+        self._in_flight.clear()
+        self._queues.clear()
+        self._size = 0
+
+    def _bucket(self, address):
+        bucket = self._buckets.get(address)
+        if bucket is None:
+            bucket = self._buckets[address] = TokenBucket(self.rate, self.burst)
+
+        return bucket
+
+    def _can_send(self, address, now):
+        if len(self._in_flight.get(address, ())) >= self.max_in_flight:
+            return False
+
+        return self.rate is None or self._bucket(address).take(now)
@@ -0,0 +1,664 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import concurrent.futures
+import logging
+import queue
+import socket
+import threading
+import time
+
+from pyduro.protocol import (
+    DEFAULT_LOCAL_ADDRESS,
+    DEFAULT_NBE_PORT,
+    DEFAULT_ORIGIN_PORT,
+    FUNCTIONS,
+    PayloadToLargeException,
+    ResponseMalformedException,
+    TransportClosedException,
+)
+from pyduro.protocol.capture import RECEIVED, SENT
+from pyduro.protocol.codec import MAX_REQUEST_SIZE
+from pyduro.protocol.dispatcher import Dispatcher
+from pyduro.protocol.rtt import RttTable
+
+# --------------------------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+RECEIVE_INTERVAL = 0.5
+
+# --------------------------------------------------------------------------------------------------
+
+
+def open_socket(source_address=DEFAULT_LOCAL_ADDRESS, source_port=DEFAULT_ORIGIN_PORT):
+    """
+    Opens an UDP socket able to broadcast, bound to the given local address.
+
+    Args:
+        source_address (str): The ip address where to wait for responses.
+            Default: 0.0.0.0 (any local IP)
+        source_port (int): The local port where to wait for responses.
+            Default: 1901 (port used by the Aduro Android application)
+
+    Returns:
+        sock (socket.socket): The bound socket.
+    """
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.bind((source_address, source_port))
+    except:
+        sock.close()
+        raise
+
+    return sock
+
+
+class Transport:
+    """
+    Defines a long-lived UDP socket used to exchange NBE frames with one or several burners.
+    The socket is bound once and reused for every request, so it should be closed when not needed anymore (or used as
+    a context manager).
+
+    Each request is given its own sequence number and a background thread routes every received response to the
+    request it answers, so several requests (to the same burner or not) can be in flight at the same time.
+    A request identical to one already in flight (same burner, function and payload) doesn't send anything: it just
+    waits for the response of the first one.
+
+    The round trip time to each burner is measured to estimate how long to wait for a response before sending the
+    request again (see `wait`), so a lost datagram only costs a few round trips instead of the whole timeout.
+
+    Args:
+        source_address (str): The ip address where to wait for responses.
+            Default: 0.0.0.0 (any local IP)
+        source_port (int): The local port where to wait for responses.
+            Default: 1901 (port used by the Aduro Android application)
+        coalesce (bool): Whether or not identical requests in flight at the same time share the same round trip.
+            Note that requests updating a setting are never coalesced.
+            Default: True
+        rtt (RttTable): The round trip time estimations of the burners, to share them between several transports.
+            Default: None (a new table)
+        scheduler (Scheduler): The scheduler deciding when each request can be sent, to limit the number of requests
+            per second and in flight for each burner.
+            Note that discoveries and retransmissions are always sent right away.
+            Default: None (every request is sent right away)
+        capture (CaptureWriter): Where to record every datagram sent and received, with its timestamp.
+            Default: None (nothing is recorded)
+        metrics (Metrics): Where to count the requests, responses, timeouts, bytes... of every burner.
+            Default: None (nothing is counted)
+
+    Attributes:
+        capture (CaptureWriter)
+        closed (bool): Whether or not the socket has been closed.
+        coalesce (bool)
+        metrics (Metrics)
+        rtt (RttTable)
+        scheduler (Scheduler)
+        source_address (str)
+        source_port (int)
+    """
+
+    def __init__(
+        self,
+        source_address=DEFAULT_LOCAL_ADDRESS,
+        source_port=DEFAULT_ORIGIN_PORT,
+        coalesce=True,
+        rtt=None,
+        scheduler=None,
+        capture=None,
+        metrics=None,
+    ):
+        self.source_address = source_address
+        self.source_port = source_port
+        self.coalesce = coalesce
+        self.capture = capture
+        self.metrics = metrics
+        self.closed = False
+        self.rtt = RttTable() if rtt is None else rtt
+        self.scheduler = scheduler
+
+        self._dispatcher = Dispatcher(self.rtt, metrics)
+        self._lock = threading.Lock()
+        self._receiver = None
+        self._sender = None
+        self._wakeup = threading.Condition(self._lock)
+        self._send_buffer = bytearray(MAX_REQUEST_SIZE)
+        self._send_lock = threading.Lock()
+        self._send_view = memoryview(self._send_buffer)
+
+        self._socket = open_socket(source_address, source_port)
+        self._socket.settimeout(RECEIVE_INTERVAL)
+
+        # Keep the actual port, in case we asked the system to pick one (source_port=0)
+        self.source_port = self._socket.getsockname()[1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Closes the underlying socket. Any request still in flight will fail with a `TransportClosedException`, and any
+        later request will fail the same way.
+        """
+
+        with self._lock:
+            if self.closed:
+                return
+
+            self.closed = True
+            self._dispatcher.fail_all(TransportClosedException())
+
+            if self.scheduler is not None:
+                self.scheduler.clear()
+                self._wakeup.notify_all()
+
+        # Sending an empty datagram to ourselves wakes the receiver up without having to wait for its timeout
+        try:
+            self._socket.sendto(
+                b"",
+                (
+                    (
+                        "127.0.0.1"
+                        if self.source_address == DEFAULT_LOCAL_ADDRESS
+                        else self.source_address
+                    ),
+                    self.source_port,
+                ),
+            )
+        except OSError:
+            pass
+
+        if self._receiver is not None:
+            self._receiver.join()
+        if self._sender is not None:
+            self._sender.join()
+
+        self._socket.close()
+
+    def submit(
+        self,
+        frame,
+        destination_address,
+        destination_port=DEFAULT_NBE_PORT,
+        verbose=False,
+    ):
+        """
+        Sends the given frame to the burner without waiting for the response.
+
+        Note that the `sequence_number` of the frame will be overwritten to match the response with the request.
+
+        Args:
+            frame (Frame): The NBE frame to send.
+            destination_address (str): The ip address where to send the frame.
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+            verbose (bool): Indicates if we want to display the frame before sending it.
+                Default: False
+
+        Returns:
+            future (concurrent.futures.Future): The future that will hold the response of the burner.
+
+        Throws:
+            TooManyPendingRequestsException: If there are already 99 requests in flight to this burner.
+            TransportClosedException: If the transport has been closed.
+        """
+
+        return self._submit(
+            frame,
+            [destination_address],
+            destination_port,
+            verbose,
+            broadcast=frame.function_id == FUNCTIONS.discover.value,
+        )
+
+    def listen(
+        self,
+        frame,
+        destination_addresses,
+        listener,
+        destination_port=DEFAULT_NBE_PORT,
+        verbose=False,
+    ):
+        """
+        Sends the given frame to several addresses at once (e.g. broadcast addresses of several subnets) and calls the
+        listener with every response received, from any burner, until the request is cancelled.
+
+        Note that the `sequence_number` of the frame will be overwritten to match the responses with the request.
+
+        Args:
+            frame (Frame): The NBE frame to send.
+            destination_addresses (list(str)): The ip addresses where to send the frame.
+            listener (callable): The function to call with every `Response` received.
+                Note that it will be called from the receiving thread.
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+            verbose (bool): Indicates if we want to display the frame before sending it.
+                Default: False
+
+        Returns:
+            future (concurrent.futures.Future): The future to give to `cancel` to stop listening.
+                It will only be resolved with an exception if the transport gets closed in the meantime.
+
+        Throws:
+            TooManyPendingRequestsException: If there are already 99 requests in flight.
+            TransportClosedException: If the transport has been closed.
+        """
+
+        return self._submit(
+            frame,
+            destination_addresses,
+            destination_port,
+            verbose,
+            broadcast=True,
+            listener=listener,
+        )
+
+    def collect(
+        self,
+        frame,
+        destination_addresses,
+        timeout,
+        destination_port=DEFAULT_NBE_PORT,
+        verbose=False,
+    ):
+        """
+        Sends the given frame to several addresses at once and yields every response received until the timeout.
+
+        Args:
+            frame (Frame): The NBE frame to send.
+            destination_addresses (list(str)): The ip addresses where to send the frame.
+            timeout (float): The duration during which responses are collected, in seconds.
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+            verbose (bool): Indicates if we want to display the frame before sending it.
+                Default: False
+
+        Yields:
+            response (Response): Every response received, as soon as it is received.
+
+        Throws:
+            TransportClosedException: If the transport gets closed while collecting the responses.
+        """
+
+        responses = queue.Queue()
+
+        future = self.listen(
+            frame,
+            destination_addresses,
+            responses.put,
+            destination_port=destination_port,
+            verbose=verbose,
+        )
+        future.add_done_callback(lambda _: responses.put(None))
+
+        deadline = time.monotonic() + timeout
+
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+
+                try:
+                    response = responses.get(timeout=remaining)
+                except queue.Empty:
+                    return
+
+                if response is None:
+                    # The transport has been closed
+                    future.result()
+
+                    return
+
+                if verbose:
+                    print(response.data)
+
+                yield response
+        finally:
+            self.cancel(future)
+
+    def cancel(self, future):
+        """
+        Stops waiting for the response of the given request. A late response will then be dropped.
+
+        Args:
+            future (concurrent.futures.Future): The future returned by `submit`.
+        """
+
+        with self._lock:
+            self._dispatcher.cancel(future.request, future)
+            self._release(future.request)
+
+        future.cancel()
+
+    def send(
+        self,
+        frame,
+        destination_address,
+        destination_port=DEFAULT_NBE_PORT,
+        timeout=5,
+        verbose=False,
+    ):
+        """
+        Sends the given frame to the burner and wait for the response.
+
+        Note that the `sequence_number` of the frame will be overwritten to match the response with the request.
+
+        Args:
+            frame (Frame): The NBE frame to send.
+            destination_address (str): The ip address where to send the frame.
+            destination_port (int): The port where to send the frame.
+                Default: 8483 (default NBE communication protocol port)
+            timeout (int): The maximum duration to wait for a response from a burner, in seconds.
+                If `None` is given, then the call will be blocking.
+                Default: 5
+            verbose (bool): Indicates if we want to display the frame before sending it.
+                Default: False
+
+        Returns:
+            response (Response): The response from the burner, or `None` if it didn't answer in time (which is logged
+                as a warning).
+        """
+
+        future = self.submit(
+            frame,
+            destination_address,
+            destination_port=destination_port,
+            verbose=verbose,
+        )
+
+        done, _ = self.wait([future], timeout)
+        if not done:
+            self.cancel(future)
+
+            logger.warning(
+                "No response received from a burner in less than %s seconds!", timeout
+            )
+
+            return None
+
+        response = future.result()
+
+        if verbose:
+            print(response.data)
+
+        return response
+
+    def retransmit(self, future):
+        """
+        Sends the frame of the given request again, with the same sequence number (so that whichever response comes
+        first is used, and the other one is dropped).
+
+        Args:
+            future (concurrent.futures.Future): The future returned by `submit`.
+
+        Returns:
+            retransmitted (bool): Whether or not the frame has been sent again (it is not if the request has been
+                answered or cancelled in the meantime).
+        """
+
+        request = future.request
+
+        with self._lock:
+            if (
+                self.closed
+                or future.done()
+                or request.transmissions == 0
+                or self._dispatcher.pending.get(request.key) is not request
+            ):
+                return False
+
+            if request.transmissions == 1:
+                self.rtt.backoff(request.address, request.sent_at)
+
+            self._dispatcher.sent(request)
+
+        self._send(request.frame, [request.address], request.port)
+
+        return True
+
+    def wait(self, futures, timeout, retransmit=True):
+        """
+        Waits for the responses of the given requests, sending each request again whenever its response is late.
+
+        The first retransmission of a request happens after the retransmission timeout estimated for its burner (from
+        the measured round trip times), and every later one after twice the previous delay (up to `rtt.MAX_RTO`).
+
+        Args:
+            futures (list(concurrent.futures.Future)): The futures returned by `submit`.
+            timeout (float): The maximum duration to wait for all the responses, in seconds.
+                If `None` is given, then the call will be blocking.
+            retransmit (bool): Whether or not to send the requests again when their responses are late.
+                Default: True
+
+        Returns:
+            futures (tuple(set(Future), set(Future))): The futures that are done, and the ones that are not (those are
+                not cancelled).
+        """
+
+        now = time.monotonic()
+        deadline = None if timeout is None else now + timeout
+
+        pending = set(futures)
+        done = set()
+        delays = {}
+        retransmissions = {}
+        for future in pending:
+            if retransmit and future.request.listener is None:
+                delays[future] = self.rtt.timeout(future.request.address)
+                retransmissions[future] = (future.request.sent_at or now) + delays[
+                    future
+                ]
+
+        while pending:
+            until = min(retransmissions.values(), default=deadline)
+            if deadline is not None and until is not None:
+                until = min(until, deadline)
+
+            finished, pending = concurrent.futures.wait(
+                pending,
+                timeout=None if until is None else max(0, until - time.monotonic()),
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            done |= finished
+            for future in finished:
+                retransmissions.pop(future, None)
+
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+
+            for future, retransmission in list(retransmissions.items()):
+                if retransmission > now:
+                    continue
+
+                request = future.request
+                if request.sent_at is None or request.sent_at + delays[future] > now:
+                    # The request is still waiting for its turn (see `Scheduler`), or has been sent later than expected
+                    retransmissions[future] = (request.sent_at or now) + delays[future]
+
+                    continue
+
+                if not self.retransmit(future):
+                    del retransmissions[future]
+
+                    continue
+
+                delays[future] = min(delays[future] * 2, self.rtt.maximum)
+                retransmissions[future] = now + delays[future]
+
+        return done, pending
+
+    def _submit(
+        self,
+        frame,
+        destination_addresses,
+        destination_port,
+        verbose,
+        broadcast=False,
+        listener=None,
+    ):
+        future = concurrent.futures.Future()
+
+        with self._lock:
+            if self.closed:
+                raise TransportClosedException()
+
+            if self.coalesce and not broadcast and listener is None:
+                future.request = self._dispatcher.join(
+                    frame, destination_addresses[0], destination_port, future
+                )
+                if future.request is not None:
+                    return future
+
+            future.request = self._dispatcher.register(
+                frame,
+                destination_addresses[0],
+                destination_port,
+                future,
+                broadcast=broadcast,
+                listener=listener,
+                coalesce=self.coalesce,
+            )
+
+            if self._receiver is None:
+                self._receiver = threading.Thread(
+                    target=self._receive, name="pyduro-transport", daemon=True
+                )
+                self._receiver.start()
+
+            if self.scheduler is not None and not broadcast and listener is None:
+                # The request will be sent by the sender thread, when it is its turn
+                self.scheduler.push(future.request)
+
+                if self._sender is None:
+                    self._sender = threading.Thread(
+                        target=self._schedule, name="pyduro-scheduler", daemon=True
+                    )
+                    self._sender.start()
+
+                self._wakeup.notify()
+
+                if verbose:
+                    print(frame.encode())
+
+                return future
+
+            self._dispatcher.sent(future.request)
+
+        try:
+            self._send(frame, destination_addresses, destination_port, verbose)
+        except:
+            self.cancel(future)
+            raise
+
+        return future
+
+    def _send(self, frame, destination_addresses, destination_port, verbose=False):
+        with self._send_lock:
+            size = frame.encode_into(self._send_buffer)
+
+            if verbose:
+                print(bytes(self._send_buffer[:size]))
+
+            for destination_address in destination_addresses:
+                # Before sending: the receiver thread could record the response first otherwise
+                if self.capture is not None:
+                    self.capture.write(
+                        SENT,
+                        destination_address,
+                        destination_port,
+                        self._send_view[:size],
+                    )
+
+                self._socket.sendto(
+                    self._send_view[:size], (destination_address, destination_port)
+                )
+                if self.metrics is not None:
+                    self.metrics.increment("sent_bytes", destination_address, size)
+
+    def _receive(self):
+        # Avoid circular imports
+        from pyduro.protocol.frame import Response
+
+        while not self.closed:
+            try:
+                response_frame, origin = self._socket.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            if self.closed:
+                break
+
+            if self.capture is not None:
+                self.capture.write(RECEIVED, origin[0], origin[1], response_frame)
+            if self.metrics is not None:
+                self.metrics.increment("received_bytes", origin[0], len(response_frame))
+
+            try:
+                response = Response(response_frame, origin)
+            except ResponseMalformedException:
+                if self.metrics is not None:
+                    self.metrics.increment("malformed", origin[0])
+
+                logger.warning(
+                    "Unable to parse the answer from the burner (%s): %s",
+                    origin,
+                    response_frame,
+                )
+
+                continue
+
+            with self._lock:
+                request = self._dispatcher.dispatch(response)
+                if request is not None and request.listener is None:
+                    self._release(request)
+
+    def _release(self, request):
+        # Give the turn of a request that is not in flight anymore to another one (this must be called with the lock)
+        if self.scheduler is None:
+            return
+
+        if self._dispatcher.pending.get(request.key) is not request:
+            self.scheduler.done(request)
+            self._wakeup.notify()
+
+    def _schedule(self):
+        while True:
+            with self._lock:
+                requests = []
+                while not self.closed:
+                    requests = self.scheduler.pop()
+                    if requests:
+                        break
+
+                    next_at = self.scheduler.next_at()
+                    self._wakeup.wait(
+                        None if next_at is None else max(0, next_at - time.monotonic())
+                    )
+
+                if self.closed:
+                    return
+
+                for request in requests:
+                    self._dispatcher.sent(request)
+
+            for request in requests:
+                try:
+                    self._send(request.frame, [request.address], request.port)
+                except (OSError, PayloadToLargeException) as e:
+                    with self._lock:
+                        self._dispatcher.cancel(request)
+                        self._release(request)
+
+                    for future in request.futures:
+                        if not future.done():
+                            future.set_exception(e)
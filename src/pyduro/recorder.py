@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import array
+import bisect
+import collections
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+from pyduro.actions.status import STATUS_SCHEMA
+
+# --------------------------------------------------------------------------------------------------
+
+# The number of samples of a burner kept in memory before they are sealed into a segment
+DEFAULT_SEGMENT_SIZE = 3600
+# The type of the values stored in the columns ("d" for doubles, "f" for half the size but only ~7 significant digits)
+DEFAULT_TYPECODE = "d"
+
+# Segment file layout: <magic:8><header size:4><JSON header, padded to 8 bytes><timestamps:count doubles><one column of
+# count values for each field>
+SEGMENT_MAGIC = b"PYDUROTS"
+SEGMENT_EXTENSION = ".seg"
+
+Bucket = collections.namedtuple("Bucket", ["start", "count", "min", "max", "mean"])
+Bucket.__doc__ = """
+Defines the aggregated values of a field over a time bucket.
+
+Attributes:
+    start (float): The start of the bucket, as a UNIX timestamp.
+    count (int): The number of samples (with a value) in the bucket.
+    min (float): The minimum value in the bucket.
+    max (float): The maximum value in the bucket.
+    mean (float): The mean value in the bucket.
+"""
+
+_HEADER = struct.Struct("<8sI")
+_NAN = float("nan")
+
+# --------------------------------------------------------------------------------------------------
+
+
+class _Segment:
+    """
+    Defines a sealed chunk of samples of a burner: a column of timestamps and a column of values for each field, either
+    held in memory or memory-mapped from a segment file.
+
+    Args:
+        fields (list(str)): The recorded fields, in the order of the columns.
+        timestamps (array|memoryview): The timestamp of every sample.
+        columns (list(array|memoryview)): The values of every field, in the order of the fields.
+        handle (tuple(file, mmap)): The segment file and its memory map, if the segment is stored on disk.
+            Default: None
+
+    Attributes:
+        columns (dict): The values, by field.
+        end (float): The timestamp of the last sample.
+        start (float): The timestamp of the first sample.
+        timestamps (array|memoryview)
+    """
+
+    def __init__(self, fields, timestamps, columns, handle=None):
+        self.timestamps = timestamps
+        self.columns = dict(zip(fields, columns))
+        self.start = timestamps[0]
+        self.end = timestamps[-1]
+
+        self._handle = handle
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-maps a segment file.
+
+        Args:
+            path (str): The path of the segment file.
+
+        Returns:
+            segment (_Segment): The segment, whose columns are read straight from the file.
+
+        Throws:
+            ValueError: If the file is not a valid segment file.
+        """
+
+        segment_file = open(path, "rb")
+        try:
+            data = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            segment_file.close()
+            raise ValueError("Invalid segment file: {}".format(path))
+
+        try:
+            magic, header_size = _HEADER.unpack_from(data)
+            if magic != SEGMENT_MAGIC:
+                raise ValueError("Invalid segment file: {}".format(path))
+
+            header = json.loads(
+                data[_HEADER.size : _HEADER.size + header_size].decode()
+            )
+            count = header["count"]
+            item_size = array.array(header["typecode"]).itemsize
+
+            view = memoryview(data)
+            offset = _HEADER.size + _padded(header_size)
+            timestamps = view[offset : offset + count * 8].cast("d")
+            offset += count * 8
+
+            columns = []
+            for _ in header["fields"]:
+                columns.append(
+                    view[offset : offset + count * item_size].cast(header["typecode"])
+                )
+                offset += count * item_size
+        except Exception:
+            data.close()
+            segment_file.close()
+            raise
+
+        return cls(header["fields"], timestamps, columns, (segment_file, data))
+
+    def dump(self, path, typecode):
+        """
+        Writes the segment to a segment file.
+
+        Args:
+            path (str): The path of the segment file.
+            typecode (str): The type of the values of the columns.
+        """
+
+        header = json.dumps(
+            dict(fields=list(self.columns), count=len(self), typecode=typecode)
+        ).encode()
+
+        with open(path, "wb") as segment_file:
+            segment_file.write(_HEADER.pack(SEGMENT_MAGIC, len(header)))
+            segment_file.write(header.ljust(_padded(len(header)), b" "))
+            segment_file.write(self.timestamps)
+            for column in self.columns.values():
+                segment_file.write(column)
+
+    def close(self):
+        """
+        Releases the memory map of the segment, if any.
+        """
+
+        if self._handle is None:
+            return
+
+        segment_file, data = self._handle
+        self.timestamps.release()
+        for column in self.columns.values():
+            column.release()
+        data.close()
+        segment_file.close()
+
+        self._handle = None
+
+
+class StatusRecorder:
+    """
+    Records the statuses of burners as time series, in a compact form: each field of each burner is a column of
+    numbers (an `array.array`, 8 bytes per value) instead of a dict of strings per sample.
+
+    The samples of each burner are appended to in-memory columns, which are sealed into a segment every
+    `segment_size` samples. If a directory is given, every segment is written to a file there and memory-mapped: the
+    operating system then only keeps in memory the parts of the history that are actually read, and the history is
+    available again when a recorder is created later with the same directory.
+
+    The values that are not numbers (e.g. text fields, or missing values) are recorded as NaN.
+
+    This is thread-safe, so the same recorder can be shared between several watchers.
+
+    Args:
+        directory (str): The directory where to store the segments (one sub-directory per burner).
+            Default: None (the segments are kept in memory)
+        fields (list(str)): The status fields to record (e.g. "boiler_temp" or "hopper.trip1").
+            Default: every numeric field of the schema
+        schema (StatusSchema): The schema of the recorded statuses.
+            Default: STATUS_SCHEMA
+        segment_size (int): The number of samples of a burner in each segment.
+            Default: 3600
+        typecode (str): The type of the values, "d" (double) or "f" (float: half the size, but only about 7 significant
+            digits).
+            Default: "d"
+
+    Attributes:
+        directory (str)
+        fields (tuple(str))
+        schema (StatusSchema)
+        segment_size (int)
+        typecode (str)
+
+    Throws:
+        KeyError: If one of the given fields is not a field of the schema.
+    """
+
+    def __init__(
+        self,
+        directory=None,
+        fields=None,
+        schema=STATUS_SCHEMA,
+        segment_size=DEFAULT_SEGMENT_SIZE,
+        typecode=DEFAULT_TYPECODE,
+    ):
+        self.directory = directory
+        self.schema = schema
+        self.segment_size = segment_size
+        self.typecode = typecode
+        self.fields = (
+            tuple(field.name for field in schema.fields if field.type in (int, float))
+            if fields is None
+            else tuple(fields)
+        )
+
+        self._indexes = tuple(schema.field(name).index for name in self.fields)
+        self._lock = threading.Lock()
+        # Serial -> (timestamps, columns) of the samples not sealed yet
+        self._chunks = {}
+        # Serial -> sealed segments, oldest first
+        self._segments = collections.defaultdict(list)
+
+        if directory is not None:
+            self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Seals the samples not sealed yet, and releases the memory-mapped segments.
+        """
+
+        self.flush()
+
+        with self._lock:
+            for segments in self._segments.values():
+                for segment in segments:
+                    segment.close()
+
+            self._segments.clear()
+
+    def serials(self):
+        """
+        Returns the serials of the recorded burners.
+
+        Returns:
+            serials (list(str)): The serial of every burner with at least one sample.
+        """
+
+        with self._lock:
+            return sorted(set(self._segments) | set(self._chunks))
+
+    def count(self, serial):
+        """
+        Returns the number of samples recorded for the given burner.
+
+        Args:
+            serial (str): The serial number of the burner.
+
+        Returns:
+            count (int): The number of samples.
+        """
+
+        with self._lock:
+            chunk = self._chunks.get(serial)
+
+            return sum(len(segment) for segment in self._segments.get(serial, ())) + (
+                0 if chunk is None else len(chunk[0])
+            )
+
+    def record(self, serial, status, timestamp=None):
+        """
+        Appends a status sample of the given burner.
+
+        Args:
+            serial (str): The serial number of the burner.
+            status (Status): The decoded status (see `StatusSchema.decode`).
+            timestamp (float): When the status was received, as a UNIX timestamp.
+                Default: None (now)
+
+        Throws:
+            ValueError: If the sample is older than the last one recorded for this burner.
+        """
+
+        timestamp = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            chunk = self._chunks.get(serial)
+            if chunk is None:
+                chunk = self._chunks[serial] = (
+                    array.array("d"),
+                    [array.array(self.typecode) for _ in self.fields],
+                )
+
+            timestamps, columns = chunk
+            last = timestamps[-1] if timestamps else self._end(serial)
+            if last is not None and timestamp < last:
+                raise ValueError(
+                    "The samples of the burner {} must be recorded in chronological order".format(
+                        serial
+                    )
+                )
+
+            timestamps.append(timestamp)
+            for column, index in zip(columns, self._indexes):
+                value = status[index]
+                column.append(
+                    value
+                    if isinstance(value, (int, float)) and not isinstance(value, bool)
+                    else _NAN
+                )
+
+            if len(timestamps) >= self.segment_size:
+                self._seal(serial)
+
+    def flush(self):
+        """
+        Seals the samples not sealed yet into segments (and writes them to the directory, if any).
+        """
+
+        with self._lock:
+            for serial in list(self._chunks):
+                self._seal(serial)
+
+    def query(self, serial, field, since=None, until=None):
+        """
+        Returns the values of a field of the given burner over a period.
+
+        Args:
+            serial (str): The serial number of the burner.
+            field (str): The name of the field (e.g. "boiler_temp").
+            since (float): The start of the period (included), as a UNIX timestamp.
+                Default: None (no limit)
+            until (float): The end of the period (excluded), as a UNIX timestamp.
+                Default: None (no limit)
+
+        Returns:
+            series (tuple(array, array)): The timestamps and the values of the samples of the period, oldest first.
+
+        Throws:
+            KeyError: If the field is not recorded.
+        """
+
+        if field not in self.fields:
+            raise KeyError(field)
+
+        timestamps = array.array("d")
+        values = array.array(self.typecode)
+
+        with self._lock:
+            for segment in self._all_segments(serial):
+                if since is not None and segment.end < since:
+                    continue
+                if until is not None and segment.start >= until:
+                    break
+
+                start = (
+                    0
+                    if since is None
+                    else bisect.bisect_left(segment.timestamps, since)
+                )
+                end = (
+                    len(segment)
+                    if until is None
+                    else bisect.bisect_left(segment.timestamps, until)
+                )
+
+                _extend(timestamps, segment.timestamps, start, end)
+
+                column = segment.columns.get(field)
+                if column is None:
+                    # Recorded before this field was
+                    values.extend(_NAN for _ in range(end - start))
+                else:
+                    _extend(values, column, start, end)
+
+        return timestamps, values
+
+    def downsample(self, serial, field, bucket, since=None, until=None):
+        """
+        Aggregates the values of a field of the given burner over fixed time buckets (e.g. to draw a chart of a whole
+        month without loading every sample).
+
+        Args:
+            serial (str): The serial number of the burner.
+            field (str): The name of the field (e.g. "boiler_temp").
+            bucket (float): The duration of each bucket, in seconds. Buckets are aligned on multiples of this duration.
+            since (float): The start of the period (included), as a UNIX timestamp.
+                Default: None (no limit)
+            until (float): The end of the period (excluded), as a UNIX timestamp.
+                Default: None (no limit)
+
+        Returns:
+            buckets (list(Bucket)): The aggregated values of every bucket with at least one value, oldest first.
+
+        Throws:
+            KeyError: If the field is not recorded.
+        """
+
+        timestamps, values = self.query(serial, field, since=since, until=until)
+
+        buckets = []
+        index = 0
+        while index < len(timestamps):
+            start = math.floor(timestamps[index] / bucket) * bucket
+            end = bisect.bisect_left(timestamps, start + bucket, index)
+
+            # Let `min`, `max` and `sum` loop over the values of the whole bucket at once
+            chunk = values[index:end]
+            if any(map(math.isnan, chunk)):
+                chunk = [value for value in chunk if not math.isnan(value)]
+            if chunk:
+                buckets.append(
+                    Bucket(
+                        start,
+                        len(chunk),
+                        min(chunk),
+                        max(chunk),
+                        sum(chunk) / len(chunk),
+                    )
+                )
+
+            index = end
+
+        return buckets
+
+    def _all_segments(self, serial):
+        segments = list(self._segments.get(serial, ()))
+
+        chunk = self._chunks.get(serial)
+        if chunk is not None and chunk[0]:
+            segments.append(_Segment(self.fields, chunk[0], chunk[1]))
+
+        return segments
+
+    def _end(self, serial):
+        segments = self._segments.get(serial)
+
+        return segments[-1].end if segments else None
+
+    def _seal(self, serial):
+        timestamps, columns = self._chunks.pop(serial)
+        if not timestamps:
+            return
+
+        segment = _Segment(self.fields, timestamps, columns)
+
+        if self.directory is not None:
+            directory = os.path.join(self.directory, serial)
+            os.makedirs(directory, exist_ok=True)
+
+            # Named after its first sample (in milliseconds) and its position, so that the files sort chronologically
+            path = os.path.join(
+                directory,
+                "{:016d}-{:06d}{}".format(
+                    int(segment.start * 1000),
+                    len(self._segments[serial]),
+                    SEGMENT_EXTENSION,
+                ),
+            )
+            segment.dump(path, self.typecode)
+            segment = _Segment.load(path)
+
+        self._segments[serial].append(segment)
+
+    def _load(self):
+        if not os.path.isdir(self.directory):
+            return
+
+        for serial in sorted(os.listdir(self.directory)):
+            directory = os.path.join(self.directory, serial)
+            if not os.path.isdir(directory):
+                continue
+
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(SEGMENT_EXTENSION):
+                    self._segments[serial].append(
+                        _Segment.load(os.path.join(directory, name))
+                    )
+
+
+def _extend(target, column, start, end):
+    view = memoryview(column)[start:end]
+    if view.format == target.typecode:
+        # Copy the raw bytes at once
+        target.frombytes(view.cast("B"))
+    else:
+        target.extend(view)
+
+
+def _padded(size):
+    return (size + 7) // 8 * 8
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import collections
+import concurrent.futures
+import socket
+import threading
+import time
+
+from pyduro.protocol import DEFAULT_NBE_PORT, ResponseMalformedException
+from pyduro.protocol.capture import RECEIVED, SENT, read_capture
+from pyduro.protocol.codec import (
+    REQUEST_FUNCTION_OFFSET,
+    REQUEST_PAYLOAD_OFFSET,
+    REQUEST_PAYLOAD_SIZE_OFFSET,
+    REQUEST_PIN_CODE_OFFSET,
+    REQUEST_SEQUENCE_OFFSET,
+    REQUEST_TIMESTAMP_OFFSET,
+    RESPONSE_SEQUENCE_OFFSET,
+    decode_header,
+)
+from pyduro.protocol.frame import Frame
+from pyduro.protocol.transport import Transport
+
+# --------------------------------------------------------------------------------------------------
+
+DEFAULT_LOAD_CONCURRENCY = 32
+
+LoadReport = collections.namedtuple(
+    "LoadReport",
+    ["requests", "responses", "lost", "duration", "rate", "latencies"],
+)
+LoadReport.__doc__ = """
+Defines the result of a load test.
+
+Attributes:
+    requests (int): The number of requests sent.
+    responses (int): The number of responses received in time.
+    lost (int): The number of requests that didn't get a response in time.
+    duration (float): The duration of the whole test, in seconds.
+    rate (float): The number of responses received per second.
+    latencies (dict): The 50th, 90th and 99th percentiles and the maximum of the response times, in seconds (by
+        "p50", "p90", "p99" and "max").
+"""
+
+# --------------------------------------------------------------------------------------------------
+
+
+def parse_request(data):
+    """
+    Parses a request frame, as sent to a burner.
+
+    Args:
+        data (bytes): The request frame.
+
+    Returns:
+        request (tuple(str, str, str, int, int, str)): The application identifier, the serial, the pin code, the
+            function, the sequence number and the payload of the request.
+
+    Throws:
+        ResponseMalformedException: If the frame is not a valid request frame.
+    """
+
+    try:
+        size = int(data[REQUEST_PAYLOAD_SIZE_OFFSET:REQUEST_PAYLOAD_OFFSET])
+
+        return (
+            data[:12].decode(),
+            data[12:18].decode(),
+            data[REQUEST_PIN_CODE_OFFSET:REQUEST_TIMESTAMP_OFFSET].decode(),
+            int(data[REQUEST_FUNCTION_OFFSET:REQUEST_SEQUENCE_OFFSET]),
+            int(data[REQUEST_SEQUENCE_OFFSET:REQUEST_PIN_CODE_OFFSET]),
+            data[REQUEST_PAYLOAD_OFFSET : REQUEST_PAYLOAD_OFFSET + size].decode(),
+        )
+    except (UnicodeDecodeError, ValueError):
+        raise ResponseMalformedException(data)
+
+
+class ReplayServer:
+    """
+    Serves the responses of a capture (see `CaptureWriter`) on a local UDP port, as if the captured burner(s) were
+    there, to test or benchmark a client without a burner.
+
+    Each received request is answered with a response captured for the same serial, function and payload (with the
+    sequence number of the request), or for the same serial and function if this payload was never captured. When
+    several responses were captured for the same request, they are served in turn (e.g. successive statuses). Requests
+    that were never captured are not answered.
+
+    Args:
+        path (str): The path of the capture file.
+        address (str): The ip address where to serve the responses.
+            Default: 127.0.0.1
+        port (int): The port where to serve the responses.
+            Default: 8483
+
+    Attributes:
+        address (str)
+        answered (int): The number of requests answered.
+        port (int)
+        unanswered (int): The number of requests that were not answered (not captured or malformed).
+    """
+
+    def __init__(self, path, address="127.0.0.1", port=DEFAULT_NBE_PORT):
+        self.address = address
+        self.port = port
+        self.answered = 0
+        self.unanswered = 0
+
+        self._responses = collections.defaultdict(list)
+        self._turns = collections.Counter()
+        self._load(path)
+
+        self._closed = False
+        self._thread = None
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self._socket.bind((address, port))
+            self._socket.settimeout(0.5)
+        except:
+            self._socket.close()
+            raise
+
+        # Keep the actual port, in case we asked the system to pick one (port=0)
+        self.port = self._socket.getsockname()[1]
+
+    def __len__(self):
+        return sum(
+            len(responses)
+            for key, responses in self._responses.items()
+            if len(key) == 3
+        )
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start(self):
+        """
+        Starts serving the responses in a background thread.
+
+        Returns:
+            server (ReplayServer): The server itself.
+        """
+
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self.serve_forever, name="pyduro-replay", daemon=True
+            )
+            self._thread.start()
+
+        return self
+
+    def serve_forever(self):
+        """
+        Serves the responses until the server is closed.
+        """
+
+        while not self._closed:
+            try:
+                data, origin = self._socket.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            response = self.respond(data)
+            if response is None:
+                self.unanswered += 1
+
+                continue
+
+            try:
+                self._socket.sendto(response, origin)
+            except OSError:
+                continue
+
+            self.answered += 1
+
+    def respond(self, data):
+        """
+        Returns the response to the given request.
+
+        Args:
+            data (bytes): The request frame.
+
+        Returns:
+            response (bytes): The response frame, or `None` if no response was captured for this request.
+        """
+
+        try:
+            _, serial, _, function, sequence_number, payload = parse_request(data)
+        except ResponseMalformedException:
+            return None
+
+        for key in ((serial, function, payload), (serial, function)):
+            responses = self._responses.get(key)
+            if responses:
+                response = responses[self._turns[key] % len(responses)]
+                self._turns[key] += 1
+
+                return b"".join(
+                    (
+                        response[:RESPONSE_SEQUENCE_OFFSET],
+                        b"%02d" % sequence_number,
+                        response[RESPONSE_SEQUENCE_OFFSET + 2 :],
+                    )
+                )
+
+        return None
+
+    def close(self):
+        """
+        Stops serving the responses and closes the socket.
+        """
+
+        self._closed = True
+
+        if self._thread is not None:
+            self._thread.join()
+
+        self._socket.close()
+
+    def _load(self, path):
+        # Match every captured response with the request it answered, by address and sequence number
+        requests = {}
+        for record in read_capture(path):
+            if record.direction == SENT:
+                try:
+                    _, serial, _, function, sequence_number, payload = parse_request(
+                        record.data
+                    )
+                except ResponseMalformedException:
+                    continue
+
+                requests[(record.address, sequence_number)] = (
+                    serial,
+                    function,
+                    payload,
+                )
+                # A broadcast request can be answered from any address
+                requests[(None, sequence_number)] = (serial, function, payload)
+            elif record.direction == RECEIVED:
+                try:
+                    function, sequence_number, _, _ = decode_header(record.data)
+                except ResponseMalformedException:
+                    continue
+
+                request = requests.get((record.address, sequence_number)) or (
+                    requests.get((None, sequence_number))
+                )
+                if request is None or request[1] != function:
+                    continue
+
+                self._responses[request].append(record.data)
+                self._responses[request[:2]].append(record.data)
+
+
+def load_test(
+    path,
+    address="127.0.0.1",
+    port=DEFAULT_NBE_PORT,
+    count=1000,
+    concurrency=DEFAULT_LOAD_CONCURRENCY,
+    timeout=5,
+    transport=None,
+):
+    """
+    Sends the requests of a capture again and again (e.g. to a `ReplayServer`), with a fixed number of requests in
+    flight, and measures how fast they are answered (see `send_load`).
+
+    Args:
+        path (str): The path of the capture file.
+        address (str): The ip address where to send the requests.
+            Default: 127.0.0.1
+        port (int): The port where to send the requests.
+            Default: 8483
+        count (int): The number of requests to send.
+            Default: 1000
+        concurrency (int): The number of requests in flight at the same time.
+            Default: 32
+        timeout (float): The maximum duration to wait for each response, in seconds.
+            Default: 5
+        transport (Transport): The transport to use to send the requests.
+            If none is given, a temporary one (without coalescing, on a port picked by the system) will be opened (and
+            closed) just for this test.
+            Default: None
+
+    Returns:
+        report (LoadReport): The result of the test.
+
+    Throws:
+        ValueError: If the capture doesn't contain any request.
+    """
+
+    frames = []
+    for record in read_capture(path):
+        if record.direction != SENT:
+            continue
+
+        try:
+            app_id, serial, pin_code, function, _, payload = parse_request(record.data)
+        except ResponseMalformedException:
+            continue
+
+        frames.append(
+            Frame(serial, pin_code, function, payload, app_id, function_check=False)
+        )
+
+    if not frames:
+        raise ValueError("No request in the capture file: {}".format(path))
+
+    return send_load(
+        frames,
+        address,
+        port=port,
+        count=count,
+        concurrency=concurrency,
+        timeout=timeout,
+        transport=transport,
+    )
+
+
+def send_load(
+    frames,
+    address,
+    port=DEFAULT_NBE_PORT,
+    count=1000,
+    concurrency=DEFAULT_LOAD_CONCURRENCY,
+    timeout=5,
+    transport=None,
+):
+    """
+    Sends the given requests again and again, with a fixed number of requests in flight, and measures how fast they
+    are answered.
+
+    Requests are neither coalesced nor sent again: every lost response counts.
+
+    Args:
+        frames (list(Frame)): The requests to send, in turn.
+        address (str): The ip address where to send the requests.
+        port (int): The port where to send the requests.
+            Default: 8483
+        count (int): The number of requests to send.
+            Default: 1000
+        concurrency (int): The number of requests in flight at the same time.
+            Default: 32
+        timeout (float): The maximum duration to wait for each response, in seconds.
+            Default: 5
+        transport (Transport): The transport to use to send the requests.
+            If none is given, a temporary one (without coalescing, on a port picked by the system) will be opened (and
+            closed) just for this test.
+            Default: None
+
+    Returns:
+        report (LoadReport): The result of the test.
+    """
+
+    if transport is None:
+        with Transport(source_port=0, coalesce=False) as transport:
+            return send_load(
+                frames,
+                address,
+                port=port,
+                count=count,
+                concurrency=concurrency,
+                timeout=timeout,
+                transport=transport,
+            )
+
+    latencies = []
+    lost = 0
+    in_flight = {}
+    sent = 0
+
+    def on_done(future):
+        future.answered_at = time.monotonic()
+
+    start = time.monotonic()
+    while sent < count or in_flight:
+        while sent < count and len(in_flight) < concurrency:
+            frame = frames[sent % len(frames)]
+            # Every request needs its own frame, since the transport gives it its own sequence number
+            future = transport.submit(
+                Frame(
+                    frame.serial,
+                    frame.pin_code,
+                    frame.function_id,
+                    frame.payload,
+                    frame.app_id,
+                    function_check=False,
+                ),
+                address,
+                destination_port=port,
+            )
+            in_flight[future] = time.monotonic()
+            future.add_done_callback(on_done)
+            sent += 1
+
+        done, _ = concurrent.futures.wait(
+            in_flight,
+            timeout=max(0, min(in_flight.values()) + timeout - time.monotonic()),
+            return_when=concurrent.futures.FIRST_COMPLETED,
+        )
+
+        now = time.monotonic()
+        for future in done:
+            sent_at = in_flight.pop(future)
+            if future.exception() is None:
+                # The waiters are woken up before the callbacks are run, so `on_done` may not have been called yet
+                latencies.append(getattr(future, "answered_at", now) - sent_at)
+            else:
+                lost += 1
+
+        for future, sent_at in list(in_flight.items()):
+            if sent_at + timeout <= now:
+                transport.cancel(future)
+                del in_flight[future]
+                lost += 1
+
+    duration = time.monotonic() - start
+
+    latencies.sort()
+
+    return LoadReport(
+        requests=sent,
+        responses=len(latencies),
+        lost=lost,
+        duration=duration,
+        rate=len(latencies) / duration if duration > 0 else 0,
+        latencies=dict(
+            p50=_percentile(latencies, 0.5),
+            p90=_percentile(latencies, 0.9),
+            p99=_percentile(latencies, 0.99),
+            max=latencies[-1] if latencies else None,
+        ),
+    )
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+
+    return values[min(len(values) - 1, int(len(values) * fraction))]
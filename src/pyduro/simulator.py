@@ -0,0 +1,918 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import argparse
+import datetime
+import heapq
+import ipaddress
+import itertools
+import math
+import random
+import selectors
+import socket
+import threading
+import time
+import zlib
+
+from pyduro.actions import CONSUMPTION_DATA
+from pyduro.actions.history import EVENT_LOG_TIMESTAMP_FORMAT, EVENT_LOG_TIMESTAMP_SIZE
+from pyduro.actions.status import STATUS_FIELDS
+from pyduro.protocol import (
+    DEFAULT_NBE_PORT,
+    END_CHAR,
+    FUNCTIONS,
+    PAYLOADS,
+    START_CHAR,
+    ResponseMalformedException,
+)
+from pyduro.replay import parse_request
+
+# --------------------------------------------------------------------------------------------------
+
+DEFAULT_SIMULATOR_ADDRESS = "127.0.0.1"
+DEFAULT_SIMULATOR_SERIAL = "100000"
+DEFAULT_SIMULATOR_PIN_CODE = "1234567890"
+
+DEFAULT_EVENT_INTERVAL = 2 * 3600
+DEFAULT_EVENT_HISTORY = 365 * 86400
+DEFAULT_EVENT_LOG_PAGE_SIZE = 10
+
+DEFAULT_REORDER_DELAY = 0.05
+
+# The settings of a simulated burner, by group, as (name, default value, minimum, maximum)
+SIMULATED_SETTINGS = {
+    "boiler": (
+        ("temp", "65", 0, 85),
+        ("diff_over", "15", 0, 30),
+        ("diff_under", "5", 0, 30),
+        ("timer", "0", 0, 1),
+    ),
+    "hot_water": (
+        ("temp", "55", 0, 85),
+        ("diff_under", "5", 0, 30),
+        ("output", "0", 0, 20),
+        ("timer", "0", 0, 1),
+    ),
+    "regulation": (
+        ("boiler_gain_i", "0.5", 0, 10),
+        ("boiler_gain_p", "2.0", 0, 10),
+        ("fixed_power", "0", 0, 100),
+        ("min_power", "10", 0, 100),
+        ("max_power", "100", 0, 100),
+    ),
+    "weather": (
+        ("active", "0", 0, 1),
+        ("output_pump", "0", 0, 20),
+        ("output_up", "0", 0, 20),
+        ("output_down", "0", 0, 20),
+        ("comfort", "21", 10, 30),
+    ),
+    "weather2": (
+        ("active", "0", 0, 1),
+        ("output_pump", "0", 0, 20),
+        ("output_up", "0", 0, 20),
+        ("output_down", "0", 0, 20),
+        ("comfort", "21", 10, 30),
+    ),
+    "oxygen": (
+        ("regulation", "1", 0, 2),
+        ("oxygen_low", "8.0", 0, 21),
+        ("oxygen_high", "12.0", 0, 21),
+    ),
+    "cleaning": (
+        ("output_ash", "0", 0, 20),
+        ("output_burner", "0", 0, 20),
+        ("output_boiler1", "0", 0, 20),
+        ("output_boiler2", "0", 0, 20),
+        ("pressure_t7", "0", 0, 1000),
+    ),
+    "hopper": (
+        ("trip1", "0", 0, 10000),
+        ("trip2", "0", 0, 10000),
+        ("auger_capacity", "5000", 0, 20000),
+        ("content", "200", 0, 1000),
+    ),
+    "fan": (
+        ("output_exhaust", "0", 0, 20),
+        ("exhaust_10", "35", 0, 100),
+        ("exhaust_50", "55", 0, 100),
+        ("exhaust_100", "80", 0, 100),
+    ),
+    "auger": (
+        ("kw_min", "4.0", 0, 50),
+        ("kw_max", "16.0", 0, 50),
+        ("auger_capacity", "5000", 0, 20000),
+    ),
+    "ignition": (
+        ("power", "100", 0, 100),
+        ("exhaust_speed", "40", 0, 100),
+        ("max_time", "600", 0, 3600),
+    ),
+    "pump": (
+        ("output", "0", 0, 20),
+        ("start_temp_run", "55", 0, 85),
+        ("start_temp_idle", "65", 0, 85),
+    ),
+    "sun": (
+        ("output_pump", "0", 0, 20),
+        ("output_excess", "0", 0, 20),
+        ("dhw_max", "80", 0, 95),
+    ),
+    "vacuum": (
+        ("active", "0", 0, 1),
+        ("interval", "12", 0, 48),
+    ),
+    "misc": (
+        ("start", "0", 0, 1),
+        ("stop", "0", 0, 1),
+    ),
+    "alarm": (
+        ("boiler_temp_high", "95", 0, 120),
+        ("smoke_temp_high", "250", 0, 500),
+    ),
+    "manual": (
+        ("auger", "0", 0, 1),
+        ("exhaust", "0", 0, 1),
+        ("ignition", "0", 0, 1),
+    ),
+}
+
+# The fields of the operating and advanced data, which are also fields of the status vector
+OPERATING_FIELDS = (
+    "boiler_temp",
+    "boiler_ref",
+    "content",
+    "dhw_temp",
+    "dhw_ref",
+    "state",
+    "substate",
+    "substate_sec",
+    "exhaust_speed",
+    "external_temp",
+    "oxygen",
+    "oxygen_ref",
+    "photo_level",
+    "power_kw",
+    "power_pct",
+    "smoke_temp",
+    "shaft_temp",
+    "return_temp",
+    "consumption_midnight",
+    "consumption_total",
+)
+ADVANCED_FIELDS = (
+    "forward_temp",
+    "forward_ref",
+    "mean_out_temp",
+    "chill_out",
+    "distance",
+    "pressure",
+    "feed_high",
+    "feed_low",
+    "corr_low",
+    "corr_medium",
+    "corr_high",
+    "flow1",
+)
+
+# The number of values of each consumption history
+_CONSUMPTION_SIZES = dict(hours=24, days=31, months=12, years=5)
+
+# The states of a simulated burner along its (hourly) cycle: (end of the phase in the cycle, state, substate)
+_CYCLE = ((300, 2, 4), (2700, 5, 0), (3300, 14, 1), (3600, 0, 0))
+_CYCLE_DURATION = 3600
+
+# --------------------------------------------------------------------------------------------------
+
+
+class SimulatedBurner:
+    """
+    Simulates the controller of a burner: its settings, its status (changing with time, along an hourly cycle of
+    ignition, power and idle phases), its consumption history and its event log.
+
+    Everything but the settings is computed from the serial number and the time of the request, so that a burner
+    always gives the same answers for the same requests (e.g. two pages of its event log never disagree).
+
+    Args:
+        serial (str): The serial number of the burner.
+        pin_code (str): The pin code required to update the settings of the burner.
+            Default: 1234567890
+        address (str): The ip address where the burner is served.
+            Default: 127.0.0.1
+        event_interval (float): The mean duration between two events of the event log, in seconds.
+            Default: 7200 (2 hours)
+        event_history (float): How far back the event log goes, in seconds.
+            Default: 31536000 (1 year)
+        event_page_size (int): The maximum number of events in a page of the event log.
+            Default: 10
+
+    Attributes:
+        address (str)
+        event_page_size (int)
+        pin_code (str)
+        serial (str)
+        settings (dict): The current value (as a string) of every setting, by group and name.
+    """
+
+    def __init__(
+        self,
+        serial,
+        pin_code=DEFAULT_SIMULATOR_PIN_CODE,
+        address=DEFAULT_SIMULATOR_ADDRESS,
+        event_interval=DEFAULT_EVENT_INTERVAL,
+        event_history=DEFAULT_EVENT_HISTORY,
+        event_page_size=DEFAULT_EVENT_LOG_PAGE_SIZE,
+    ):
+        self.serial = "{:0>6.6}".format(serial)
+        self.pin_code = "{:0<10.10}".format(pin_code)
+        self.address = address
+        self.event_page_size = event_page_size
+
+        self.settings = {
+            group: {name: value for name, value, _, _ in fields}
+            for group, fields in SIMULATED_SETTINGS.items()
+        }
+        self._ranges = {
+            group: {name: (minimum, maximum) for name, _, minimum, maximum in fields}
+            for group, fields in SIMULATED_SETTINGS.items()
+        }
+
+        # Every burner runs its cycle with its own phase
+        self._phase = _noise(self.serial, "phase") * _CYCLE_DURATION
+
+        # The events happen at the same times whenever the burner is simulated, only the oldest ones are forgotten
+        self._event_interval = int(event_interval)
+        self._event_oldest = int(time.time() - event_history)
+
+    def respond(self, function, payload, pin_code=None):
+        """
+        Answers a request.
+
+        Args:
+            function (int): The function of the request.
+            payload (str): The payload of the request.
+            pin_code (str): The pin code given with the request.
+                Default: None (only needed to update a setting)
+
+        Returns:
+            response (tuple(int, str)): The status and the payload of the response. The status is 1 if the request is
+                not valid (unknown function or path, invalid value or wrong pin code).
+        """
+
+        if function == FUNCTIONS.discover.value:
+            if payload != PAYLOADS.discovery.value:
+                return 1, ""
+
+            return (
+                0,
+                "Serial={};IP={};Type=v13;Ver=13.0.5;Build=42;Lang=0".format(
+                    self.serial,
+                    # A burner served on every interface announces the main address of the host
+                    (
+                        socket.gethostbyname(socket.gethostname())
+                        if self.address == "0.0.0.0"
+                        else self.address
+                    ),
+                ),
+            )
+
+        if function == FUNCTIONS.get_settings.value:
+            return self._get_settings(payload)
+
+        if function == FUNCTIONS.get_settings_range.value:
+            return self._get_settings(payload, ranges=True)
+
+        if function == FUNCTIONS.set.value:
+            return self._set(payload, pin_code)
+
+        if function == FUNCTIONS.get_operating_data.value:
+            return _select(self.status(), OPERATING_FIELDS, payload)
+
+        if function == FUNCTIONS.get_advanced_data.value:
+            return _select(self.status(), ADVANCED_FIELDS, payload)
+
+        if function == FUNCTIONS.get_consumption_data.value:
+            return self._get_consumption(payload)
+
+        if function == FUNCTIONS.get_event_log.value:
+            return self._get_event_log(payload)
+
+        if function == FUNCTIONS.get_status.value:
+            status = self.status()
+
+            return 0, ",".join(status[name] for name, _, _ in STATUS_FIELDS)
+
+        return 1, ""
+
+    def status(self, timestamp=None):
+        """
+        Returns the status of the burner at the given time.
+
+        Args:
+            timestamp (float): The UNIX timestamp of the status.
+                Default: None (now)
+
+        Returns:
+            status (dict): The value (as a string) of every field of the status vector (see `STATUS_FIELDS`), by name.
+        """
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        elapsed = (timestamp + self._phase) % _CYCLE_DURATION
+        for end, state, substate in _CYCLE:
+            if elapsed < end:
+                break
+
+        running = state == 5
+        boiler_ref = float(self.settings["boiler"]["temp"])
+        power_pct = 60 + 40 * math.sin(2 * math.pi * elapsed / 900) if running else 0
+        boiler_temp = boiler_ref + (
+            3 * math.sin(2 * math.pi * elapsed / 900)
+            if running
+            else -(elapsed - 2700) / 120 if state == 14 else -5
+        )
+        kw_max = float(self.settings["auger"]["kw_max"])
+        # About 0.2 kg of pellets per kWh, and 2 hours of full power per day on average, over a year or so
+        consumption_total = (
+            1000 + (timestamp % (400 * 86400)) / 86400 * kw_max * 2 * 0.2
+        )
+        midnight = timestamp - timestamp % 86400
+        daily = 10 + 5 * math.cos(2 * math.pi * (timestamp % 86400) / 86400)
+
+        values = dict(
+            boiler_temp=boiler_temp,
+            boiler_ref=boiler_ref,
+            content=float(self.settings["hopper"]["content"])
+            - (consumption_total % 150),
+            dhw_temp=float(self.settings["hot_water"]["temp"]) - 2 + daily / 10,
+            dhw_ref=float(self.settings["hot_water"]["temp"]),
+            state=state,
+            substate=substate,
+            substate_sec=int(elapsed),
+            state_sec=int(elapsed),
+            exhaust_speed=30 + power_pct / 2 if state else 0,
+            external_temp=daily,
+            outdoor_temp=daily,
+            oxygen=21 - power_pct / 10 if state else 21,
+            oxygen_ref=10.0,
+            photo_level=power_pct * 3 if state else 0,
+            power_kw=kw_max * power_pct / 100,
+            power_pct=power_pct,
+            smoke_temp=40 + power_pct * 1.2,
+            shaft_temp=20 + power_pct / 5,
+            return_temp=boiler_temp - 10,
+            forward_temp=boiler_temp - 5,
+            forward_ref=boiler_ref - 5,
+            mean_out_temp=daily,
+            consumption_midnight=(timestamp - midnight) / 86400 * kw_max * 2 * 0.2,
+            consumption_total=consumption_total,
+            off_on_alarm=0,
+            city="Simulated",
+            time=time.strftime("%H:%M", time.localtime(timestamp)),
+            operation_mode=0,
+        )
+
+        status = {}
+        for name, field_type, _ in STATUS_FIELDS:
+            value = values.get(name)
+            if value is None and "." in name:
+                group, _, setting = name.partition(".")
+                value = self.settings.get(group, {}).get(setting)
+            if value is None:
+                value = "" if field_type is str else 0
+
+            if field_type is float:
+                status[name] = "{:.1f}".format(float(value))
+            elif field_type is int:
+                status[name] = str(int(float(value)))
+            else:
+                status[name] = str(value)
+
+        return status
+
+    def events(self, cursor, count=None):
+        """
+        Returns the events logged before the given time, as a burner sends them in a page of its event log.
+
+        Args:
+            cursor (datetime.datetime): The time before which the events are wanted (excluded).
+            count (int): The maximum number of events to return.
+                Default: None (`event_page_size`)
+
+        Returns:
+            records (list(str)): The newest events logged before the cursor (and before now), newest first, each one
+                starting with its "yymmdd:hhmmss" timestamp.
+        """
+
+        if count is None:
+            count = self.event_page_size
+
+        limit = min(
+            int(time.mktime(cursor.timetuple())),
+            # Nothing is logged in the future
+            int(time.time()) + 1,
+        )
+
+        index = limit // self._event_interval
+        records = []
+        while len(records) < count:
+            timestamp = self._event_time(index)
+            if timestamp < self._event_oldest:
+                break
+            if timestamp < limit:
+                records.extend(self._event_records(index, timestamp))
+
+            index -= 1
+
+        return records[:count]
+
+    def _event_time(self, index):
+        # Each event happens at some point of the first half of its interval, so that events stay in order
+        return index * self._event_interval + int(
+            _noise(self.serial, index) * self._event_interval / 2
+        )
+
+    def _event_records(self, index, timestamp):
+        date = datetime.datetime.fromtimestamp(timestamp).strftime(
+            EVENT_LOG_TIMESTAMP_FORMAT
+        )
+        code = int(_noise(self.serial, index, "code") * 40)
+
+        records = ["{},{},{}".format(date, code, index)]
+        # Some events come in pairs, logged during the same second
+        if code % 7 == 0:
+            records.insert(0, "{},{},{}".format(date, code + 1, index))
+
+        return records
+
+    def _get_settings(self, payload, ranges=False):
+        group, _, name = payload.partition(".")
+        if group not in self.settings:
+            return 1, ""
+
+        if ranges:
+            values = {
+                field: "{},{}".format(minimum, maximum)
+                for field, (minimum, maximum) in self._ranges[group].items()
+            }
+        else:
+            values = self.settings[group]
+
+        return _select(values, tuple(values), name)
+
+    def _set(self, payload, pin_code):
+        if pin_code is None or "{:0<10.10}".format(pin_code) != self.pin_code:
+            return 1, ""
+
+        path, _, value = payload.partition("=")
+        group, _, name = path.partition(".")
+        if name not in self._ranges.get(group, {}):
+            return 1, ""
+
+        minimum, maximum = self._ranges[group][name]
+        try:
+            if not minimum <= float(value) <= maximum:
+                return 1, ""
+        except ValueError:
+            return 1, ""
+
+        self.settings[group][name] = value
+
+        return 0, ""
+
+    def _get_consumption(self, payload):
+        if payload not in CONSUMPTION_DATA:
+            return 1, ""
+
+        if payload == "counter":
+            return 0, "counter={:.1f}".format(float(self.status()["consumption_total"]))
+
+        kind, _, period = payload.partition("_")
+        # Hot water only takes a fraction of the pellets
+        scale = dict(hours=1.5, days=35, months=1000, years=12000)[period] * (
+            0.2 if kind == "dhw" else 1
+        )
+
+        return 0, "{}={}".format(
+            payload,
+            ",".join(
+                "{:.1f}".format(scale * (0.5 + _noise(self.serial, payload, index)))
+                for index in range(_CONSUMPTION_SIZES[period])
+            ),
+        )
+
+    def _get_event_log(self, payload):
+        try:
+            cursor = datetime.datetime.strptime(
+                payload[:EVENT_LOG_TIMESTAMP_SIZE], EVENT_LOG_TIMESTAMP_FORMAT
+            )
+        except ValueError:
+            return 1, ""
+
+        return 0, ";".join(self.events(cursor))
+
+
+class Simulator:
+    """
+    Serves simulated burners over UDP, as real burners would answer the NBE protocol, to test or benchmark clients
+    without any hardware.
+
+    Every burner is served on its own address (several burners can share one, each of them only answering the requests
+    for its own serial, and all of them answering discoveries). On Linux, every 127.x.y.z address is a local address,
+    so that a whole fleet can be simulated on one machine, each burner having its own 99 sequence numbers.
+
+    Everything is served by a single thread, whatever the number of burners. Latency, loss and reordering can be
+    simulated, from a seeded random generator so that runs can be reproduced.
+
+    Args:
+        burners (list(SimulatedBurner)): The burners to serve.
+        port (int): The port where to serve the burners.
+            Default: 8483
+        latency (float): The delay before answering each request, in seconds.
+            Default: 0
+        jitter (float): The maximum random variation of the latency (in both directions), in seconds.
+            Default: 0
+        loss (float): The probability that a request is not answered (between 0 and 1).
+            Default: 0
+        reorder (float): The probability that a response is held back, so that it is received after the responses to
+            later requests (between 0 and 1).
+            Default: 0
+        reorder_delay (float): How long a response is held back, in seconds.
+            Default: 0.05
+        seed (int): The seed of the random generator.
+            Default: None (random)
+
+    Attributes:
+        answered (int): The number of requests answered.
+        burners (list(SimulatedBurner))
+        dropped (int): The number of requests not answered (lost, or for an unknown serial).
+        port (int)
+        received (int): The number of requests received.
+    """
+
+    def __init__(
+        self,
+        burners,
+        port=DEFAULT_NBE_PORT,
+        latency=0,
+        jitter=0,
+        loss=0,
+        reorder=0,
+        reorder_delay=DEFAULT_REORDER_DELAY,
+        seed=None,
+    ):
+        self.burners = list(burners)
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.reorder = reorder
+        self.reorder_delay = reorder_delay
+
+        self.received = 0
+        self.answered = 0
+        self.dropped = 0
+
+        self._random = random.Random(seed)
+        self._closed = False
+        self._thread = None
+        # The responses waiting for their time to be sent: (due time, counter, socket, response, origin)
+        self._delayed = []
+        self._counter = itertools.count()
+
+        self._burners = {}
+        for burner in self.burners:
+            self._burners.setdefault(burner.address, {})[burner.serial] = burner
+
+        self._selector = selectors.DefaultSelector()
+        try:
+            for address, burners_by_serial in self._burners.items():
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._selector.register(sock, selectors.EVENT_READ, burners_by_serial)
+
+                sock.bind((address, port))
+                sock.setblocking(False)
+        except:
+            self._close_sockets()
+            raise
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start(self):
+        """
+        Starts serving the burners in a background thread.
+
+        Returns:
+            simulator (Simulator): The simulator itself.
+        """
+
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self.serve_forever, name="pyduro-simulator", daemon=True
+            )
+            self._thread.start()
+
+        return self
+
+    def serve_forever(self):
+        """
+        Serves the burners until the simulator is closed.
+        """
+
+        while not self._closed:
+            timeout = 0.5
+            if self._delayed:
+                timeout = max(0, min(timeout, self._delayed[0][0] - time.monotonic()))
+
+            for key, _ in self._selector.select(timeout):
+                self._receive(key.fileobj, key.data)
+
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, _, sock, response, origin = heapq.heappop(self._delayed)
+                self._send(sock, response, origin)
+
+    def close(self):
+        """
+        Stops serving the burners and closes the sockets.
+        """
+
+        self._closed = True
+
+        if self._thread is not None:
+            self._thread.join()
+
+        self._close_sockets()
+
+    def _close_sockets(self):
+        for key in list(self._selector.get_map().values()):
+            self._selector.unregister(key.fileobj)
+            key.fileobj.close()
+
+        self._selector.close()
+
+    def _receive(self, sock, burners_by_serial):
+        while True:
+            try:
+                data, origin = sock.recvfrom(4096)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+            self.received += 1
+
+            try:
+                app_id, serial, pin_code, function, sequence_number, payload = (
+                    parse_request(data)
+                )
+            except ResponseMalformedException:
+                self.dropped += 1
+
+                continue
+
+            if function == FUNCTIONS.discover.value:
+                burners = list(burners_by_serial.values())
+            else:
+                burner = burners_by_serial.get(serial)
+                burners = [] if burner is None else [burner]
+
+            if not burners or (self.loss and self._random.random() < self.loss):
+                self.dropped += 1
+
+                continue
+
+            for burner in burners:
+                status, response_payload = burner.respond(function, payload, pin_code)
+                response = "{}{}{}{:02d}{:02d}{}{:03d}{}{}".format(
+                    app_id,
+                    burner.serial,
+                    START_CHAR,
+                    function,
+                    sequence_number,
+                    status,
+                    len(response_payload),
+                    response_payload,
+                    END_CHAR,
+                ).encode()
+
+                delay = self._delay()
+                if delay > 0:
+                    heapq.heappush(
+                        self._delayed,
+                        (
+                            time.monotonic() + delay,
+                            next(self._counter),
+                            sock,
+                            response,
+                            origin,
+                        ),
+                    )
+                else:
+                    self._send(sock, response, origin)
+
+    def _delay(self):
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(-self.jitter, self.jitter)
+        if self.reorder and self._random.random() < self.reorder:
+            delay += self.reorder_delay
+
+        return max(0, delay)
+
+    def _send(self, sock, response, origin):
+        try:
+            sock.sendto(response, origin)
+        except OSError:
+            self.dropped += 1
+
+            return
+
+        self.answered += 1
+
+
+def build_fleet(
+    count,
+    address=DEFAULT_SIMULATOR_ADDRESS,
+    addresses=None,
+    serial=DEFAULT_SIMULATOR_SERIAL,
+    pin_code=DEFAULT_SIMULATOR_PIN_CODE,
+    **kwargs
+):
+    """
+    Builds a fleet of simulated burners, with consecutive serial numbers, spread over consecutive addresses.
+
+    Args:
+        count (int): The number of burners.
+        address (str): The address of the first burner.
+            Default: 127.0.0.1
+        addresses (int): The number of consecutive addresses to spread the burners over.
+            Default: None (one address per burner)
+        serial (str): The serial number of the first burner.
+            Default: 100000
+        pin_code (str): The pin code of every burner.
+            Default: 1234567890
+        **kwargs: The other arguments of every `SimulatedBurner`.
+
+    Returns:
+        burners (list(SimulatedBurner)): The burners.
+    """
+
+    first_address = ipaddress.IPv4Address(address)
+    addresses = count if addresses is None else addresses
+
+    return [
+        SimulatedBurner(
+            "{:06d}".format(int(serial) + index),
+            pin_code=pin_code,
+            address=str(first_address + index % addresses),
+            **kwargs
+        )
+        for index in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="pyduro.simulator",
+        description="Simulate Aduro burners answering the NBE communication protocol",
+    )
+    parser.add_argument(
+        "--address",
+        help="The address of the first burner (use 0.0.0.0 to answer broadcasted discoveries)",
+        type=str,
+        default=DEFAULT_SIMULATOR_ADDRESS,
+    )
+    parser.add_argument(
+        "--port",
+        help="The port where to serve the burners",
+        type=int,
+        default=DEFAULT_NBE_PORT,
+    )
+    parser.add_argument(
+        "-n",
+        "--count",
+        help="The number of burners to simulate",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--addresses",
+        help="The number of consecutive addresses to spread the burners over (one per burner if not given)",
+        type=int,
+    )
+    parser.add_argument(
+        "-s",
+        "--serial",
+        help="The serial number of the first burner (the next ones are consecutive)",
+        type=str,
+        default=DEFAULT_SIMULATOR_SERIAL,
+    )
+    parser.add_argument(
+        "-p",
+        "--pin",
+        help="The pin code of every burner",
+        type=str,
+        default=DEFAULT_SIMULATOR_PIN_CODE,
+    )
+    parser.add_argument(
+        "--latency",
+        help="The delay before answering each request, in seconds",
+        type=float,
+        default=0,
+    )
+    parser.add_argument(
+        "--jitter",
+        help="The maximum random variation of the latency, in seconds",
+        type=float,
+        default=0,
+    )
+    parser.add_argument(
+        "--loss",
+        help="The probability that a request is not answered (between 0 and 1)",
+        type=float,
+        default=0,
+    )
+    parser.add_argument(
+        "--reorder",
+        help="The probability that a response is held back behind later ones (between 0 and 1)",
+        type=float,
+        default=0,
+    )
+    parser.add_argument(
+        "--seed",
+        help="The seed of the random generator, to reproduce a run",
+        type=int,
+    )
+    parser.add_argument(
+        "--fleet",
+        help='A file where to write the simulated burners, one "<address>,<serial>,<pin code>" per line (see `poll -f`)',
+        type=str,
+    )
+
+    args = parser.parse_args()
+
+    burners = build_fleet(
+        args.count,
+        address=args.address,
+        addresses=args.addresses,
+        serial=args.serial,
+        pin_code=args.pin,
+    )
+
+    if args.fleet is not None:
+        with open(args.fleet, "w") as fleet_file:
+            for burner in burners:
+                fleet_file.write(
+                    "{},{},{}\n".format(burner.address, burner.serial, burner.pin_code)
+                )
+
+    simulator = Simulator(
+        burners,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        loss=args.loss,
+        reorder=args.reorder,
+        seed=args.seed,
+    )
+    print(
+        "Simulating {} burner(s) from {}:{}".format(
+            len(burners), burners[0].address, args.port
+        ),
+        flush=True,
+    )
+
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.close()
+
+
+def _noise(*key):
+    # A deterministic pseudo-random number in [0, 1) for the given key
+    return zlib.crc32(":".join(str(part) for part in key).encode()) / 2**32
+
+
+def _select(values, fields, payload):
+    if payload in ("", "*"):
+        return 0, ";".join("{}={}".format(name, values[name]) for name in fields)
+
+    if payload not in fields:
+        return 1, ""
+
+    return 0, "{}={}".format(payload, values[payload])
+
+
+# --------------------------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import itertools
+
+import pytest
+
+from pyduro.protocol.transport import Transport
+from pyduro.simulator import SimulatedBurner, Simulator
+
+# --------------------------------------------------------------------------------------------------
+
+SERIAL = "100000"
+PIN_CODE = "1234567890"
+
+# Every simulator gets an address of its own (every 127.x.y.z address is local on Linux), so that a late response
+# from a previous test never reaches the next one
+_ADDRESSES = (
+    "127.0.{}.{}".format(*divmod(index, 250)) for index in itertools.count(2560)
+)
+
+# --------------------------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def simulator():
+    with Simulator([SimulatedBurner(SERIAL, PIN_CODE, next(_ADDRESSES))]) as simulator:
+        yield simulator
+
+
+@pytest.fixture
+def address(simulator):
+    return simulator.burners[0].address
+
+
+@pytest.fixture
+def transport():
+    with Transport(source_port=0) as transport:
+        yield transport
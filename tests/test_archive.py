@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import datetime
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.actions.history import Event
+from pyduro.archive import EventArchive
+from pyduro.client import Burner
+from pyduro.simulator import SimulatedBurner, Simulator
+
+# --------------------------------------------------------------------------------------------------
+
+_START = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+
+def events(count, start=_START):
+    return [
+        Event(start + datetime.timedelta(minutes=index), "event {}".format(index))
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def archive():
+    with EventArchive() as archive:
+        yield archive
+
+
+@pytest.fixture
+def short_history():
+    # A single day of events, so that a whole synchronization only takes a few pages
+    with Simulator(
+        [SimulatedBurner(SERIAL, PIN_CODE, "127.0.9.249", event_history=86400)]
+    ) as simulator:
+        yield simulator
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_add_moves_the_cursor(archive):
+    assert archive.cursor(SERIAL) is None
+
+    assert archive.add(SERIAL, events(3)) == 3
+    assert archive.cursor(SERIAL) == _START + datetime.timedelta(minutes=2)
+    assert archive.events(SERIAL) == events(3)
+
+
+def test_add_ignores_archived_events(archive):
+    archive.add(SERIAL, events(3))
+
+    assert archive.add(SERIAL, events(5)) == 2
+    assert archive.add(SERIAL, []) == 0
+    assert len(archive.events(SERIAL)) == 5
+
+
+def test_cursor_never_moves_back(archive):
+    archive.add(SERIAL, events(3))
+    archive.add(SERIAL, events(1, start=_START - datetime.timedelta(days=1)))
+
+    assert archive.cursor(SERIAL) == _START + datetime.timedelta(minutes=2)
+
+
+def test_events_period_and_serials(archive):
+    archive.add(SERIAL, events(5))
+    archive.add("200000", events(2))
+
+    assert (
+        archive.events(
+            SERIAL,
+            since=_START + datetime.timedelta(minutes=1),
+            until=_START + datetime.timedelta(minutes=3),
+        )
+        == events(5)[1:3]
+    )
+    assert len(archive.events("200000")) == 2
+    assert archive.events("300000") == []
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "events.db")
+    with EventArchive(path) as archive:
+        archive.add(SERIAL, events(3))
+
+    with EventArchive(path) as archive:
+        assert archive.events(SERIAL) == events(3)
+        assert archive.cursor(SERIAL) == _START + datetime.timedelta(minutes=2)
+
+
+def test_sync(archive, short_history, transport):
+    burner = Burner(short_history.burners[0].address, SERIAL, PIN_CODE)
+
+    result = archive.sync(burner, transport=transport)
+    assert result.error is None
+    assert result.count > 0
+    assert result.count == len(archive.events(SERIAL))
+    assert result.cursor == archive.cursor(SERIAL) == archive.events(SERIAL)[-1][0]
+
+    timestamps = [event.timestamp for event in archive.events(SERIAL)]
+    assert timestamps == sorted(timestamps)
+
+    # Only the events logged since the cursor are asked again, and they are already archived
+    again = archive.sync(burner, transport=transport)
+    assert again.error is None
+    assert again.count == 0
+    assert again.cursor == result.cursor
+
+
+def test_sync_without_response_keeps_the_cursor(archive, transport):
+    archive.add(SERIAL, events(3))
+    cursor = archive.cursor(SERIAL)
+
+    result = archive.sync(
+        Burner("127.0.9.251", SERIAL, PIN_CODE), timeout=0.2, transport=transport
+    )
+    assert result.error is not None
+    assert result.count == 0
+    assert result.cursor == cursor
+    assert archive.cursor(SERIAL) == cursor
+
+
+def test_sync_many(archive, short_history, transport):
+    burners = [
+        Burner(short_history.burners[0].address, SERIAL, PIN_CODE),
+        Burner("127.0.9.251", "200000", PIN_CODE),
+    ]
+
+    results = {
+        result.burner.serial: result
+        for result in archive.sync_many(burners, timeout=0.2, transport=transport)
+    }
+    assert set(results) == {SERIAL, "200000"}
+    assert results[SERIAL].error is None
+    assert results[SERIAL].count > 0
+    assert results["200000"].error is not None
+    assert archive.cursor("200000") is None
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import asyncio
+import socket
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.client import AsyncBurnerClient, Burner
+from pyduro.protocol import DEFAULT_NBE_PORT, FUNCTIONS, NoResponseException
+from pyduro.protocol.frame import Frame
+from pyduro.protocol.rtt import RttTable
+
+# --------------------------------------------------------------------------------------------------
+
+# Receives the requests without ever answering them
+SILENT_ADDRESS = "127.0.9.247"
+
+
+def status_frame():
+    return Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*")
+
+
+def count_datagrams(sock):
+    count = 0
+    while True:
+        try:
+            sock.recv(1024)
+        except BlockingIOError:
+            return count
+
+        count += 1
+
+
+@pytest.fixture
+def silent_burner():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind((SILENT_ADDRESS, DEFAULT_NBE_PORT))
+        sock.setblocking(False)
+
+        yield sock
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("callers", [1, 5])
+def test_coalesced_retransmissions(silent_burner, callers):
+    async def run():
+        client = AsyncBurnerClient(source_port=0, rtt=RttTable(initial=0.1))
+        async with client:
+            return await asyncio.gather(
+                *(
+                    client.request(SILENT_ADDRESS, status_frame(), timeout=1)
+                    for _ in range(callers)
+                ),
+                return_exceptions=True
+            )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, NoResponseException) for result in results)
+    # Sent after 0, 0.1, 0.3 and 0.7 seconds, however many callers wait for the same response
+    assert count_datagrams(silent_burner) == 4
+
+
+def test_requests(address):
+    burner = Burner(address, SERIAL, PIN_CODE)
+
+    async def run():
+        async with AsyncBurnerClient(source_port=0, coalesce=False) as client:
+            status = await client.get_status(burner)
+
+            # Many requests in flight at once on the same socket, each with its own sequence number
+            statuses = await asyncio.gather(*(client.status(burner) for _ in range(50)))
+
+            results = await client.set_many(burner, {"boiler.temp": "70"})
+            settings = await client.get_settings(burner, groups=("boiler",))
+
+            return status, statuses, results, settings
+
+    status, statuses, results, settings = asyncio.run(run())
+
+    assert status.boiler_ref == 65.0
+    assert all(response.serial == SERIAL for response in statuses)
+    assert [(result.actual, result.error) for result in results] == [("70", None)]
+    assert settings["settings"]["boiler"]["temp"] == "70"
+
+
+def test_no_response(silent_burner):
+    async def run():
+        async with AsyncBurnerClient(source_port=0) as client:
+            with pytest.raises(NoResponseException):
+                await client.get_status(
+                    Burner(SILENT_ADDRESS, SERIAL, PIN_CODE), timeout=0.2
+                )
+
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import importlib.util
+import os
+
+import pytest
+
+# --------------------------------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def run():
+    path = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "run.py")
+    spec = importlib.util.spec_from_file_location("benchmarks_run", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def results(**benchmarks):
+    return dict(benchmarks=benchmarks)
+
+
+def test_compare(run, capsys):
+    baseline = results(
+        encode=dict(unit="ns", min=100.0),
+        e2e=dict(unit="requests/s", rate=1000.0),
+        removed=dict(unit="ns", min=1.0),
+    )
+
+    assert run.compare(
+        baseline,
+        results(
+            encode=dict(unit="ns", min=105.0), e2e=dict(unit="requests/s", rate=800.0)
+        ),
+    ) == ["e2e"]
+    assert "removed" in capsys.readouterr().err
+
+
+def test_compare_empty_baseline(run, capsys):
+    # A benchmark that got no response at all, or a baseline written by another version of the script
+    baseline = results(e2e=dict(unit="requests/s", rate=0.0), encode=dict(unit="ns"))
+
+    assert (
+        run.compare(
+            baseline,
+            results(
+                e2e=dict(unit="requests/s", rate=10.0), encode=dict(unit="ns", min=1.0)
+            ),
+        )
+        == []
+    )
+    assert capsys.readouterr().err.count("(no baseline)") == 2
+
+
+def test_end_to_end_filter(run):
+    assert run.end_to_end_benchmarks("127.0.9.2", 10, pattern="frame.") == {}
+
+    assert list(
+        run.end_to_end_benchmarks("127.0.9.2", 10, pattern="e2e.concurrency_16")
+    ) == ["e2e.concurrency_16"]
+
+
+def test_startup_status_without_daemon(run):
+    # Fails if the command loads the daemon while no daemon is running
+    results = run.startup_benchmarks("127.0.9.3", repeat=1, pattern="startup.status")
+
+    assert set(results) == {"startup.status", "startup.status.imports"}
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import math
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro import bulk
+from pyduro.actions import status
+from pyduro.protocol import FUNCTIONS
+from pyduro.protocol.frame import Response
+from pyduro.simulator import SimulatedBurner
+
+# --------------------------------------------------------------------------------------------------
+
+USE_NUMPY = [False] + ([True] if bulk.numpy is not None else [])
+
+
+def build_response(function, payload, sequence_number=0, status=None):
+    answer_status, answer = SimulatedBurner(SERIAL, PIN_CODE).respond(function, payload)
+
+    return "___pyduro___{}\x02{:02d}{:02d}{}{:03d}{}\x04".format(
+        SERIAL,
+        function,
+        sequence_number,
+        answer_status if status is None else status,
+        len(answer),
+        answer,
+    ).encode()
+
+
+@pytest.fixture
+def frames():
+    return [
+        build_response(FUNCTIONS.get_status.value, "*", 1),
+        build_response(FUNCTIONS.get_settings.value, "boiler.temp", 2),
+        build_response(FUNCTIONS.get_status.value, "*", 3),
+        build_response(FUNCTIONS.get_status.value, "*", 4, status=1),
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_decode_frames(frames, use_numpy):
+    table = bulk.decode_frames(b"".join(frames), use_numpy=use_numpy)
+
+    assert len(table) == 4
+    assert list(table.sequence_number) == [1, 2, 3, 4]
+    assert list(table.status) == [0, 0, 0, 1]
+    assert table.serial == [SERIAL] * 4
+    assert table.select(function=FUNCTIONS.get_status.value, status=0) == [0, 2]
+
+    for index, data in enumerate(frames):
+        assert table.payload(index) == Response(data, ("127.0.0.1", 8483)).payload
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_decode_frames_skips_garbage(frames, use_numpy):
+    table = bulk.decode_frames(
+        frames[0] + b"garbage\x04" + frames[1], use_numpy=use_numpy
+    )
+
+    assert list(table.sequence_number) == [1, 2]
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_decode_status(frames, use_numpy):
+    table = bulk.decode_frames(b"".join(frames), use_numpy=use_numpy)
+
+    indexes, columns = bulk.decode_status(
+        table, fields=["boiler_temp", "state", "boiler.timer"], use_numpy=use_numpy
+    )
+
+    assert list(indexes) == [0, 2]
+    for position, index in enumerate(indexes):
+        decoded = status.STATUS_SCHEMA.decode(table.payload(index))
+        assert columns["boiler_temp"][position] == decoded.boiler_temp
+        assert columns["state"][position] == decoded.state
+
+
+@pytest.mark.parametrize("use_numpy", USE_NUMPY)
+def test_decode_status_mixed_widths(use_numpy):
+    # A firmware sending a single field, and another one sending all of them
+    short = "___pyduro___{}\x0211000004{}\x04".format(SERIAL, "65.5").encode()
+    table = bulk.decode_frames(
+        short + build_response(FUNCTIONS.get_status.value, "*", 1), use_numpy=use_numpy
+    )
+
+    _, columns = bulk.decode_status(
+        table, fields=["boiler_temp", "boiler_ref"], use_numpy=use_numpy
+    )
+
+    assert columns["boiler_temp"][0] == 65.5
+    assert math.isnan(columns["boiler_ref"][0])
+    assert (
+        columns["boiler_ref"][1]
+        == status.STATUS_SCHEMA.decode(table.payload(1)).boiler_ref
+    )
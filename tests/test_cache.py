@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro import cache as cache_module
+from pyduro.cache import ResponseCache
+from pyduro.protocol import FUNCTIONS
+from pyduro.protocol.frame import Frame, Response
+
+# --------------------------------------------------------------------------------------------------
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+
+    return clock
+
+
+def frame(function_id=FUNCTIONS.get_settings.value, payload="boiler.temp"):
+    return Frame(SERIAL, PIN_CODE, function_id, payload)
+
+
+def response(function_id=FUNCTIONS.get_settings.value, status=0):
+    return Response(
+        "___pyduro___{}\x02{:02d}00{}002ok\x04".format(SERIAL, function_id, status),
+        ("192.168.1.250", 8483),
+    )
+
+
+def test_store_and_lookup(clock):
+    cache = ResponseCache(ttls={FUNCTIONS.get_settings.value: 10})
+    cache.store(frame(), response())
+
+    assert cache.lookup(frame()) is not None
+    assert cache.lookup(frame(payload="boiler.*")) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    clock.now += 10
+    assert cache.lookup(frame()) is None
+    assert len(cache) == 0
+
+
+def test_only_cacheable_successes(clock):
+    cache = ResponseCache()
+    cache.store(
+        frame(FUNCTIONS.get_status.value, "*"), response(FUNCTIONS.get_status.value)
+    )
+    cache.store(frame(), response(status=1))
+
+    assert len(cache) == 0
+
+
+def test_set_invalidates_its_group(clock):
+    cache = ResponseCache()
+    for payload in ("boiler.temp", "boiler.*", "hot_water.temp", "*"):
+        cache.store(frame(payload=payload), response())
+    cache.store(
+        frame(FUNCTIONS.get_info.value, "*"), response(FUNCTIONS.get_info.value)
+    )
+
+    cache.store(
+        frame(FUNCTIONS.set.value, "boiler.temp=65"), response(FUNCTIONS.set.value)
+    )
+
+    assert cache.lookup(frame(payload="boiler.temp")) is None
+    assert cache.lookup(frame(payload="boiler.*")) is None
+    assert cache.lookup(frame(payload="*")) is None
+    assert cache.lookup(frame(payload="hot_water.temp")) is not None
+    assert cache.lookup(frame(FUNCTIONS.get_info.value, "*")) is not None
+
+
+def test_invalidate_burner(clock):
+    cache = ResponseCache()
+    cache.store(frame(), response())
+    other = Frame("100001", PIN_CODE, FUNCTIONS.get_settings.value, "boiler.temp")
+    cache.store(other, response())
+
+    cache.invalidate(frame().serial)
+
+    assert cache.lookup(frame()) is None
+    assert cache.lookup(other) is not None
+
+
+def test_max_entries(clock):
+    cache = ResponseCache(max_entries=2)
+    for payload in ("boiler.temp", "boiler.diff_over", "hot_water.temp"):
+        cache.store(frame(payload=payload), response())
+
+    assert len(cache) == 2
+    assert cache.lookup(frame(payload="boiler.temp")) is None
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import json
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.__main__ import main
+
+# --------------------------------------------------------------------------------------------------
+
+
+def run(capsys, *arguments):
+    with pytest.raises(SystemExit) as exit_info:
+        main(list(arguments))
+
+    return exit_info.value.code, capsys.readouterr().out
+
+
+@pytest.mark.parametrize("function_name", ["settings", "consumption"])
+def test_get_without_path(capsys, function_name):
+    code, output = run(
+        capsys, "-b", "127.0.9.251", "-s", SERIAL, "-p", PIN_CODE, "get", function_name
+    )
+
+    assert code == 1
+    assert "'all'" in output
+
+
+def test_get_help_mentions_all(capsys):
+    code, output = run(capsys, "get", "--help")
+
+    assert code == 0
+    assert '"all"' in output
+
+
+def test_status(capsys, address):
+    code, output = run(
+        capsys, "--no-daemon", "-b", address, "-s", SERIAL, "-p", PIN_CODE, "status"
+    )
+
+    assert code == 0
+    assert "boiler_temp" in json.loads(output)
+
+
+def test_get_settings_all(capsys, address):
+    code, output = run(
+        capsys,
+        "--no-daemon",
+        "-b",
+        address,
+        "-s",
+        SERIAL,
+        "-p",
+        PIN_CODE,
+        "get",
+        "settings",
+        "all",
+    )
+
+    assert code == 0
+    assert json.loads(output)["settings"]["boiler"]["temp"]
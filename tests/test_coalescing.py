@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import concurrent.futures
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.protocol import FUNCTIONS
+from pyduro.protocol.dispatcher import Dispatcher
+from pyduro.protocol.frame import Frame, Response
+
+# --------------------------------------------------------------------------------------------------
+
+ADDRESS = "192.168.1.250"
+
+
+def frame(function_id=FUNCTIONS.get_status.value, payload="*"):
+    return Frame(SERIAL, PIN_CODE, function_id, payload)
+
+
+def response(sequence_number, address=ADDRESS, function_id=FUNCTIONS.get_status.value):
+    return Response(
+        "___pyduro___{}\x02{:02d}{:02d}0002ok\x04".format(
+            SERIAL, function_id, sequence_number
+        ),
+        (address, 8483),
+    )
+
+
+def register(dispatcher, address=ADDRESS, coalesce=False, **kwargs):
+    future = concurrent.futures.Future()
+    request = dispatcher.register(
+        frame(**kwargs), address, 8483, future, coalesce=coalesce
+    )
+    dispatcher.sent(request)
+
+    return request, future
+
+
+def test_join():
+    dispatcher = Dispatcher()
+    request, first = register(dispatcher, coalesce=True)
+
+    second = concurrent.futures.Future()
+    assert dispatcher.join(frame(), ADDRESS, 8483, second) is request
+    assert dispatcher.join(frame(payload="boiler.temp"), ADDRESS, 8483, second) is None
+
+    # Cancelling one of the callers keeps the request for the other one
+    dispatcher.cancel(request, first)
+    assert dispatcher.pending
+
+    dispatcher.dispatch(response(0))
+    assert second.result().payload == "ok"
+
+
+def test_set_is_never_joined():
+    dispatcher = Dispatcher()
+    register(
+        dispatcher,
+        coalesce=True,
+        function_id=FUNCTIONS.set.value,
+        payload="boiler.temp=65",
+    )
+
+    assert (
+        dispatcher.join(
+            frame(FUNCTIONS.set.value, "boiler.temp=65"),
+            ADDRESS,
+            8483,
+            concurrent.futures.Future(),
+        )
+        is None
+    )
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import pytest
+
+from pyduro.protocol import MAX_PAYLOAD_SIZE, PayloadToLargeException
+from pyduro.protocol.codec import (
+    MAX_REQUEST_SIZE,
+    REQUEST_FUNCTION_OFFSET,
+    REQUEST_PAYLOAD_OFFSET,
+    REQUEST_PAYLOAD_SIZE_OFFSET,
+    REQUEST_SEQUENCE_OFFSET,
+    decode_header,
+    get_encoder,
+)
+from pyduro.protocol.frame import Frame
+
+# --------------------------------------------------------------------------------------------------
+
+
+def encode(function_id, sequence_number, payload):
+    buffer = bytearray(MAX_REQUEST_SIZE)
+    size = get_encoder("100000", "1234567890").encode_into(
+        buffer, function_id, sequence_number, payload
+    )
+    return bytes(buffer[:size])
+
+
+def test_encode_layout():
+    frame = encode(1, 42, "boiler.temp")
+
+    assert frame.startswith(b"___pyduro___100000 \x02")
+    assert frame[REQUEST_FUNCTION_OFFSET:REQUEST_SEQUENCE_OFFSET] == b"01"
+    assert frame[REQUEST_SEQUENCE_OFFSET : REQUEST_SEQUENCE_OFFSET + 2] == b"42"
+    assert frame[REQUEST_PAYLOAD_SIZE_OFFSET:REQUEST_PAYLOAD_OFFSET] == b"011"
+    assert frame[REQUEST_PAYLOAD_OFFSET:] == b"boiler.temp\x04"
+
+
+def test_encode_returns_the_same_frame(monkeypatch):
+    monkeypatch.setattr("time.time", lambda: 1700000000.0)
+    frame = Frame("100000", "1234567890", 1, "boiler.temp", sequence_number=42)
+
+    assert frame.encode() == encode(1, 42, "boiler.temp")
+    assert frame.encode() == get_encoder("100000", "1234567890").encode(
+        1, 42, "boiler.temp"
+    )
+
+    with pytest.raises(PayloadToLargeException):
+        get_encoder("100000", "1234567890").encode(2, 0, "é" * 300)
+
+
+def test_encode_function_id_over_99():
+    frame = encode(100, 2, "")
+
+    assert frame[REQUEST_FUNCTION_OFFSET:].startswith(b"100021234567890")
+    assert frame.endswith(b"000\x04")
+
+
+def test_encode_bytes_payload():
+    assert encode(2, 0, b"misc.*").endswith(b"006misc.*\x04")
+
+
+def test_encode_max_payload():
+    frame = encode(2, 0, "x" * MAX_PAYLOAD_SIZE)
+
+    assert len(frame) == MAX_REQUEST_SIZE
+
+
+def test_encode_counts_encoded_bytes():
+    buffer = bytearray(MAX_REQUEST_SIZE)
+    encoder = get_encoder("100000", "1234567890")
+
+    # 300 characters, but 600 bytes once encoded
+    with pytest.raises(PayloadToLargeException):
+        encoder.encode_into(buffer, 2, 0, "é" * 300)
+
+    # The shared buffer must never be resized
+    assert len(buffer) == MAX_REQUEST_SIZE
+
+
+def test_encode_buffer_too_small():
+    buffer = bytearray(REQUEST_PAYLOAD_OFFSET)
+
+    with pytest.raises(PayloadToLargeException):
+        get_encoder("100000", "1234567890").encode_into(buffer, 2, 0, "boiler.temp")
+
+    assert len(buffer) == REQUEST_PAYLOAD_OFFSET
+
+
+def test_decode_header():
+    frame = b"___pyduro___100000\x0201012005value\x04"
+
+    assert decode_header(frame) == (1, 1, 2, 5)
+    assert decode_header(memoryview(frame)) == (1, 1, 2, 5)
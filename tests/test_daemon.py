@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import os
+import stat
+import tempfile
+import threading
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro import daemon
+from pyduro.protocol import (
+    FUNCTIONS,
+    DaemonSocketUnsafeException,
+    NoResponseException,
+)
+from pyduro.protocol.frame import Frame
+from pyduro.simulator import SimulatedBurner, Simulator
+
+# --------------------------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def serve(*args, **kwargs):
+        server = daemon.Daemon(*args, source_port=0, **kwargs)
+        servers.append(server)
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        return server
+
+    yield serve
+
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def temporary_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv(daemon.SOCKET_PATH_VARIABLE, raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    return tmp_path
+
+
+def test_round_trip(serve, tmp_path, address):
+    server = serve(str(tmp_path / "pyduro.sock"))
+    frame = Frame(SERIAL, PIN_CODE, FUNCTIONS.get_settings.value, "boiler.temp")
+
+    with daemon.connect(server.path) as transport:
+        response = transport.send(frame, address)
+        assert response.serial == SERIAL
+
+        # The second response comes from the cache of the daemon
+        assert transport.send(frame, address).payload == response.payload
+        assert transport.stats()["cache"]["hits"] == 1
+
+
+def test_many_requests_in_flight(serve, tmp_path, address):
+    server = serve(str(tmp_path / "pyduro.sock"))
+    frame = Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*")
+
+    # More requests than the 99 sequence numbers of the burner: the daemon must wait for all of them at once
+    with daemon.connect(server.path) as transport:
+        futures = [transport.submit(frame, address) for _ in range(150)]
+        done, pending = transport.wait(futures, 10)
+
+    assert not pending
+    assert all(future.result().serial == SERIAL for future in done)
+
+
+def test_retransmission(serve, tmp_path):
+    burner = SimulatedBurner(SERIAL, PIN_CODE, "127.0.9.250")
+    with Simulator([burner], loss=0.5, seed=1):
+        server = serve(str(tmp_path / "pyduro.sock"))
+        frame = Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*")
+
+        with daemon.connect(server.path) as transport:
+            futures = [transport.submit(frame, burner.address) for _ in range(20)]
+            done, pending = transport.wait(futures, 10)
+
+    assert not pending
+    assert all(future.result().serial == SERIAL for future in done)
+
+
+def test_max_wait(serve, tmp_path):
+    server = serve(str(tmp_path / "pyduro.sock"), max_wait=0.2)
+    frame = Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*")
+
+    with daemon.connect(server.path) as transport:
+        # Nobody answers on this address
+        future = transport.submit(frame, "127.0.9.251")
+
+        with pytest.raises(NoResponseException):
+            future.result(5)
+
+    assert not server._waiting
+
+
+def test_cancel(serve, tmp_path):
+    server = serve(str(tmp_path / "pyduro.sock"))
+    frame = Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*")
+
+    with daemon.connect(server.path) as transport:
+        future = transport.submit(frame, "127.0.9.251")
+        transport.cancel(future)
+
+        assert future.cancelled()
+        assert transport.stats()["requests"] == 1
+
+    # The daemon stopped waiting for the response
+    assert not server.transport._dispatcher.pending
+
+
+def test_cancel_while_receiving(serve, tmp_path):
+    burner = SimulatedBurner(SERIAL, PIN_CODE, "127.0.9.248")
+    with Simulator([burner], latency=0.1):
+        server = serve(str(tmp_path / "pyduro.sock"))
+        frame = Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*")
+
+        with daemon.connect(server.path) as transport:
+            # As if `cancel` ran just after the receiver took the future to give it its response
+            future = transport.submit(frame, burner.address)
+            assert future.cancel()
+
+            # The receiver skips the cancelled future and keeps serving the connection
+            response = transport.send(frame, burner.address, timeout=2)
+            assert response is not None
+            assert not transport.closed
+
+
+def test_socket_permissions(serve, tmp_path):
+    server = serve(str(tmp_path / "pyduro.sock"))
+
+    assert stat.S_IMODE(os.stat(server.path).st_mode) == 0o600
+
+
+def test_default_directory(serve, temporary_directory):
+    server = serve()
+
+    directory = os.path.dirname(server.path)
+    assert os.path.dirname(directory) == str(temporary_directory)
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+    with daemon.connect() as transport:
+        assert transport.stats()["requests"] == 0
+
+
+def test_shared_default_directory(temporary_directory):
+    os.mkdir(os.path.dirname(daemon.default_socket_path()), 0o755)
+
+    with pytest.raises(DaemonSocketUnsafeException):
+        daemon.Daemon(source_port=0)
+
+    assert daemon.connect() is None
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "getuid") or os.getuid() != 0,
+    reason="Giving a file to another user requires root",
+)
+def test_socket_of_another_user(serve, tmp_path):
+    server = serve(str(tmp_path / "pyduro.sock"))
+    os.chown(server.path, 12345, -1)
+
+    assert daemon.connect(server.path) is None
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import time
+
+import pytest
+
+from conftest import PIN_CODE
+from pyduro.actions import discover
+from pyduro.simulator import SimulatedBurner, Simulator
+
+# --------------------------------------------------------------------------------------------------
+
+# Every burner sharing an address answers the discoveries sent there, as on a real network segment
+ADDRESSES = ("127.0.9.245", "127.0.9.244")
+SERIALS = {
+    "100001": ADDRESSES[0],
+    "100002": ADDRESSES[0],
+    "100003": ADDRESSES[0],
+    "100004": ADDRESSES[1],
+}
+
+
+@pytest.fixture
+def segment():
+    with Simulator(
+        [
+            SimulatedBurner(serial, PIN_CODE, address)
+            for serial, address in SERIALS.items()
+        ]
+    ):
+        yield
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_run_all(segment, transport):
+    # Each address is given twice, so every burner answers twice
+    responses = discover.run_all(
+        window=0.5, broadcast_addresses=ADDRESSES * 2, transport=transport
+    )
+
+    assert {
+        response.serial: response.burner_address for response in responses
+    } == SERIALS
+    assert len(responses) == len(SERIALS)
+
+
+def test_stream_stops_once_every_burner_answered(segment, transport):
+    start = time.monotonic()
+
+    responses = list(
+        discover.stream(
+            window=5,
+            expected=len(SERIALS),
+            broadcast_addresses=ADDRESSES,
+            transport=transport,
+        )
+    )
+
+    assert len(responses) == len(SERIALS)
+    assert time.monotonic() - start < 2
+
+
+def test_stream_nobody(transport):
+    responses = discover.run_all(
+        window=0.2, broadcast_addresses=("127.0.9.251",), transport=transport
+    )
+
+    assert responses == []
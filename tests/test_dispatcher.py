@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import concurrent.futures
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.protocol import (
+    FUNCTIONS,
+    MAX_SEQUENCE_NUMBER,
+    TooManyPendingRequestsException,
+    TransportClosedException,
+)
+from pyduro.protocol.dispatcher import Dispatcher
+from pyduro.protocol.frame import Frame, Response
+from pyduro.protocol.metrics import Metrics
+
+# --------------------------------------------------------------------------------------------------
+
+ADDRESS = "192.168.1.250"
+
+
+def frame(function_id=FUNCTIONS.get_status.value, payload="*"):
+    return Frame(SERIAL, PIN_CODE, function_id, payload)
+
+
+def response(sequence_number, address=ADDRESS, function_id=FUNCTIONS.get_status.value):
+    return Response(
+        "___pyduro___{}\x02{:02d}{:02d}0002ok\x04".format(
+            SERIAL, function_id, sequence_number
+        ),
+        (address, 8483),
+    )
+
+
+def register(dispatcher, address=ADDRESS, coalesce=False, **kwargs):
+    future = concurrent.futures.Future()
+    request = dispatcher.register(
+        frame(**kwargs), address, 8483, future, coalesce=coalesce
+    )
+    dispatcher.sent(request)
+
+    return request, future
+
+
+def test_sequence_numbers_rotate():
+    dispatcher = Dispatcher()
+
+    numbers = [register(dispatcher)[0].frame.sequence_number for _ in range(3)]
+
+    assert numbers == [0, 1, 2]
+
+
+def test_sequence_numbers_wrap_around():
+    dispatcher = Dispatcher()
+    requests = [register(dispatcher)[0] for _ in range(MAX_SEQUENCE_NUMBER - 1)]
+    assert requests[-1].frame.sequence_number == MAX_SEQUENCE_NUMBER - 2
+
+    # Free the first numbers: the next ones wrap around, skipping the ones still in use
+    for request in requests[:2]:
+        dispatcher.cancel(request)
+
+    assert register(dispatcher)[0].frame.sequence_number == MAX_SEQUENCE_NUMBER - 1
+    assert register(dispatcher)[0].frame.sequence_number == 0
+    assert register(dispatcher)[0].frame.sequence_number == 1
+
+    with pytest.raises(TooManyPendingRequestsException):
+        register(dispatcher)
+
+    # The sequence numbers are counted per burner
+    assert register(dispatcher, address="192.168.1.251")[0].frame.sequence_number == 2
+
+
+def test_dispatch():
+    metrics = Metrics()
+    dispatcher = Dispatcher(metrics=metrics)
+    first, first_future = register(dispatcher)
+    second, second_future = register(dispatcher)
+
+    # Out of order, and from the right burner only
+    assert dispatcher.dispatch(response(1, address="192.168.1.251")) is None
+    assert dispatcher.dispatch(response(1)) is second
+    assert second_future.result().sequence_number == 1
+    assert not first_future.done()
+
+    assert dispatcher.dispatch(response(0)) is first
+    assert not dispatcher.pending
+
+    # A late duplicate
+    assert dispatcher.dispatch(response(0)) is None
+
+    snapshot = metrics.snapshot()
+    assert snapshot[ADDRESS]["responses"] == 2
+    assert snapshot[ADDRESS]["unmatched"] == 1
+    assert dispatcher.rtt.get(ADDRESS).samples == 2
+
+
+def test_no_rtt_sample_after_retransmission():
+    dispatcher = Dispatcher()
+    request, _ = register(dispatcher)
+    dispatcher.sent(request)
+
+    dispatcher.dispatch(response(0))
+
+    assert dispatcher.rtt.get(ADDRESS).samples == 0
+
+
+def test_broadcast():
+    dispatcher = Dispatcher()
+    future = concurrent.futures.Future()
+    dispatcher.register(frame(), "255.255.255.255", 8483, future, broadcast=True)
+
+    assert dispatcher.dispatch(response(0, address="192.168.1.7")) is not None
+    assert future.result().burner_address == "192.168.1.7"
+
+
+def test_listener():
+    dispatcher = Dispatcher()
+    received = []
+    dispatcher.register(
+        frame(), ADDRESS, 8483, concurrent.futures.Future(), listener=received.append
+    )
+
+    dispatcher.dispatch(response(0))
+    dispatcher.dispatch(response(0))
+
+    assert len(received) == 2
+    assert dispatcher.pending
+
+
+def test_cancel_counts_timeouts():
+    metrics = Metrics()
+    dispatcher = Dispatcher(metrics=metrics)
+    request, _ = register(dispatcher)
+
+    dispatcher.cancel(request)
+
+    assert not dispatcher.pending
+    assert metrics.snapshot()[ADDRESS]["timeouts"] == 1
+
+
+def test_fail_all():
+    dispatcher = Dispatcher()
+    futures = [register(dispatcher)[1] for _ in range(3)]
+
+    dispatcher.fail_all(TransportClosedException())
+
+    assert not dispatcher.pending
+    for future in futures:
+        with pytest.raises(TransportClosedException):
+            future.result()
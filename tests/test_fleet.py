@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import time
+
+from conftest import PIN_CODE, SERIAL
+from pyduro import fleet
+from pyduro.client import Burner
+from pyduro.protocol import TooManyPendingRequestsException
+
+# --------------------------------------------------------------------------------------------------
+
+
+class _BusyTransport:
+    # Every sequence number of the burner is used by others for a while
+    def __init__(self, transport, busy_for):
+        self.transport = transport
+        self.busy_until = time.monotonic() + busy_for
+        self.refused = 0
+
+    def submit(self, frame, address, destination_port=None):
+        if time.monotonic() < self.busy_until:
+            self.refused += 1
+
+            raise TooManyPendingRequestsException(address)
+
+        return self.transport.submit(frame, address)
+
+    def cancel(self, future):
+        self.transport.cancel(future)
+
+
+def test_poll(transport, address):
+    burners = [
+        Burner(address, SERIAL, PIN_CODE),
+        Burner("127.0.9.251", SERIAL, PIN_CODE),
+    ]
+
+    results = list(
+        fleet.poll(
+            burners,
+            [("settings", "boiler.temp"), ("nothing", None)],
+            timeout=0.3,
+            retries=1,
+            transport=transport,
+        )
+    )
+
+    assert len(results) == 4
+    answered = [result for result in results if result.response is not None]
+    assert [result.burner.address for result in answered] == [address]
+
+    # The unknown function fails right away, the silent burner after two attempts
+    failures = {
+        (result.burner.address, result.function_name): result for result in results
+    }
+    assert failures[("127.0.9.251", "settings")].attempts == 2
+    assert failures[(address, "nothing")].attempts == 0
+
+
+def test_poll_backs_off(transport, address):
+    busy = _BusyTransport(transport, 0.3)
+
+    results = list(
+        fleet.poll(
+            [Burner(address, SERIAL, PIN_CODE)],
+            [("settings", "boiler.temp")],
+            transport=busy,
+        )
+    )
+
+    assert results[0].response is not None
+    assert busy.refused <= 0.3 / fleet.BACKOFF_DELAY + 1
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import logging
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.actions import get
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_run_settings(transport, address):
+    settings = get.run_settings(
+        address, SERIAL, PIN_CODE, groups=("boiler", "hot_water"), transport=transport
+    )
+
+    assert settings["settings"]["boiler"]["temp"] == "65"
+    assert "hot_water" in settings["settings"]
+
+
+def test_run_settings_timeout_is_logged(transport, caplog, capsys):
+    with caplog.at_level(logging.WARNING, "pyduro"):
+        get.run_settings(
+            "127.0.9.251",
+            SERIAL,
+            PIN_CODE,
+            groups=("boiler",),
+            timeout=0.2,
+            transport=transport,
+        )
+
+    assert "No response received" in caplog.text
+    # Only the settings are printed, as JSON, by the command line
+    assert capsys.readouterr().out == ""
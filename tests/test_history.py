@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import datetime
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.actions import history
+from pyduro.actions.history import Event
+from pyduro.simulator import SimulatedBurner, Simulator
+
+# --------------------------------------------------------------------------------------------------
+
+_NOON = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+
+def at(seconds, record):
+    return Event(_NOON + datetime.timedelta(seconds=seconds), record)
+
+
+@pytest.fixture
+def burner():
+    # Pages of 2 events, so that the pairs of events logged during the same second are often split between two pages
+    burner = SimulatedBurner(
+        SERIAL,
+        PIN_CODE,
+        "127.0.9.246",
+        event_history=30 * 86400,
+        event_page_size=2,
+    )
+    with Simulator([burner]):
+        yield burner
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_window_same_second_boundary():
+    window = history._EventLogWindow(None, _NOON)
+    assert window.next_cursor == _NOON
+
+    # The page ends in the middle of the events logged during the same second
+    window.feed([at(-10, "c"), at(-20, "b2")])
+    assert window.cursor == _NOON - datetime.timedelta(seconds=20)
+    assert window.next_cursor == _NOON - datetime.timedelta(seconds=19)
+
+    # The next page starts a second later, so it repeats the events already received from that second
+    window.feed([at(-20, "b2"), at(-20, "b1")])
+    window.feed([at(-20, "b1"), at(-30, "a")])
+    window.feed([at(-30, "a")])
+
+    # Nothing new in the second of the cursor: the next page starts at that second
+    assert not window.done
+    assert window.next_cursor == _NOON - datetime.timedelta(seconds=30)
+
+    window.feed([])
+
+    assert window.done
+    assert list(window.events) == [
+        at(-10, "c"),
+        at(-20, "b2"),
+        at(-20, "b1"),
+        at(-30, "a"),
+    ]
+
+
+def test_window_full_page_of_the_same_second():
+    window = history._EventLogWindow(None, _NOON)
+
+    window.feed([at(-10, "c"), at(-20, "b2")])
+    window.feed([at(-20, "b2"), at(-20, "b1")])
+    # The whole page is from the second of the cursor, and every event of it has already been received
+    window.feed([at(-20, "b2"), at(-20, "b1")])
+    assert window.next_cursor == _NOON - datetime.timedelta(seconds=20)
+
+    window.feed([at(-30, "a")])
+
+    assert list(window.events) == [
+        at(-10, "c"),
+        at(-20, "b2"),
+        at(-20, "b1"),
+        at(-30, "a"),
+    ]
+
+
+def test_window_first_page_excludes_its_cursor():
+    window = history._EventLogWindow(None, _NOON)
+
+    window.feed([at(0, "now"), at(-10, "before")])
+
+    assert list(window.events) == [at(-10, "before")]
+
+
+def test_window_stops_at_its_start():
+    window = history._EventLogWindow(_NOON - datetime.timedelta(seconds=15), _NOON)
+
+    window.feed([at(-10, "inside"), at(-20, "outside")])
+
+    assert window.done
+    assert list(window.events) == [at(-10, "inside")]
+
+
+def test_window_stops_on_an_empty_page():
+    # This is also what an error response (status != 0) feeds
+    window = history._EventLogWindow(None, _NOON)
+
+    window.feed([])
+
+    assert window.done
+    assert not window.events
+
+
+def test_stream_events(burner, transport):
+    until = datetime.datetime.now().replace(microsecond=0)
+    since = until - datetime.timedelta(days=20)
+
+    expected = [
+        event
+        for event in history.parse_events(";".join(burner.events(until, 100000)))
+        if event.timestamp >= since
+    ]
+    # Some pairs of events logged during the same second
+    assert len(set(event.timestamp for event in expected)) < len(expected)
+
+    windowed = list(
+        history.stream_events(
+            burner.address,
+            SERIAL,
+            PIN_CODE,
+            since=since,
+            until=until,
+            window=3 * 86400,
+            transport=transport,
+        )
+    )
+    single = list(
+        history.stream_events(
+            burner.address,
+            SERIAL,
+            PIN_CODE,
+            since=since,
+            until=until,
+            window=None,
+            transport=transport,
+        )
+    )
+
+    assert windowed == single == expected
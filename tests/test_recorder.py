@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import math
+
+import pytest
+
+from conftest import SERIAL
+from pyduro.actions.status import STATUS_SCHEMA
+from pyduro.recorder import Bucket, StatusRecorder
+
+# --------------------------------------------------------------------------------------------------
+
+FIELDS = ["boiler_temp", "state", "oxygen"]
+
+
+def status(boiler_temp, state=5, oxygen=""):
+    values = [""] * len(STATUS_SCHEMA)
+    values[STATUS_SCHEMA.field("boiler_temp").index] = str(boiler_temp)
+    values[STATUS_SCHEMA.field("state").index] = str(state)
+    values[STATUS_SCHEMA.field("oxygen").index] = str(oxygen)
+
+    return STATUS_SCHEMA.decode(",".join(values))
+
+
+def fill(recorder, count, start=0):
+    for index in range(start, start + count):
+        recorder.record(SERIAL, status(float(index)), timestamp=float(index))
+
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_record_and_query():
+    with StatusRecorder(fields=FIELDS, segment_size=4) as recorder:
+        fill(recorder, 10)
+
+        assert recorder.serials() == [SERIAL]
+        assert recorder.count(SERIAL) == 10
+
+        timestamps, values = recorder.query(SERIAL, "boiler_temp")
+        assert list(timestamps) == [float(index) for index in range(10)]
+        assert list(values) == [float(index) for index in range(10)]
+
+        # The period crosses the sealed segments and the samples not sealed yet
+        timestamps, values = recorder.query(SERIAL, "boiler_temp", since=3, until=9)
+        assert list(timestamps) == [3.0, 4.0, 5.0, 6.0, 7.0, 8.0]
+
+        _, states = recorder.query(SERIAL, "state")
+        assert set(states) == {5.0}
+
+        # Missing values are recorded as NaN
+        _, oxygen = recorder.query(SERIAL, "oxygen")
+        assert all(math.isnan(value) for value in oxygen)
+
+        timestamps, values = recorder.query("200000", "boiler_temp")
+        assert len(timestamps) == len(values) == 0
+
+
+def test_unknown_field():
+    with StatusRecorder(fields=FIELDS) as recorder:
+        with pytest.raises(KeyError):
+            recorder.query(SERIAL, "smoke_temp")
+        with pytest.raises(KeyError):
+            recorder.downsample(SERIAL, "smoke_temp", 60)
+
+    with pytest.raises(KeyError):
+        StatusRecorder(fields=["no_such_field"])
+
+
+def test_chronological_order():
+    with StatusRecorder(fields=FIELDS, segment_size=2) as recorder:
+        fill(recorder, 4)
+
+        # The last sample is in a sealed segment now
+        with pytest.raises(ValueError):
+            recorder.record(SERIAL, status(1.0), timestamp=2.5)
+
+        recorder.record(SERIAL, status(1.0), timestamp=3.0)
+        recorder.record("200000", status(1.0), timestamp=0.0)
+        assert recorder.count(SERIAL) == 5
+
+
+def test_downsample():
+    with StatusRecorder(fields=FIELDS, segment_size=7) as recorder:
+        fill(recorder, 25)
+
+        assert recorder.downsample(SERIAL, "boiler_temp", 10) == [
+            Bucket(0.0, 10, 0.0, 9.0, 4.5),
+            Bucket(10.0, 10, 10.0, 19.0, 14.5),
+            Bucket(20.0, 5, 20.0, 24.0, 22.0),
+        ]
+        assert recorder.downsample(SERIAL, "boiler_temp", 10, since=15, until=22) == [
+            Bucket(10.0, 5, 15.0, 19.0, 17.0),
+            Bucket(20.0, 2, 20.0, 21.0, 20.5),
+        ]
+
+        # Buckets without any number are left out
+        assert recorder.downsample(SERIAL, "oxygen", 10) == []
+
+
+def test_persistence(tmp_path):
+    directory = str(tmp_path)
+    with StatusRecorder(directory, fields=FIELDS, segment_size=4) as recorder:
+        fill(recorder, 10)
+
+    with StatusRecorder(directory, fields=FIELDS, segment_size=4) as recorder:
+        assert recorder.serials() == [SERIAL]
+        assert recorder.count(SERIAL) == 10
+
+        fill(recorder, 3, start=10)
+        with pytest.raises(ValueError):
+            recorder.record(SERIAL, status(1.0), timestamp=1.0)
+
+        timestamps, values = recorder.query(SERIAL, "boiler_temp", since=8)
+        assert list(timestamps) == [8.0, 9.0, 10.0, 11.0, 12.0]
+        assert list(values) == [8.0, 9.0, 10.0, 11.0, 12.0]
+
+
+def test_float_typecode():
+    with StatusRecorder(fields=FIELDS, typecode="f") as recorder:
+        recorder.record(SERIAL, status(65.5), timestamp=1.0)
+
+        _, values = recorder.query(SERIAL, "boiler_temp")
+        assert values.typecode == "f"
+        assert list(values) == [65.5]
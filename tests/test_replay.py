@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import concurrent.futures
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.protocol import FUNCTIONS
+from pyduro.protocol.capture import RECEIVED, SENT, CaptureWriter, read_capture
+from pyduro.protocol.frame import Frame, Response
+from pyduro.protocol.transport import Transport
+from pyduro.replay import ReplayServer, load_test, parse_request, send_load
+
+# --------------------------------------------------------------------------------------------------
+
+
+class _LateCallbacksFuture(concurrent.futures.Future):
+    # The callbacks of a future only run after its waiters have been woken up: never run them at all
+    def add_done_callback(self, fn):
+        pass
+
+
+class _InstantTransport:
+    def __init__(self, response):
+        self.response = response
+
+    def submit(self, frame, address, destination_port=None):
+        future = _LateCallbacksFuture()
+        future.set_result(self.response)
+
+        return future
+
+    def cancel(self, future):
+        future.cancel()
+
+
+def test_send_load_before_callbacks():
+    response = Response(b"___pyduro___100000\x0211012005value\x04", ("127.0.0.1", 8483))
+    frame = Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*")
+
+    report = send_load(
+        [frame], "127.0.0.1", count=10, transport=_InstantTransport(response)
+    )
+
+    assert report.responses == 10
+    assert report.lost == 0
+
+
+def test_capture_and_replay(tmp_path, address):
+    path = str(tmp_path / "session.pydcap")
+    frames = [
+        Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*"),
+        Frame(SERIAL, PIN_CODE, FUNCTIONS.get_settings.value, "boiler.temp"),
+    ]
+
+    with CaptureWriter(path) as capture:
+        with Transport(source_port=0, capture=capture) as transport:
+            responses = [transport.send(frame, address) for frame in frames]
+
+    records = list(read_capture(path))
+    assert [record.direction for record in records] == [SENT, RECEIVED] * 2
+    assert parse_request(records[2].data)[3:] == (
+        FUNCTIONS.get_settings.value,
+        responses[1].sequence_number,
+        "boiler.temp",
+    )
+
+    with ReplayServer(path, port=0) as server:
+        assert len(server) == 2
+
+        with Transport(source_port=0) as transport:
+            replayed = transport.send(
+                frames[1], "127.0.0.1", destination_port=server.port
+            )
+            assert replayed.payload == responses[1].payload
+
+        report = load_test(path, port=server.port, count=50, concurrency=8)
+
+    assert report.responses == 50
+    assert report.lost == 0
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import time
+
+import pytest
+
+from pyduro.protocol.rtt import INITIAL_RTO, MAX_RTO, MIN_RTO, RttEstimator, RttTable
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_initial_timeout():
+    assert RttEstimator().rto == INITIAL_RTO
+    assert RttTable(initial=0.5).timeout("192.168.1.250") == 0.5
+
+
+def test_observe():
+    estimator = RttEstimator()
+
+    estimator.observe(0.1)
+    assert estimator.srtt == pytest.approx(0.1)
+    assert estimator.rttvar == pytest.approx(0.05)
+    assert estimator.rto == pytest.approx(0.1 + 4 * 0.05)
+
+    estimator.observe(0.2)
+    assert estimator.rttvar == pytest.approx(0.75 * 0.05 + 0.25 * 0.1)
+    assert estimator.srtt == pytest.approx(0.875 * 0.1 + 0.125 * 0.2)
+    assert estimator.samples == 2
+
+
+def test_bounds():
+    estimator = RttEstimator()
+
+    estimator.observe(0.001)
+    assert estimator.rto == MIN_RTO
+
+    estimator.observe(10)
+    assert estimator.rto == MAX_RTO
+
+
+def test_backoff():
+    estimator = RttEstimator(initial=1, maximum=3)
+
+    estimator.backoff()
+    assert estimator.rto == 2
+
+    estimator.backoff()
+    assert estimator.rto == 3
+
+
+def test_backoff_once_per_window():
+    estimator = RttEstimator(initial=1)
+    sent_at = time.monotonic()
+
+    # Several requests sent before the first backoff only double the timeout once
+    estimator.backoff(sent_at)
+    estimator.backoff(sent_at)
+    assert estimator.rto == 2
+
+    estimator.backoff(time.monotonic())
+    assert estimator.rto == 4
+
+
+def test_table():
+    table = RttTable()
+    table.observe("192.168.1.250", 0.1)
+
+    assert len(table) == 1
+    assert table.timeout("192.168.1.250") == pytest.approx(0.3)
+    assert table.timeout("192.168.1.251") == INITIAL_RTO
+
+    table.backoff("192.168.1.250")
+    assert table.timeout("192.168.1.250") == pytest.approx(0.6)
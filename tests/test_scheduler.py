@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.protocol import FUNCTIONS
+from pyduro.protocol.dispatcher import Request
+from pyduro.protocol.frame import Frame
+from pyduro.protocol.scheduler import Scheduler, TokenBucket
+
+# --------------------------------------------------------------------------------------------------
+
+
+def request(address="192.168.1.250", function_id=FUNCTIONS.get_operating_data.value):
+    return Request(Frame(SERIAL, PIN_CODE, function_id, "*"), address, 8483, None)
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.take(0)
+    assert bucket.take(0)
+    assert not bucket.take(0)
+    assert bucket.ready_at(0) == pytest.approx(0.1)
+
+    assert not bucket.take(0.05)
+    assert bucket.take(0.1)
+
+
+def test_max_in_flight():
+    scheduler = Scheduler(rate=None, max_in_flight=2)
+    requests = [request() for _ in range(3)]
+    for waiting in requests:
+        scheduler.push(waiting)
+
+    assert scheduler.pop(0) == requests[:2]
+    assert scheduler.pop(0) == []
+    assert scheduler.next_at(0) is None
+
+    scheduler.done(requests[0])
+    assert scheduler.pop(0) == requests[2:]
+    assert len(scheduler) == 0
+
+
+def test_rate():
+    scheduler = Scheduler(rate=10, burst=1, max_in_flight=10)
+    requests = [request() for _ in range(2)]
+    for waiting in requests:
+        scheduler.push(waiting)
+
+    assert scheduler.pop(0) == requests[:1]
+    assert scheduler.next_at(0) == pytest.approx(0.1)
+    assert scheduler.pop(0.1) == requests[1:]
+
+
+def test_priorities_and_fairness():
+    scheduler = Scheduler(rate=None, max_in_flight=10)
+    log = request(function_id=FUNCTIONS.get_event_log.value)
+    first = [request("192.168.1.250") for _ in range(2)]
+    second = request("192.168.1.251")
+    status = request("192.168.1.251", FUNCTIONS.get_status.value)
+    for waiting in [log] + first + [second, status]:
+        scheduler.push(waiting)
+
+    # The status first, the event log last, and the burners in turn
+    assert scheduler.pop(0) == [status, first[0], second, first[1], log]
+
+
+def test_done_before_sent():
+    scheduler = Scheduler(rate=None, max_in_flight=1)
+    waiting = [request() for _ in range(2)]
+    for item in waiting:
+        scheduler.push(item)
+
+    scheduler.done(waiting[1])
+
+    assert len(scheduler) == 1
+    assert scheduler.pop(0) == waiting[:1]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import concurrent.futures
+
+from conftest import PIN_CODE, SERIAL
+from pyduro import fleet
+from pyduro.actions import set as set_action
+from pyduro.client import Burner
+from pyduro.protocol import DaemonRequestException, SettingNotAppliedException
+
+# --------------------------------------------------------------------------------------------------
+
+
+class _FailingTransport:
+    # Fails the requests to some paths (as a daemon failing to send them would) or to some burners
+    def __init__(self, transport, paths=(), addresses=()):
+        self.transport = transport
+        self.paths = paths
+        self.addresses = addresses
+
+    def submit(self, frame, address, destination_port=None, verbose=False):
+        if address in self.addresses:
+            raise RuntimeError("unexpected")
+
+        if frame.payload.split(".")[0] in self.paths:
+            future = concurrent.futures.Future()
+            future.set_exception(DaemonRequestException("boom"))
+
+            return future
+
+        return self.transport.submit(frame, address)
+
+    def wait(self, futures, timeout):
+        return concurrent.futures.wait(futures, timeout)
+
+    def cancel(self, future):
+        if hasattr(future, "request"):
+            self.transport.cancel(future)
+
+
+def test_run_many(transport, simulator, address):
+    results = set_action.run_many(
+        address,
+        SERIAL,
+        PIN_CODE,
+        {"boiler.temp": "70", "hot_water.temp": "1000", "nothing": "1"},
+        transport=transport,
+    )
+
+    assert [result.path for result in results] == [
+        "boiler.temp",
+        "hot_water.temp",
+        "nothing",
+    ]
+    assert results[0].error is None and results[0].actual == "70"
+    assert isinstance(results[1].error, SettingNotAppliedException)
+    assert results[2].error is not None
+    assert simulator.burners[0].settings["boiler"]["temp"] == "70"
+
+
+def test_run_many_failed_request(transport, address):
+    results = set_action.run_many(
+        address,
+        SERIAL,
+        PIN_CODE,
+        {"boiler.temp": "70", "hot_water.temp": "60"},
+        transport=_FailingTransport(transport, paths=("hot_water",)),
+    )
+
+    assert results[0].error is None
+    assert isinstance(results[1].error, DaemonRequestException)
+
+
+def test_set_many_failed_burner(transport, address):
+    burners = [
+        Burner(address, SERIAL, PIN_CODE),
+        Burner("127.0.9.251", SERIAL, PIN_CODE),
+    ]
+
+    results = dict(
+        fleet.set_many(
+            burners,
+            {"boiler.temp": "70"},
+            transport=_FailingTransport(transport, addresses=("127.0.9.251",)),
+        )
+    )
+
+    assert results[burners[0]][0].error is None
+    assert isinstance(results[burners[1]][0].error, RuntimeError)
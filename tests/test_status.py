@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+from pyduro.actions import STATUS_PARAMS, status
+
+# --------------------------------------------------------------------------------------------------
+
+
+def test_status_params_alias():
+    assert list(STATUS_PARAMS) == [name for name, _, _ in status.STATUS_FIELDS]
+    assert set(STATUS_PARAMS.values()) == {None}
+
+
+def test_oxygen_units():
+    assert status.STATUS_SCHEMA.field("oxygen").unit == "%"
+    assert status.STATUS_SCHEMA.field("oxygen_ref").unit == "%"
+
+
+def test_decode_short_and_long_vectors():
+    schema = status.STATUS_SCHEMA
+
+    short = schema.decode("65.5,70,1.0")
+    assert short.boiler_temp == 65.5
+    assert short.boiler_ref == 70.0
+    assert short.hopper_trip1 is None
+    assert short.extra == ()
+
+    values = ["0"] * len(schema) + ["42", "x"]
+    assert schema.decode(",".join(values)).extra == ("42", "x")
+
+
+def test_decode_lenient_integers():
+    values = [""] * len(status.STATUS_SCHEMA)
+    values[status.STATUS_SCHEMA.field("state").index] = "5.0"
+
+    assert status.STATUS_SCHEMA.decode(",".join(values)).state == 5
+
+
+def test_diff():
+    schema = status.STATUS_SCHEMA
+    previous = schema.decode("65.5,70")
+
+    assert schema.diff(previous, schema.decode("66.0,70")) == {"boiler_temp": 66.0}
+    assert schema.diff(None, previous)["boiler_ref"] == 70.0
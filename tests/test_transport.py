@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+# --------------------------------------------------------------------------------------------------
+
+import logging
+import socket
+import time
+
+import pytest
+
+from conftest import PIN_CODE, SERIAL
+from pyduro.protocol import FUNCTIONS
+from pyduro.protocol.frame import Frame
+from pyduro.protocol.transport import Transport
+
+# --------------------------------------------------------------------------------------------------
+
+
+def status_frame():
+    return Frame(SERIAL, PIN_CODE, FUNCTIONS.get_status.value, "*")
+
+
+def test_send(transport, address):
+    response = transport.send(status_frame(), address)
+
+    assert response.serial == SERIAL
+    assert response.function == FUNCTIONS.get_status.value
+
+
+def test_send_timeout_is_logged(transport, caplog, capsys):
+    with caplog.at_level(logging.WARNING, "pyduro"):
+        assert transport.send(status_frame(), "127.0.9.251", timeout=0.2) is None
+
+    assert "No response received" in caplog.text
+    assert not transport._dispatcher.pending
+    # Printing is left to the command line
+    assert capsys.readouterr().out == ""
+
+
+def test_malformed_response_is_logged(transport, address, caplog, capsys):
+    # The receiver thread is started by the first request
+    transport.send(status_frame(), address)
+
+    with caplog.at_level(logging.WARNING, "pyduro"):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b"not a frame", ("127.0.0.1", transport.source_port))
+
+        deadline = time.monotonic() + 2
+        while "Unable to parse" not in caplog.text and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert "Unable to parse" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+def test_port_in_use(transport):
+    # Responses would silently go to only one of two sockets bound to the same port
+    with pytest.raises(OSError):
+        Transport(source_port=transport.source_port)